@@ -0,0 +1,267 @@
+# Shared synthetic-data toolkit for the ERP/CRM/ITSM mock services
+import asyncio
+import base64
+import json
+import os
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+from fastapi import HTTPException, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+# Every synthetic record gets an updatedAt on a fixed timeline so `since=` filtering
+# is deterministic: record i was last updated at EPOCH + i * RECORD_INTERVAL.
+EPOCH = datetime(2024, 1, 1)
+RECORD_INTERVAL = timedelta(seconds=60)
+NDJSON_CHUNK = 500
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+class MockSettings:
+    """Service-wide defaults, overridable per request via query params"""
+    def __init__(self):
+        self.records = int(os.getenv("MOCK_RECORDS", "0"))  # 0 = fixtures only
+        self.seed = int(os.getenv("MOCK_SEED", "42"))
+        self.growth_per_minute = _env_float("MOCK_GROWTH_PER_MINUTE", 0.0)
+        self.latency = os.getenv("MOCK_LATENCY", "")
+        self.error_rate = _env_float("MOCK_ERROR_RATE", 0.0)
+        self.error_status = int(os.getenv("MOCK_ERROR_STATUS", "503"))
+        self.reject_rate = _env_float("MOCK_REJECT_RATE", 0.0)
+        self.max_bulk = int(os.getenv("MOCK_MAX_BULK", "5000"))
+        self.started = time.time()
+
+
+settings = MockSettings()
+
+
+def parse_latency(spec: str) -> Callable[[], float]:
+    """Parse a latency distribution spec into a sampler returning milliseconds.
+
+    Supported forms: ``fixed:50``, ``uniform:10,100``, ``normal:50,15``,
+    ``lognormal:3.5,0.6`` (parameters of the underlying normal) and ``exp:40``.
+    """
+    if not spec:
+        return lambda: 0.0
+    kind, _, raw = spec.partition(":")
+    try:
+        args = [float(a) for a in raw.split(",") if a]
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid latency spec: {spec}")
+    if kind == "fixed" and len(args) == 1:
+        return lambda: args[0]
+    if kind == "uniform" and len(args) == 2:
+        return lambda: random.uniform(args[0], args[1])
+    if kind == "normal" and len(args) == 2:
+        return lambda: max(0.0, random.gauss(args[0], args[1]))
+    if kind == "lognormal" and len(args) == 2:
+        return lambda: random.lognormvariate(args[0], args[1])
+    if kind == "exp" and len(args) == 1:
+        return lambda: random.expovariate(1.0 / args[0]) if args[0] > 0 else 0.0
+    raise HTTPException(status_code=400, detail=f"Invalid latency spec: {spec}")
+
+
+def encode_cursor(index: int) -> str:
+    return base64.urlsafe_b64encode(str(index).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        index = int(base64.urlsafe_b64decode(padded.encode()).decode())
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if index < 0:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return index
+
+
+def parse_since(since: str) -> datetime:
+    try:
+        return datetime.fromisoformat(since.replace("Z", "+00:00")).replace(tzinfo=None)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid since timestamp: {since}")
+
+
+def int_param(q, name: str, default: int, minimum: Optional[int] = 0, maximum: Optional[int] = None) -> int:
+    """Integer query parameter within [minimum, maximum]; 400 on anything else"""
+    raw = q.get(name)
+    if raw is None:
+        return default
+    try:
+        value = int(raw)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid {name}: {raw}")
+    if (minimum is not None and value < minimum) or (maximum is not None and value > maximum):
+        raise HTTPException(status_code=400, detail=f"Invalid {name}: {raw}")
+    return value
+
+
+def rate_param(q, name: str, default: float) -> float:
+    """Probability query parameter in [0, 1]; 400 on anything else"""
+    raw = q.get(name)
+    if raw is None:
+        return default
+    try:
+        value = float(raw)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid {name}: {raw}")
+    if not 0 <= value <= 1:
+        raise HTTPException(status_code=400, detail=f"Invalid {name}: {raw}")
+    return value
+
+
+class Collection:
+    """A deterministic, lazily generated record collection.
+
+    Records below ``len(fixtures)`` are the hand-written fixtures; anything past
+    that comes from ``factory(index, rng)`` with an rng seeded from the service
+    seed and the index, so record i is identical across requests and restarts
+    without ever materializing the whole collection.
+    """
+    def __init__(self, name: str, fixtures: List[dict], factory: Callable[[int, random.Random], dict], key: str = "id"):
+        self.name = name
+        self.fixtures = fixtures
+        self.factory = factory
+        self.key = key
+        self.received = 0  # records accepted through POST since startup
+
+    def size(self, requested: Optional[int] = None) -> int:
+        base = requested if requested is not None else (settings.records or len(self.fixtures))
+        if settings.growth_per_minute > 0:
+            base += int((time.time() - settings.started) / 60 * settings.growth_per_minute)
+        return base
+
+    def record(self, index: int, seed: int) -> dict:
+        if index < len(self.fixtures):
+            rec = dict(self.fixtures[index])
+        else:
+            rec = self.factory(index, random.Random(f"{seed}:{self.name}:{index}"))
+        rec["updatedAt"] = (EPOCH + RECORD_INTERVAL * index).isoformat()
+        return rec
+
+    def start_index(self, since: datetime) -> int:
+        """First index whose updatedAt is strictly after ``since``"""
+        if since < EPOCH:
+            return 0
+        return int((since - EPOCH) / RECORD_INTERVAL) + 1
+
+
+async def serve(request: Request, collection: Collection):
+    """Serve a collection honouring the common mock query parameters.
+
+    Query params: count, seed, limit, offset, cursor, since, format=ndjson,
+    latency (distribution spec), error_rate, error_status.
+    """
+    q = request.query_params
+
+    injected = await _inject_faults(request, collection)
+    if injected is not None:
+        return injected
+
+    seed = int_param(q, "seed", settings.seed, minimum=None)
+    total = collection.size(int_param(q, "count", None))
+
+    if "cursor" in q:
+        start = decode_cursor(q["cursor"])
+    elif "since" in q:
+        start = collection.start_index(parse_since(q["since"]))
+    else:
+        start = 0
+    start = min(start + int_param(q, "offset", 0), total)
+    end = min(start + int_param(q, "limit", None), total) if "limit" in q else total
+
+    headers = {"X-Total-Count": str(total), "X-Result-Count": str(end - start)}
+    if end < total:
+        headers["X-Next-Cursor"] = encode_cursor(end)
+
+    ndjson = q.get("format") == "ndjson" or "application/x-ndjson" in request.headers.get("accept", "")
+    if ndjson:
+        def stream():
+            for chunk_start in range(start, end, NDJSON_CHUNK):
+                chunk_end = min(chunk_start + NDJSON_CHUNK, end)
+                yield "".join(json.dumps(collection.record(i, seed)) + "\n" for i in range(chunk_start, chunk_end))
+        return StreamingResponse(stream(), media_type="application/x-ndjson", headers=headers)
+
+    return JSONResponse(content=[collection.record(i, seed) for i in range(start, end)], headers=headers)
+
+
+async def _inject_faults(request: Request, collection: Collection) -> Optional[JSONResponse]:
+    q = request.query_params
+    latency = parse_latency(q.get("latency", settings.latency))()
+    if latency > 0:
+        await asyncio.sleep(latency / 1000)
+    error_rate = rate_param(q, "error_rate", settings.error_rate)
+    status = int_param(q, "error_status", settings.error_status, minimum=400, maximum=599)
+    if error_rate > 0 and random.random() < error_rate:
+        return JSONResponse(status_code=status, content={"error": "Injected failure", "service": collection.name})
+    return None
+
+
+def _accept_record(collection: Collection, record, reject_rate: float) -> dict:
+    if not isinstance(record, dict):
+        return {"status": "rejected", "error": "Record must be an object"}
+    key = record.get(collection.key)
+    if not key:
+        return {"status": "rejected", "error": f"Missing '{collection.key}'"}
+    if reject_rate > 0 and random.random() < reject_rate:
+        return {collection.key: key, "status": "rejected", "error": "Injected validation failure"}
+    collection.received += 1
+    return {collection.key: key, "status": "accepted"}
+
+
+async def receive(request: Request, collection: Collection):
+    """Accept one posted record. Honours latency, error_rate and reject_rate."""
+    injected = await _inject_faults(request, collection)
+    if injected is not None:
+        return injected
+    try:
+        record = json.loads(await request.body())
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid JSON body")
+    result = _accept_record(collection, record, rate_param(request.query_params, "reject_rate", settings.reject_rate))
+    return JSONResponse(status_code=201 if result["status"] == "accepted" else 422, content=result)
+
+
+async def receive_bulk(request: Request, collection: Collection):
+    """Accept a JSON array or NDJSON body of records and report per-record results by index.
+
+    Latency and error injection apply once per batch; ``reject_rate`` applies per record.
+    """
+    injected = await _inject_faults(request, collection)
+    if injected is not None:
+        return injected
+    body = await request.body()
+    try:
+        if "application/x-ndjson" in request.headers.get("content-type", ""):
+            records = [json.loads(line) for line in body.splitlines() if line.strip()]
+        else:
+            records = json.loads(body)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid JSON body")
+    if not isinstance(records, list):
+        raise HTTPException(status_code=400, detail="Expected an array of records")
+    if len(records) > settings.max_bulk:
+        raise HTTPException(status_code=413, detail=f"At most {settings.max_bulk} records per request")
+    reject_rate = rate_param(request.query_params, "reject_rate", settings.reject_rate)
+    results = [dict(_accept_record(collection, record, reject_rate), index=i) for i, record in enumerate(records)]
+    accepted = sum(1 for r in results if r["status"] == "accepted")
+    return {"accepted": accepted, "rejected": len(results) - accepted, "results": results}
+
+
+def describe(collections: Dict[str, Collection]) -> dict:
+    return {
+        "seed": settings.seed,
+        "records": {name: c.size() for name, c in collections.items()},
+        "received": {name: c.received for name, c in collections.items() if c.received},
+        "latency": settings.latency or None,
+        "errorRate": settings.error_rate,
+        "queryParams": ["count", "seed", "limit", "offset", "cursor", "since", "format", "latency", "error_rate", "error_status", "reject_rate"],
+    }
@@ -1,38 +1,76 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from datetime import datetime
+from mockdata import Collection, serve, receive, receive_bulk, describe
 
 app = FastAPI(title="Mock CRM Service")
 
+INDUSTRIES = ["Manufacturing", "Technology", "Retail", "Finance", "Healthcare", "Logistics"]
+FIRST_NAMES = ["John", "Jane", "Bob", "Alice", "Maria", "Wei", "Priya", "Omar"]
+LAST_NAMES = ["Smith", "Doe", "Wilson", "Brown", "Garcia", "Chen", "Patel", "Haddad"]
+
+def make_customer(i, rng):
+    name = f"Company {i + 1:06d}"
+    return {"id": f"CUS-{i + 1:06d}", "name": name, "email": f"contact@company{i + 1}.com",
+            "tier": rng.choice(["startup", "professional", "enterprise"]), "revenue": rng.randint(10, 5000) * 1000,
+            "industry": rng.choice(INDUSTRIES)}
+
+def make_lead(i, rng):
+    first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+    return {"id": f"LEAD-{i + 1:06d}", "company": f"Prospect {i + 1:06d}", "contact": f"{first} {last}",
+            "email": f"{first.lower()}@prospect{i + 1}.com", "status": rng.choice(["new", "contacted", "qualified"]),
+            "score": rng.randint(0, 100)}
+
+def make_opportunity(i, rng):
+    stage = rng.choice(["prospecting", "proposal", "negotiation", "closed-won", "closed-lost"])
+    probability = {"prospecting": 10, "proposal": 50, "negotiation": 75, "closed-won": 100, "closed-lost": 0}[stage]
+    return {"id": f"OPP-{i + 1:06d}", "name": f"Opportunity {i + 1:06d}", "value": rng.randint(5, 1000) * 1000,
+            "stage": stage, "probability": probability}
+
+customers = Collection("customers", [
+    {"id": "CUS-001", "name": "Acme Corporation", "email": "contact@acme.com", "tier": "enterprise", "revenue": 500000, "industry": "Manufacturing"},
+    {"id": "CUS-002", "name": "TechStart Inc", "email": "info@techstart.io", "tier": "startup", "revenue": 50000, "industry": "Technology"},
+    {"id": "CUS-003", "name": "Global Industries", "email": "sales@global.com", "tier": "enterprise", "revenue": 1200000, "industry": "Retail"},
+    {"id": "CUS-004", "name": "DataFlow LLC", "email": "hello@dataflow.co", "tier": "professional", "revenue": 150000, "industry": "Finance"},
+    {"id": "CUS-005", "name": "CloudNine Systems", "email": "support@cloudnine.io", "tier": "enterprise", "revenue": 800000, "industry": "Healthcare"}
+], make_customer)
+
+leads = Collection("leads", [
+    {"id": "LEAD-001", "company": "NewCo Ventures", "contact": "John Smith", "email": "john@newco.com", "status": "qualified", "score": 85},
+    {"id": "LEAD-002", "company": "FutureTech Labs", "contact": "Jane Doe", "email": "jane@futuretech.io", "status": "contacted", "score": 72},
+    {"id": "LEAD-003", "company": "Innovate Inc", "contact": "Bob Wilson", "email": "bob@innovate.com", "status": "new", "score": 45},
+    {"id": "LEAD-004", "company": "Scale Solutions", "contact": "Alice Brown", "email": "alice@scale.co", "status": "qualified", "score": 90}
+], make_lead)
+
+opportunities = Collection("opportunities", [
+    {"id": "OPP-001", "name": "Enterprise Deal - Acme", "value": 250000, "stage": "negotiation", "probability": 75},
+    {"id": "OPP-002", "name": "Platform Migration - Global", "value": 500000, "stage": "proposal", "probability": 50},
+    {"id": "OPP-003", "name": "API Integration - CloudNine", "value": 100000, "stage": "closed-won", "probability": 100}
+], make_opportunity)
+
 @app.get("/")
 def root():
-    return {"service": "CRM Mock API", "version": "1.0.0", "endpoints": ["/customers", "/leads", "/opportunities", "/health"]}
+    return {"service": "CRM Mock API", "version": "1.1.0", "endpoints": ["/customers", "/customers/bulk", "/leads", "/opportunities", "/health"],
+            "synthetic": describe({"customers": customers, "leads": leads, "opportunities": opportunities})}
 
 @app.get("/customers")
-def get_customers():
-    return [
-        {"id": "CUS-001", "name": "Acme Corporation", "email": "contact@acme.com", "tier": "enterprise", "revenue": 500000, "industry": "Manufacturing"},
-        {"id": "CUS-002", "name": "TechStart Inc", "email": "info@techstart.io", "tier": "startup", "revenue": 50000, "industry": "Technology"},
-        {"id": "CUS-003", "name": "Global Industries", "email": "sales@global.com", "tier": "enterprise", "revenue": 1200000, "industry": "Retail"},
-        {"id": "CUS-004", "name": "DataFlow LLC", "email": "hello@dataflow.co", "tier": "professional", "revenue": 150000, "industry": "Finance"},
-        {"id": "CUS-005", "name": "CloudNine Systems", "email": "support@cloudnine.io", "tier": "enterprise", "revenue": 800000, "industry": "Healthcare"}
-    ]
+async def get_customers(request: Request):
+    return await serve(request, customers)
+
+@app.post("/customers")
+async def create_customer(request: Request):
+    return await receive(request, customers)
+
+@app.post("/customers/bulk")
+async def create_customers_bulk(request: Request):
+    return await receive_bulk(request, customers)
 
 @app.get("/leads")
-def get_leads():
-    return [
-        {"id": "LEAD-001", "company": "NewCo Ventures", "contact": "John Smith", "email": "john@newco.com", "status": "qualified", "score": 85},
-        {"id": "LEAD-002", "company": "FutureTech Labs", "contact": "Jane Doe", "email": "jane@futuretech.io", "status": "contacted", "score": 72},
-        {"id": "LEAD-003", "company": "Innovate Inc", "contact": "Bob Wilson", "email": "bob@innovate.com", "status": "new", "score": 45},
-        {"id": "LEAD-004", "company": "Scale Solutions", "contact": "Alice Brown", "email": "alice@scale.co", "status": "qualified", "score": 90}
-    ]
+async def get_leads(request: Request):
+    return await serve(request, leads)
 
 @app.get("/opportunities")
-def get_opportunities():
-    return [
-        {"id": "OPP-001", "name": "Enterprise Deal - Acme", "value": 250000, "stage": "negotiation", "probability": 75},
-        {"id": "OPP-002", "name": "Platform Migration - Global", "value": 500000, "stage": "proposal", "probability": 50},
-        {"id": "OPP-003", "name": "API Integration - CloudNine", "value": 100000, "stage": "closed-won", "probability": 100}
-    ]
+async def get_opportunities(request: Request):
+    return await serve(request, opportunities)
 
 @app.get("/health")
 def health():
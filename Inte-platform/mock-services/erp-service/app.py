@@ -1,39 +1,75 @@
-from fastapi import FastAPI
-from datetime import datetime
+from fastapi import FastAPI, Request
+from datetime import datetime, timedelta
+from mockdata import Collection, serve, receive, receive_bulk, describe
 
 app = FastAPI(title="Mock ERP Service")
 
+PRODUCTS = [("Enterprise License", 5000), ("Support Package", 15000), ("Cloud Credits", 100),
+            ("Training Bundle", 1500), ("API Gateway License", 12500)]
+CUSTOMERS = ["Acme Corp", "TechStart Inc", "Global Industries", "DataFlow LLC", "CloudNine Systems"]
+
+def make_order(i, rng):
+    product, price = rng.choice(PRODUCTS)
+    quantity = rng.randint(1, 100)
+    return {"id": f"ORD-{i + 1:06d}", "product": product, "quantity": quantity, "amount": quantity * price,
+            "status": rng.choice(["pending", "processing", "shipped", "delivered"]), "customer": rng.choice(CUSTOMERS)}
+
+def make_inventory(i, rng):
+    product, _ = PRODUCTS[i % len(PRODUCTS)]
+    return {"sku": f"SKU-{i + 1:06d}", "name": product, "stock": rng.randint(0, 10000),
+            "warehouse": rng.choice(["WH-DIGITAL", "WH-EAST", "WH-WEST"]), "reorderPoint": rng.randint(10, 1000)}
+
+def make_invoice(i, rng):
+    return {"id": f"INV-{i + 1:06d}", "orderId": f"ORD-{rng.randint(1, i + 1):06d}", "amount": rng.randint(100, 100000),
+            "status": rng.choice(["paid", "pending", "overdue"]),
+            "dueDate": (datetime(2024, 1, 1) + timedelta(days=rng.randint(0, 365))).date().isoformat()}
+
+orders = Collection("orders", [
+    {"id": "ORD-001", "product": "Enterprise License", "quantity": 10, "amount": 50000, "status": "shipped", "customer": "Acme Corp"},
+    {"id": "ORD-002", "product": "Support Package", "quantity": 1, "amount": 15000, "status": "processing", "customer": "TechStart Inc"},
+    {"id": "ORD-003", "product": "Cloud Credits", "quantity": 100, "amount": 10000, "status": "pending", "customer": "Global Industries"},
+    {"id": "ORD-004", "product": "Training Bundle", "quantity": 5, "amount": 7500, "status": "shipped", "customer": "DataFlow LLC"},
+    {"id": "ORD-005", "product": "API Gateway License", "quantity": 2, "amount": 25000, "status": "delivered", "customer": "CloudNine Systems"}
+], make_order)
+
+inventory = Collection("inventory", [
+    {"sku": "LIC-ENT-001", "name": "Enterprise License", "stock": 500, "warehouse": "WH-DIGITAL", "reorderPoint": 100},
+    {"sku": "SUP-PKG-001", "name": "Support Package", "stock": 999, "warehouse": "WH-DIGITAL", "reorderPoint": 50},
+    {"sku": "CLD-CRD-001", "name": "Cloud Credits", "stock": 10000, "warehouse": "WH-DIGITAL", "reorderPoint": 1000},
+    {"sku": "TRN-BND-001", "name": "Training Bundle", "stock": 250, "warehouse": "WH-DIGITAL", "reorderPoint": 25},
+    {"sku": "API-GW-001", "name": "API Gateway License", "stock": 150, "warehouse": "WH-DIGITAL", "reorderPoint": 20}
+], make_inventory)
+
+invoices = Collection("invoices", [
+    {"id": "INV-2024-001", "orderId": "ORD-001", "amount": 50000, "status": "paid", "dueDate": "2024-02-15"},
+    {"id": "INV-2024-002", "orderId": "ORD-002", "amount": 15000, "status": "pending", "dueDate": "2024-02-28"},
+    {"id": "INV-2024-003", "orderId": "ORD-003", "amount": 10000, "status": "overdue", "dueDate": "2024-01-15"}
+], make_invoice)
+
 @app.get("/")
 def root():
-    return {"service": "ERP Mock API", "version": "1.0.0", "endpoints": ["/orders", "/inventory", "/invoices", "/health"]}
+    return {"service": "ERP Mock API", "version": "1.1.0", "endpoints": ["/orders", "/orders/bulk", "/inventory", "/invoices", "/health"],
+            "synthetic": describe({"orders": orders, "inventory": inventory, "invoices": invoices})}
 
 @app.get("/orders")
-def get_orders():
-    return [
-        {"id": "ORD-001", "product": "Enterprise License", "quantity": 10, "amount": 50000, "status": "shipped", "customer": "Acme Corp"},
-        {"id": "ORD-002", "product": "Support Package", "quantity": 1, "amount": 15000, "status": "processing", "customer": "TechStart Inc"},
-        {"id": "ORD-003", "product": "Cloud Credits", "quantity": 100, "amount": 10000, "status": "pending", "customer": "Global Industries"},
-        {"id": "ORD-004", "product": "Training Bundle", "quantity": 5, "amount": 7500, "status": "shipped", "customer": "DataFlow LLC"},
-        {"id": "ORD-005", "product": "API Gateway License", "quantity": 2, "amount": 25000, "status": "delivered", "customer": "CloudNine Systems"}
-    ]
+async def get_orders(request: Request):
+    return await serve(request, orders)
+
+@app.post("/orders")
+async def create_order(request: Request):
+    return await receive(request, orders)
+
+@app.post("/orders/bulk")
+async def create_orders_bulk(request: Request):
+    return await receive_bulk(request, orders)
 
 @app.get("/inventory")
-def get_inventory():
-    return [
-        {"sku": "LIC-ENT-001", "name": "Enterprise License", "stock": 500, "warehouse": "WH-DIGITAL", "reorderPoint": 100},
-        {"sku": "SUP-PKG-001", "name": "Support Package", "stock": 999, "warehouse": "WH-DIGITAL", "reorderPoint": 50},
-        {"sku": "CLD-CRD-001", "name": "Cloud Credits", "stock": 10000, "warehouse": "WH-DIGITAL", "reorderPoint": 1000},
-        {"sku": "TRN-BND-001", "name": "Training Bundle", "stock": 250, "warehouse": "WH-DIGITAL", "reorderPoint": 25},
-        {"sku": "API-GW-001", "name": "API Gateway License", "stock": 150, "warehouse": "WH-DIGITAL", "reorderPoint": 20}
-    ]
+async def get_inventory(request: Request):
+    return await serve(request, inventory)
 
 @app.get("/invoices")
-def get_invoices():
-    return [
-        {"id": "INV-2024-001", "orderId": "ORD-001", "amount": 50000, "status": "paid", "dueDate": "2024-02-15"},
-        {"id": "INV-2024-002", "orderId": "ORD-002", "amount": 15000, "status": "pending", "dueDate": "2024-02-28"},
-        {"id": "INV-2024-003", "orderId": "ORD-003", "amount": 10000, "status": "overdue", "dueDate": "2024-01-15"}
-    ]
+async def get_invoices(request: Request):
+    return await serve(request, invoices)
 
 @app.get("/health")
 def health():
@@ -1,37 +1,64 @@
-from fastapi import FastAPI
-from datetime import datetime
+from fastapi import FastAPI, Request
+from datetime import datetime, timedelta
+from mockdata import Collection, serve, describe
 
 app = FastAPI(title="Mock ITSM Service")
 
+TEAMS = ["DevOps Team", "Integration Team", "Frontend Team", "Security Team", "DBA Team"]
+TOPICS = ["API Gateway Timeout", "Integration Sync Failure", "Dashboard Loading Slow", "Certificate Renewal",
+          "Connection Pool Exhausted", "Message Queue Backlog", "Disk Usage Alert"]
+
+def make_ticket(i, rng):
+    return {"id": f"TKT-{i + 1:06d}", "title": rng.choice(TOPICS), "priority": rng.choice(["low", "medium", "high", "critical"]),
+            "status": rng.choice(["open", "in-progress", "resolved", "closed"]), "assignee": rng.choice(TEAMS),
+            "created": (datetime(2024, 1, 1) + timedelta(days=rng.randint(0, 365))).date().isoformat()}
+
+def make_incident(i, rng):
+    return {"id": f"INC-{i + 1:06d}", "title": rng.choice(TOPICS), "severity": rng.choice(["P1", "P2", "P3", "P4"]),
+            "status": rng.choice(["investigating", "monitoring", "resolved"]), "duration": f"{rng.randint(5, 240)} min"}
+
+def make_change(i, rng):
+    return {"id": f"CHG-{i + 1:06d}", "title": f"Change request {i + 1:06d}",
+            "status": rng.choice(["pending", "approved", "implemented"]),
+            "scheduledDate": (datetime(2024, 1, 1) + timedelta(days=rng.randint(0, 365))).date().isoformat(),
+            "risk": rng.choice(["low", "medium", "high"])}
+
+tickets = Collection("tickets", [
+    {"id": "TKT-001", "title": "API Gateway Timeout", "priority": "high", "status": "open", "assignee": "DevOps Team", "created": "2024-01-10"},
+    {"id": "TKT-002", "title": "Integration Sync Failure", "priority": "critical", "status": "in-progress", "assignee": "Integration Team", "created": "2024-01-12"},
+    {"id": "TKT-003", "title": "Dashboard Loading Slow", "priority": "medium", "status": "open", "assignee": "Frontend Team", "created": "2024-01-13"},
+    {"id": "TKT-004", "title": "SSL Certificate Renewal", "priority": "high", "status": "resolved", "assignee": "Security Team", "created": "2024-01-08"},
+    {"id": "TKT-005", "title": "Database Connection Pool", "priority": "medium", "status": "closed", "assignee": "DBA Team", "created": "2024-01-05"}
+], make_ticket)
+
+incidents = Collection("incidents", [
+    {"id": "INC-001", "title": "Production Outage - API Gateway", "severity": "P1", "status": "resolved", "duration": "45 min"},
+    {"id": "INC-002", "title": "Data Sync Delay", "severity": "P2", "status": "investigating", "duration": "ongoing"},
+    {"id": "INC-003", "title": "Authentication Service Degraded", "severity": "P3", "status": "monitoring", "duration": "2 hours"}
+], make_incident)
+
+changes = Collection("changes", [
+    {"id": "CHG-001", "title": "Deploy v2.5.0 to Production", "status": "approved", "scheduledDate": "2024-01-20", "risk": "medium"},
+    {"id": "CHG-002", "title": "Database Schema Migration", "status": "pending", "scheduledDate": "2024-01-25", "risk": "high"},
+    {"id": "CHG-003", "title": "Kong Gateway Upgrade", "status": "implemented", "scheduledDate": "2024-01-15", "risk": "low"}
+], make_change)
+
 @app.get("/")
 def root():
-    return {"service": "ITSM Mock API", "version": "1.0.0", "endpoints": ["/tickets", "/incidents", "/changes", "/health"]}
+    return {"service": "ITSM Mock API", "version": "1.1.0", "endpoints": ["/tickets", "/incidents", "/changes", "/health"],
+            "synthetic": describe({"tickets": tickets, "incidents": incidents, "changes": changes})}
 
 @app.get("/tickets")
-def get_tickets():
-    return [
-        {"id": "TKT-001", "title": "API Gateway Timeout", "priority": "high", "status": "open", "assignee": "DevOps Team", "created": "2024-01-10"},
-        {"id": "TKT-002", "title": "Integration Sync Failure", "priority": "critical", "status": "in-progress", "assignee": "Integration Team", "created": "2024-01-12"},
-        {"id": "TKT-003", "title": "Dashboard Loading Slow", "priority": "medium", "status": "open", "assignee": "Frontend Team", "created": "2024-01-13"},
-        {"id": "TKT-004", "title": "SSL Certificate Renewal", "priority": "high", "status": "resolved", "assignee": "Security Team", "created": "2024-01-08"},
-        {"id": "TKT-005", "title": "Database Connection Pool", "priority": "medium", "status": "closed", "assignee": "DBA Team", "created": "2024-01-05"}
-    ]
+async def get_tickets(request: Request):
+    return await serve(request, tickets)
 
 @app.get("/incidents")
-def get_incidents():
-    return [
-        {"id": "INC-001", "title": "Production Outage - API Gateway", "severity": "P1", "status": "resolved", "duration": "45 min"},
-        {"id": "INC-002", "title": "Data Sync Delay", "severity": "P2", "status": "investigating", "duration": "ongoing"},
-        {"id": "INC-003", "title": "Authentication Service Degraded", "severity": "P3", "status": "monitoring", "duration": "2 hours"}
-    ]
+async def get_incidents(request: Request):
+    return await serve(request, incidents)
 
 @app.get("/changes")
-def get_changes():
-    return [
-        {"id": "CHG-001", "title": "Deploy v2.5.0 to Production", "status": "approved", "scheduledDate": "2024-01-20", "risk": "medium"},
-        {"id": "CHG-002", "title": "Database Schema Migration", "status": "pending", "scheduledDate": "2024-01-25", "risk": "high"},
-        {"id": "CHG-003", "title": "Kong Gateway Upgrade", "status": "implemented", "scheduledDate": "2024-01-15", "risk": "low"}
-    ]
+async def get_changes(request: Request):
+    return await serve(request, changes)
 
 @app.get("/health")
 def health():
@@ -0,0 +1,217 @@
+"""Bulk import and export of integrations, connectors and API endpoints.
+
+A bundle is a stream of items, each tagged with `kind` (integration,
+connector or endpoint) and carrying the same camelCase fields as the
+list endpoints. It is encoded either as NDJSON, one item per line, or as
+YAML. YAML can be a multi-document stream of items, or one document that
+maps `integrations` / `connectors` / `endpoints` to lists.
+
+Items are validated and inserted in batches of BATCH_SIZE, with one
+multi-row INSERT per kind and one transaction per batch. If the database
+rejects a batch, its rows are retried one at a time to find the failing
+items. Invalid items are reported by index and do not stop the rest of
+the bundle. An atomic import instead uses one transaction for the whole
+bundle and commits nothing if any item fails.
+
+Exports hold only the caller's own integrations and connectors unless the
+caller is an admin. Connector config fields that the connector type's schema
+marks as `password` are exported as null; only an admin can ask for them with
+`include_secrets`.
+"""
+import json
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+import yaml
+from pydantic import BaseModel, Field, ValidationError
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+from app.models import APIEndpoint, Connector, ConnectorStatus, ConnectorType, Integration, IntegrationStatus, User, UserRole
+from app.routers.connectors import CONNECTOR_TYPES
+
+BATCH_SIZE = 1000
+MAX_REPORTED_ERRORS = 1000
+
+YamlLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+YamlDumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+
+class IntegrationItem(BaseModel):
+    name: str = Field(max_length=255)
+    description: Optional[str] = None
+    flowConfig: str
+    status: IntegrationStatus = IntegrationStatus.DRAFT
+
+class ConnectorItem(BaseModel):
+    name: str = Field(max_length=255)
+    type: ConnectorType
+    description: Optional[str] = None
+    config: Dict[str, Any]
+    status: ConnectorStatus = ConnectorStatus.INACTIVE
+
+class EndpointItem(BaseModel):
+    name: str = Field(max_length=255)
+    path: str = Field(max_length=255)
+    method: str = Field(max_length=10)
+    rateLimit: int = 100
+    ipWhitelist: Optional[List[str]] = []
+    requiresAuth: bool = True
+    isActive: bool = True
+
+KINDS = {
+    "integration": (IntegrationItem, Integration, lambda i, owner: {
+        "name": i.name, "description": i.description, "flow_config": i.flowConfig, "status": i.status, "owner_id": owner}),
+    "connector": (ConnectorItem, Connector, lambda i, owner: {
+        "name": i.name, "type": i.type, "description": i.description, "config": i.config, "status": i.status, "owner_id": owner}),
+    "endpoint": (EndpointItem, APIEndpoint, lambda i, owner: {
+        "name": i.name, "path": i.path, "method": i.method.upper(), "rate_limit": i.rateLimit,
+        "ip_whitelist": i.ipWhitelist or [], "requires_auth": i.requiresAuth, "is_active": i.isActive}),
+}
+PLURALS = {"integrations": "integration", "connectors": "connector", "endpoints": "endpoint"}
+
+def _error_text(e: Exception) -> str:
+    if isinstance(e, ValidationError):
+        return "; ".join(f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in e.errors())
+    return str(getattr(e, "orig", None) or e).strip().splitlines()[0]
+
+class BundleImporter:
+    """Accumulates validated rows and writes them a batch at a time; call add() then finish()"""
+    def __init__(self, db: Session, owner_id: int, atomic: bool = False):
+        self.db = db
+        self.owner_id = owner_id
+        self.atomic = atomic
+        self.created = {kind: 0 for kind in KINDS}
+        self.errors: List[dict] = []
+        self.error_count = 0
+        self._count = 0
+        self._aborted = False  # atomic import already failed in the database; only validate the rest
+        self._pending: Dict[str, List[tuple]] = {kind: [] for kind in KINDS}  # kind -> [(index, values)]
+
+    def _fail(self, index: int, kind: Optional[str], error: str):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"index": index, "kind": kind, "error": error})
+
+    def add(self, items: Iterable[Any]):
+        for item in items:
+            index = self._count
+            self._count += 1
+            if isinstance(item, Exception):  # undecodable line, already parsed into an error
+                self._fail(index, None, str(item))
+                continue
+            kind = item.get("kind") if isinstance(item, dict) else None
+            if kind not in KINDS:
+                self._fail(index, kind, f"kind must be one of {', '.join(KINDS)}")
+                continue
+            model, _, to_row = KINDS[kind]
+            try:
+                values = to_row(model.model_validate(item), self.owner_id)
+            except ValidationError as e:
+                self._fail(index, kind, _error_text(e))
+                continue
+            self._pending[kind].append((index, values))
+            if sum(len(p) for p in self._pending.values()) >= BATCH_SIZE:
+                self._flush()
+
+    def _insert(self, kind: str, rows: List[dict]):
+        self.db.execute(insert(KINDS[kind][1]), rows)
+
+    def _flush(self):
+        batch = {kind: pending for kind, pending in self._pending.items() if pending}
+        self._pending = {kind: [] for kind in KINDS}
+        if not batch or self._aborted:
+            return
+        try:
+            for kind, pending in batch.items():
+                self._insert(kind, [values for _, values in pending])
+            if not self.atomic:
+                self.db.commit()
+            for kind, pending in batch.items():
+                self.created[kind] += len(pending)
+            return
+        except Exception:
+            self.db.rollback()
+        # Retry row by row to find what the database rejects. A non-atomic import keeps the
+        # good rows; an atomic one has lost its transaction, so the retries only diagnose.
+        self._aborted = self.atomic
+        for kind, pending in batch.items():
+            for index, values in pending:
+                try:
+                    self._insert(kind, [values])
+                    if self.atomic:
+                        self.db.rollback()
+                    else:
+                        self.db.commit()
+                        self.created[kind] += 1
+                except Exception as e:
+                    self.db.rollback()
+                    self._fail(index, kind, _error_text(e))
+
+    def finish(self) -> dict:
+        self._flush()
+        if self.atomic and self.error_count:
+            self.db.rollback()
+            self.created = {kind: 0 for kind in KINDS}
+        else:
+            self.db.commit()
+        return {"received": self._count, "created": self.created, "failed": self.error_count,
+                "errors": self.errors, "atomic": self.atomic,
+                "committed": not (self.atomic and self.error_count)}
+
+def parse_ndjson_lines(lines: Iterable[bytes]) -> Iterator[Any]:
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError as e:
+            yield ValueError(f"Invalid JSON: {e}")
+
+def parse_yaml(body: bytes) -> Iterator[Any]:
+    for document in yaml.load_all(body, Loader=YamlLoader):
+        if isinstance(document, dict) and "kind" not in document and set(document) <= set(PLURALS):
+            for plural, items in document.items():
+                for item in items or []:
+                    yield {"kind": PLURALS[plural], **item} if isinstance(item, dict) else item
+        elif document is not None:
+            yield document
+
+def _redact(connector_type: str, config: Dict[str, Any]) -> Dict[str, Any]:
+    schema = CONNECTOR_TYPES.get(connector_type, {}).get("config_schema", {})
+    return {key: None if schema.get(key, {}).get("type") == "password" else value for key, value in config.items()}
+
+def _export_items(db: Session, user: User, kinds: List[str], include_secrets: bool = False) -> Iterator[dict]:
+    if "integration" in kinds:
+        query = db.query(Integration.name, Integration.description, Integration.flow_config, Integration.status)
+        if user.role != UserRole.ADMIN:
+            query = query.filter(Integration.owner_id == user.id)
+        for i in query.order_by(Integration.id).yield_per(BATCH_SIZE):
+            yield {"kind": "integration", "name": i.name, "description": i.description, "flowConfig": i.flow_config,
+                   "status": i.status.value if i.status else "draft"}
+    if "connector" in kinds:
+        query = db.query(Connector.name, Connector.type, Connector.description, Connector.config, Connector.status)
+        if user.role != UserRole.ADMIN:
+            query = query.filter(Connector.owner_id == user.id)
+        for c in query.order_by(Connector.id).yield_per(BATCH_SIZE):
+            config = c.config or {}
+            yield {"kind": "connector", "name": c.name, "type": c.type.value, "description": c.description,
+                   "config": config if include_secrets else _redact(c.type.value, config),
+                   "status": c.status.value if c.status else "inactive"}
+    if "endpoint" in kinds:
+        E = APIEndpoint
+        query = db.query(E.name, E.path, E.method, E.rate_limit, E.ip_whitelist, E.requires_auth, E.is_active)
+        for e in query.order_by(E.id).yield_per(BATCH_SIZE):
+            yield {"kind": "endpoint", "name": e.name, "path": e.path, "method": e.method, "rateLimit": e.rate_limit,
+                   "ipWhitelist": e.ip_whitelist or [], "requiresAuth": e.requires_auth, "isActive": e.is_active}
+
+def export_bundle(db: Session, user: User, kinds: List[str], fmt: str, include_secrets: bool = False) -> Iterator[bytes]:
+    """Encoded bundle chunks, roughly BATCH_SIZE items each"""
+    chunk: List[str] = []
+    for item in _export_items(db, user, kinds, include_secrets):
+        if fmt == "yaml":
+            chunk.append("---\n" + yaml.dump(item, Dumper=YamlDumper, sort_keys=False, allow_unicode=True))
+        else:
+            chunk.append(json.dumps(item, separators=(",", ":"), default=str) + "\n")
+        if len(chunk) >= BATCH_SIZE:
+            yield "".join(chunk).encode()
+            chunk = []
+    if chunk:
+        yield "".join(chunk).encode()
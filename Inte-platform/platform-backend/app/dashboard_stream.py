@@ -0,0 +1,179 @@
+"""Dashboard stats computed once per process and pushed to every viewer.
+
+A single asyncio task recomputes the dashboard stats and every integration's
+deployment status every DASHBOARD_PUSH_SECONDS. It wakes early when notify()
+reports a start, stop, deploy, create or delete. It runs only while someone is
+subscribed. Each result is encoded once as a Server-Sent Events frame, and the
+same bytes are queued for every subscriber, so the cost does not grow with the
+number of open dashboards. New subscribers get the cached `snapshot` frame.
+After that they get `update` frames that carry the stats plus only the
+integrations whose status changed. A subscriber that falls too far behind has
+its queue replaced by a fresh snapshot.
+
+`GET /api/dashboard/stats` reads the same cached result while it is fresh.
+"""
+import asyncio
+import json
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Set, Tuple
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.database import read_session
+from app.executions import execution_summary
+from app.metrics import record_dashboard_push, update_dashboard_subscribers
+from app.models import APIEndpoint, Integration, IntegrationStatus
+
+logger = logging.getLogger(__name__)
+
+SUBSCRIBER_BUFFER = 16
+KEEPALIVE_SECONDS = 15
+RETRY_MS = 5000  # EventSource reconnect delay
+MIN_GAP_SECONDS = 0.25  # coalesces bursts of notify() into one recompute
+KEEPALIVE = b": keepalive\n\n"
+
+def compute_stats(db: Session) -> Tuple[dict, Dict[int, dict]]:
+    """Dashboard stats plus {integration id: {name, status}}"""
+    api_count = db.query(APIEndpoint).filter(APIEndpoint.is_active == True).count()
+    integrations = {i.id: {"id": i.id, "name": i.name, "status": i.status.value if i.status else "draft"}
+                    for i in db.query(Integration.id, Integration.name, Integration.status)}
+    total = len(integrations)
+    active = sum(1 for i in integrations.values() if i["status"] == IntegrationStatus.DEPLOYED.value)
+    errors = sum(1 for i in integrations.values() if i["status"] == IntegrationStatus.ERROR.value)
+    error_rate = (errors / total * 100) if total > 0 else 0
+    # Records per minute averaged over the last hour of minute rollups
+    last_hour = execution_summary(db, datetime.utcnow() - timedelta(hours=1))
+    stats = {
+        "apiCount": api_count,
+        "activeIntegrations": active,
+        "errorRate": round(error_rate, 2),
+        "throughput": round(last_hour["records"] / 60)
+    }
+    return stats, integrations
+
+def _frame(event: str, seq: int, payload: dict) -> bytes:
+    data = json.dumps(payload, separators=(",", ":"), default=str)
+    return f"id: {seq}\nevent: {event}\ndata: {data}\n\n".encode()
+
+class StatsBroadcaster:
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._subscribers: Set[asyncio.Queue] = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._seq = 0
+        self._snapshot: Optional[bytes] = None
+        self._stats: Optional[dict] = None
+        self._integrations: Dict[int, dict] = {}  # as last pushed
+        self._pushed_stats: Optional[dict] = None
+        self._computed_at = 0.0
+        self._lock = threading.Lock()
+
+    async def start(self):
+        if self._task is None:
+            self._loop = asyncio.get_running_loop()
+            self._wake = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def notify(self):
+        """Ask for an early recompute; safe to call from request threads"""
+        self._computed_at = 0.0
+        if self._loop is not None and self._wake is not None:
+            self._loop.call_soon_threadsafe(self._wake.set)
+
+    def current(self, db: Session) -> dict:
+        """Cached stats if computed within the push interval, otherwise recompute with `db`"""
+        with self._lock:
+            if self._stats is not None and time.monotonic() - self._computed_at < self.interval:
+                return self._stats
+            self._stats, _ = compute_stats(db)
+            self._computed_at = time.monotonic()
+            return self._stats
+
+    def _compute(self) -> Tuple[dict, Dict[int, dict]]:
+        db = read_session()
+        try:
+            stats, integrations = compute_stats(db)
+        finally:
+            db.close()
+        with self._lock:
+            self._stats, self._computed_at = stats, time.monotonic()
+        return stats, integrations
+
+    async def _run(self):
+        while True:
+            if self._subscribers:
+                try:
+                    await self._publish()
+                except Exception:
+                    logger.exception("Dashboard stats push failed")
+                await asyncio.sleep(MIN_GAP_SECONDS)
+            else:
+                # Nobody listening: drop the baseline so the next subscriber starts from a fresh snapshot
+                self._snapshot, self._integrations, self._pushed_stats = None, {}, None
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+
+    async def _publish(self):
+        stats, integrations = await run_in_threadpool(self._compute)
+        first = self._snapshot is None
+        previous, previous_stats = self._integrations, self._pushed_stats
+        changed = [i for id, i in integrations.items() if previous.get(id) != i]
+        removed = [id for id in previous if id not in integrations]
+        self._integrations, self._pushed_stats = integrations, stats
+        self._seq += 1
+        at = datetime.utcnow().isoformat()
+        self._snapshot = _frame("snapshot", self._seq, {"stats": stats, "integrations": list(integrations.values()), "at": at})
+        if first:
+            self._broadcast(self._snapshot, "snapshot")
+        elif changed or removed or stats != previous_stats:
+            self._broadcast(_frame("update", self._seq, {"stats": stats, "changed": changed, "removed": removed, "at": at}), "update")
+
+    def _broadcast(self, frame: bytes, event: str):
+        for queue in self._subscribers:
+            try:
+                queue.put_nowait(frame)
+            except asyncio.QueueFull:
+                # Slow reader: its backlog is superseded by the current snapshot
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(self._snapshot)
+        record_dashboard_push(event, len(self._subscribers))
+
+    async def subscribe(self):
+        """Async iterator of encoded SSE frames for one client"""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_BUFFER)
+        if self._snapshot is not None:
+            queue.put_nowait(self._snapshot)
+        self._subscribers.add(queue)
+        update_dashboard_subscribers(len(self._subscribers))
+        if self._snapshot is None and self._wake is not None:
+            self._wake.set()
+        try:
+            yield f"retry: {RETRY_MS}\n\n".encode()
+            while True:
+                try:
+                    yield await asyncio.wait_for(queue.get(), KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield KEEPALIVE
+        finally:
+            self._subscribers.discard(queue)
+            update_dashboard_subscribers(len(self._subscribers))
+
+stats_broadcaster = StatsBroadcaster(settings.dashboard_push_seconds)
@@ -1,15 +1,165 @@
-from sqlalchemy import create_engine
+import hashlib
+import itertools
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+from fastapi import Depends, Request
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 from app.config import settings
+from app.metrics import record_db_session, update_pool_stats
+from app.timing import instrument_engine
+
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+def _instrument_pool(engine: Engine, name: str):
+    """Export checked-out / size / overflow per engine whenever a connection moves"""
+    pool = engine.pool
+    checked_out = [0]  # counted here because the checkin event fires before the pool takes the connection back
+    lock = threading.Lock()
+
+    def _update(delta: int):
+        with lock:
+            checked_out[0] += delta
+            size = pool.size() if hasattr(pool, "size") else 0
+            overflow = pool.overflow() if hasattr(pool, "overflow") else 0
+            update_pool_stats(name, checked_out[0], size, overflow)
+    event.listen(pool, "checkout", lambda *_: _update(1))
+    event.listen(pool, "checkin", lambda *_: _update(-1))
 
 engine = create_engine(settings.database_url)
+instrument_engine(engine)
+_instrument_pool(engine, "primary")
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
-def get_db():
+class Replica:
+    def __init__(self, name: str, url: str):
+        self.name = name
+        self.engine = create_engine(url, pool_pre_ping=True)
+        self.down_until = 0.0
+        instrument_engine(self.engine)
+        _instrument_pool(self.engine, name)
+
+        @event.listens_for(self.engine, "handle_error")
+        def _on_error(context):
+            # Connection-level failures take the replica out of rotation for a while
+            if context.is_disconnect or context.connection is None:
+                self.down_until = time.monotonic() + settings.replica_retry_seconds
+
+replicas: List[Replica] = [Replica(f"replica-{i}", url.strip())
+                           for i, url in enumerate(settings.database_replica_urls.split(",")) if url.strip()]
+_next_replica = itertools.count()
+
+def pick_replica() -> Optional[Replica]:
+    """Round-robin over replicas that are not marked down"""
+    if not replicas:
+        return None
+    now = time.monotonic()
+    start = next(_next_replica)
+    for offset in range(len(replicas)):
+        replica = replicas[(start + offset) % len(replicas)]
+        if replica.down_until <= now:
+            return replica
+    return None
+
+class RecentWrites:
+    """Who wrote within the read-your-writes window, shared between worker processes.
+
+    Marks live in memory and, when a directory is configured, as empty files
+    named by a hash of the caller key. Their mtime is the time of the write.
+    """
+    PRUNE_SECONDS = 60
+
+    def __init__(self, window: float, directory: str):
+        self.window = window
+        self.directory = directory
+        self._local: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._pruned = time.time()
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, hashlib.sha1(key.encode()).hexdigest())
+
+    def mark(self, key: str):
+        now = time.time()
+        with self._lock:
+            self._local[key] = now
+            prune = now - self._pruned > self.PRUNE_SECONDS
+            if prune:
+                self._pruned = now
+                self._local = {k: t for k, t in self._local.items() if now - t < self.window}
+        if self.directory:
+            path = self._path(key)
+            with open(path, "a"):
+                pass
+            os.utime(path, (now, now))
+            if prune:
+                for entry in os.scandir(self.directory):
+                    try:
+                        if now - entry.stat().st_mtime > self.window:
+                            os.unlink(entry.path)
+                    except FileNotFoundError:
+                        pass
+
+    def recent(self, key: str) -> bool:
+        now = time.time()
+        if now - self._local.get(key, 0) < self.window:
+            return True
+        if self.directory:
+            try:
+                return now - os.stat(self._path(key)).st_mtime < self.window
+            except FileNotFoundError:
+                return False
+        return False
+
+recent_writes = RecentWrites(settings.read_your_writes_seconds, settings.read_your_writes_dir if replicas else "")
+
+def _caller(request: Request) -> Optional[str]:
+    return request.headers.get("authorization") or request.query_params.get("token")
+
+def read_session() -> Session:
+    """Session on a replica when one is available, for background readers"""
+    replica = pick_replica()
+    return SessionLocal(bind=replica.engine) if replica else SessionLocal()
+
+def get_db(request: Request):
+    caller = _caller(request) if replicas else None
+    write = caller is not None and request.method not in SAFE_METHODS
+    if write:
+        recent_writes.mark(caller)
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+        if write:
+            # The window runs from the end of the write, however long it took
+            recent_writes.mark(caller)
+
+def get_read_db(request: Request, db: Session = Depends(get_db)):
+    """Replica session for reads; the request's primary session after this caller wrote recently"""
+    if not replicas:
+        yield db
+        return
+    caller = _caller(request)
+    if request.method not in SAFE_METHODS or (caller is not None and recent_writes.recent(caller)):
+        record_db_session("primary", "recent_write" if request.method in SAFE_METHODS else "write")
+        yield db
+        return
+    replica = pick_replica()
+    if replica is None:
+        record_db_session("primary", "replicas_down")
+        yield db
+        return
+    record_db_session(replica.name, "read")
+    session = SessionLocal(bind=replica.engine)
+    try:
+        yield session
+    finally:
+        session.close()
@@ -0,0 +1,316 @@
+"""Scale data generator for studying queries and indexes at large-tenant size.
+
+Runs the normal seed first, then bulk-loads generated users, integrations,
+connectors, API endpoints, API keys and execution history:
+
+    python -m app.datagen --users 1000 --integrations 50000 --logs 50000000 \\
+        --connectors 10000 --api-keys 100000
+    python -m app.datagen --scale 0.01      # same shape, 1% of the default size
+
+On PostgreSQL rows are streamed with COPY. Other databases get multi-row
+INSERTs of BATCH_ROWS rows. Each chunk is committed separately, so an
+interrupted run keeps what it has loaded. Every generated user shares one
+password that is hashed once up front. Integrations are skewed towards a
+few busy owners, as in production.
+
+Execution history is generated as runs of the new integrations, skewed
+towards a few busy ones and spread over the last --days days in time order.
+Each run writes LINES_PER_RUN log lines, one integration_executions row and
+its share of the minute and hour rollups, so --logs also sets the number of
+runs. The health engine, bulk health and dashboard throughput then see the
+same history as log search. The runs come from their own seeded random
+stream, which is replayed once per table, and rollups are summed one bucket
+at a time, so memory stays flat at any size.
+
+Generated rows are tagged with a per-run suffix (emails, names), so the
+generator can be run again against the same database to grow it.
+"""
+import argparse
+import csv
+import enum
+import io
+import itertools
+import json
+import random
+import secrets
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Iterator, List, NamedTuple, Sequence
+from sqlalchemy import Table, insert, text
+from app.auth import get_password_hash
+from app.database import engine
+from app.executions import GRANULARITIES, bucket_start
+from app.models import (APIEndpoint, APIKey, Connector, ConnectorStatus, ConnectorType, Integration,
+                        IntegrationExecution, IntegrationExecutionRollup, IntegrationLog, IntegrationStatus, User,
+                        UserRole)
+from app.seed import seed_database
+
+BATCH_ROWS = 10000
+COPY_ROWS = 200000
+
+DEFAULTS = {"users": 1000, "integrations": 50000, "connectors": 10000, "endpoints": 5000,
+            "api_keys": 100000, "logs": 50000000}
+
+SOURCES = ['timer:sync?period=60000', 'kafka:orders', 'webhook:payments', 'webhook:shipments', 'direct:aggregate',
+           'timer:check?period=300000', 'kafka:inventory']
+TARGETS = ["http://crm-api/customers", "http://erp-api/orders", "http://erp-api/inventory",
+           "http://accounting-api/transactions"]
+STATUSES = ([IntegrationStatus.DEPLOYED] * 12 + [IntegrationStatus.STOPPED] * 4 + [IntegrationStatus.DRAFT] * 3
+            + [IntegrationStatus.ERROR])
+RESOURCES = ["customers", "orders", "inventory", "invoices", "shipments", "payments", "products", "accounts"]
+METHODS = ["GET", "GET", "GET", "POST", "PUT", "DELETE"]
+LINES_PER_RUN = 5
+FAILURE_RATE = 0.04
+SLOW_MS = 1000
+ERRORS = {"ConnectionError": "ConnectionError: Failed to complete execution",
+          "TimeoutError": "TimeoutError: source did not answer in {ms}ms",
+          "DeliveryFailed": "{n} records not delivered; will be retried next run"}
+
+class Run(NamedTuple):
+    integration_id: int
+    started_at: datetime
+    duration_ms: float
+    records: int
+    success: bool
+    error_type: str
+
+def _skewed(ids: Sequence[int], rng: random.Random, exponent: float = 1.0) -> List[float]:
+    """Cumulative Zipf-like weights over `ids` in a shuffled order, for rng.choices(cum_weights=...)"""
+    ranks = list(range(1, len(ids) + 1))
+    rng.shuffle(ranks)
+    return list(itertools.accumulate(1.0 / r ** exponent for r in ranks))
+
+def _copy_value(value):
+    if isinstance(value, enum.Enum):
+        return value.name  # SQLAlchemy stores Enum columns by member name
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, separators=(",", ":"))
+    if isinstance(value, datetime):
+        return value.isoformat(sep=" ")
+    return value
+
+class BulkWriter:
+    """Writes row tuples for a table with COPY on PostgreSQL and multi-row INSERTs elsewhere"""
+    def __init__(self):
+        self.copy = engine.dialect.name == "postgresql"
+
+    def write(self, table: Table, columns: List[str], rows: Iterator[tuple]) -> int:
+        written = 0
+        chunk_rows = COPY_ROWS if self.copy else BATCH_ROWS
+        while True:
+            chunk = list(itertools.islice(rows, chunk_rows))
+            if not chunk:
+                return written
+            if self.copy:
+                self._copy(table, columns, chunk)
+            else:
+                with engine.begin() as conn:
+                    conn.execute(insert(table), [dict(zip(columns, row)) for row in chunk])
+            written += len(chunk)
+
+    def _copy(self, table: Table, columns: List[str], chunk: List[tuple]):
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in chunk:
+            writer.writerow([_copy_value(v) for v in row])
+        buffer.seek(0)
+        raw = engine.raw_connection()
+        try:
+            with raw.cursor() as cursor:
+                cursor.copy_expert(f"COPY {table.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+            raw.commit()
+        finally:
+            raw.close()
+
+def _ids(table: Table, column, pattern: str) -> List[int]:
+    with engine.connect() as conn:
+        return [row[0] for row in conn.execute(table.select().with_only_columns(table.c.id)
+                                              .where(column.like(pattern)).order_by(table.c.id))]
+
+class Generator:
+    def __init__(self, counts: dict, password: str, days: float, seed: int, tag: str):
+        self.counts = counts
+        self.password = password
+        self.days = days
+        self.rng = random.Random(seed)
+        self.tag = tag
+        self.now = datetime.utcnow()
+        self.writer = BulkWriter()
+
+    def _ago(self) -> datetime:
+        return self.now - timedelta(seconds=self.rng.random() * self.days * 86400)
+
+    def _load(self, name: str, model, columns: List[str], rows: Callable[[], Iterator[tuple]]):
+        if self.counts.get(name) == 0:
+            return
+        started = time.time()
+        written = self.writer.write(model.__table__, columns, rows())
+        elapsed = time.time() - started
+        print(f"  {name:<13}{written:>12,} rows in {elapsed:7.1f}s ({written / max(elapsed, 1e-9):,.0f}/s)")
+
+    def users(self) -> Iterator[tuple]:
+        hashed = self.hashed_password
+        roles = [UserRole.DEVELOPER] * 8 + [UserRole.VIEWER] + [UserRole.ADMIN]
+        for n in range(self.counts["users"]):
+            yield (f"user{n}.{self.tag}@datagen.example.com", hashed, f"Generated User {n}", self.rng.choice(roles), True,
+                   self._ago())
+
+    def integrations(self, owners: List[int]) -> Iterator[tuple]:
+        weights = _skewed(owners, self.rng)
+        rng = self.rng
+        for n in range(self.counts["integrations"]):
+            source, target = rng.choice(SOURCES), rng.choice(TARGETS)
+            created = self._ago()
+            yield (f"{source.split(':')[0].title()} to {target.split('/')[-1]} {n}-{self.tag}",
+                   f"Generated integration {n} from {source} to {target}",
+                   f'routes:\n  - from: "{source}"\n    to: "{target}"',
+                   rng.choice(STATUSES), rng.choices(owners, cum_weights=weights)[0], created, created)
+
+    def connectors(self, owners: List[int]) -> Iterator[tuple]:
+        rng = self.rng
+        types = list(ConnectorType)
+        statuses = [ConnectorStatus.ACTIVE] * 6 + [ConnectorStatus.INACTIVE] * 3 + [ConnectorStatus.ERROR]
+        for n in range(self.counts["connectors"]):
+            kind = rng.choice(types)
+            created = self._ago()
+            yield (f"{kind.value} connector {n}-{self.tag}", kind, f"Generated {kind.value} connector",
+                   {"host": f"{kind.value}-{n % 50}.internal", "port": rng.choice([443, 5432, 9092, 21]),
+                    "username": f"svc_{n}", "timeout": 30},
+                   rng.choice(statuses), rng.choice(owners), created, created)
+
+    def endpoints(self) -> Iterator[tuple]:
+        rng = self.rng
+        for n in range(self.counts["endpoints"]):
+            resource, method = rng.choice(RESOURCES), rng.choice(METHODS)
+            whitelist = ["10.0.0.0/8"] if rng.random() < 0.1 else []
+            yield (f"{method.title()} {resource} {n}-{self.tag}", f"/api/v1/{resource}/{self.tag}/{n}", method,
+                   rng.choice([50, 100, 200, 500, 1000]), whitelist, rng.random() < 0.8, rng.random() < 0.9,
+                   self._ago())
+
+    def api_keys(self, users: List[int]) -> Iterator[tuple]:
+        rng = self.rng
+        weights = _skewed(users, rng)
+        for n in range(self.counts["api_keys"]):
+            # token_hex, not the seeded rng, so reruns with the same --seed cannot collide on the unique key
+            yield (secrets.token_hex(32), f"Generated key {n}", rng.choices(users, cum_weights=weights)[0],
+                   rng.random() < 0.9, self._ago())
+
+    def runs(self, integrations: List[int], weights: List[float], seed: int) -> Iterator[Run]:
+        """Executions in start order; the same seed always yields the same runs"""
+        rng = random.Random(seed)
+        remaining = self.counts["logs"] // LINES_PER_RUN
+        mean_gap = self.days * 86400 / remaining
+        started = self.now - timedelta(days=self.days)
+        while remaining:
+            n = min(remaining, BATCH_ROWS)
+            remaining -= n
+            for integration_id in rng.choices(integrations, cum_weights=weights, k=n):
+                started = min(started + timedelta(seconds=rng.expovariate(1 / mean_gap)), self.now)
+                success = rng.random() >= FAILURE_RATE
+                yield Run(integration_id, started, round(rng.lognormvariate(5, 0.8), 2), rng.randrange(1, 500),
+                          success, None if success else rng.choice(list(ERRORS)))
+
+    def logs(self, runs: Iterator[Run]) -> Iterator[tuple]:
+        for run in runs:
+            records, ms = run.records, round(run.duration_ms)
+            fetched, transformed, synced, finished = (run.started_at + timedelta(milliseconds=ms * f)
+                                                      for f in (0.3, 0.6, 0.9, 1.0))
+            yield (run.integration_id, "INFO", "Execution triggered", run.started_at)
+            yield (run.integration_id, "INFO", f"Fetched {records} changed records from source", fetched)
+            if run.duration_ms > SLOW_MS:
+                yield (run.integration_id, "WARN", f"Slow response detected: {ms}ms", transformed)
+            else:
+                yield (run.integration_id, "INFO", "Data transformation completed", transformed)
+            if run.success:
+                yield (run.integration_id, "INFO", f"Synced {records} records", synced)
+                yield (run.integration_id, "INFO", f"Execution completed successfully in {ms}ms", finished)
+            else:
+                yield (run.integration_id, "ERROR", ERRORS[run.error_type].format(n=records, ms=ms), synced)
+                yield (run.integration_id, "ERROR", f"Execution failed in {ms}ms", finished)
+
+    def executions(self, runs: Iterator[Run]) -> Iterator[tuple]:
+        for run in runs:
+            yield (run.integration_id, run.started_at, run.duration_ms, run.records, run.success, run.error_type)
+
+    def rollups(self, runs: Callable[[], Iterator[Run]]) -> Iterator[tuple]:
+        """Minute and hour buckets; runs arrive in start order, so a bucket is complete once the next one begins"""
+        for granularity in GRANULARITIES:
+            current, buckets = None, {}
+            for run in itertools.chain(runs(), [None]):
+                start = bucket_start(run.started_at, granularity) if run else None
+                if start != current:
+                    for integration_id, (executions, successes, records, total, longest) in buckets.items():
+                        yield (integration_id, granularity, current, executions, successes, executions - successes,
+                               records, round(total, 2), longest)
+                    current, buckets = start, {}
+                if run is None:
+                    break
+                bucket = buckets.setdefault(run.integration_id, [0, 0, 0, 0.0, 0.0])
+                bucket[0] += 1
+                bucket[1] += run.success
+                bucket[2] += run.records
+                bucket[3] += run.duration_ms
+                bucket[4] = max(bucket[4], run.duration_ms)
+
+    def run(self):
+        started = time.time()
+        self.hashed_password = get_password_hash(self.password)  # bcrypt once, not once per user
+        U, I = User.__table__, Integration.__table__
+        self._load("users", User, ["email", "hashed_password", "full_name", "role", "is_active", "created_at"], self.users)
+        users = _ids(U, U.c.email, f"%.{self.tag}@datagen.example.com") or _ids(U, U.c.email, "%")
+        self._load("integrations", Integration,
+                   ["name", "description", "flow_config", "status", "owner_id", "created_at", "updated_at"],
+                   lambda: self.integrations(users))
+        self._load("connectors", Connector,
+                   ["name", "type", "description", "config", "status", "owner_id", "created_at", "updated_at"],
+                   lambda: self.connectors(users))
+        self._load("endpoints", APIEndpoint,
+                   ["name", "path", "method", "rate_limit", "ip_whitelist", "requires_auth", "is_active", "created_at"],
+                   self.endpoints)
+        self._load("api_keys", APIKey, ["key", "name", "user_id", "is_active", "created_at"], lambda: self.api_keys(users))
+        # Only this run's integrations get history, so rollups never collide with existing buckets
+        integrations = _ids(I, I.c.name, f"%-{self.tag}")
+        if self.counts["logs"] >= LINES_PER_RUN and integrations:
+            weights = _skewed(integrations, self.rng, 0.8)
+            seed = self.rng.randrange(2 ** 32)
+            runs = lambda: self.runs(integrations, weights, seed)
+            self._load("logs", IntegrationLog, ["integration_id", "level", "message", "timestamp"],
+                       lambda: self.logs(runs()))
+            self._load("executions", IntegrationExecution,
+                       ["integration_id", "started_at", "duration_ms", "records", "success", "error_type"],
+                       lambda: self.executions(runs()))
+            self._load("rollups", IntegrationExecutionRollup,
+                       ["integration_id", "granularity", "bucket_start", "executions", "successes", "failures",
+                        "records", "total_duration_ms", "max_duration_ms"],
+                       lambda: self.rollups(runs))
+        elif self.counts["logs"]:
+            print("  logs: skipped, no integrations were generated in this run")
+        if self.writer.copy:
+            # Fresh statistics, so query plans reflect the new size
+            with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+                for model in (User, Integration, Connector, APIEndpoint, APIKey, IntegrationLog, IntegrationExecution,
+                              IntegrationExecutionRollup):
+                    conn.execute(text(f"ANALYZE {model.__tablename__}"))
+        print(f"Generated data tagged '{self.tag}' in {time.time() - started:.1f}s; "
+              f"users log in with password '{self.password}'")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    for name, default in DEFAULTS.items():
+        parser.add_argument(f"--{name.replace('_', '-')}", type=int, default=default, help=f"default {default:,}")
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiply every count, e.g. 0.01 for a quick run")
+    parser.add_argument("--days", type=float, default=30, help="Spread timestamps over this many days back")
+    parser.add_argument("--password", default="datagen123", help="Password of every generated user")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for the generated content")
+    parser.add_argument("--tag", default=None, help="Suffix for generated emails and names; random by default")
+    args = parser.parse_args(argv)
+    counts = {name: int(getattr(args, name) * args.scale) for name in DEFAULTS}
+    seed_database()
+    print(f"Loading into {engine.url.render_as_string(hide_password=True)} "
+          f"({'COPY' if engine.dialect.name == 'postgresql' else f'{BATCH_ROWS}-row INSERTs'})")
+    Generator(counts, args.password, args.days, args.seed, args.tag or secrets.token_hex(3)).run()
+
+if __name__ == "__main__":
+    main()
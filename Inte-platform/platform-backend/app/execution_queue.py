@@ -0,0 +1,284 @@
+"""Durable DB-backed execution queue and the worker pool that drains it.
+
+Jobs are rows in `execution_jobs`. On PostgreSQL a worker claims the oldest
+eligible job with SELECT ... FOR UPDATE SKIP LOCKED, then takes a
+transaction-scoped advisory lock on the integration to re-check its
+concurrency limit. SQLite serializes writers, so a single conditional UPDATE
+with the same eligibility subquery claims atomically and the row is found
+again by its claim token.
+
+A running job's worker renews `heartbeat_at` every third of the lease, and
+only jobs whose heartbeat is older than EXECUTION_LEASE_SECONDS are treated
+as abandoned, so long runs are not picked up twice. Failed attempts are
+retried after an exponential backoff held in `not_before`. A webhook job
+whose destination rejected some events is retried the same way with only
+those events. A job whose integration is missing or not deployed fails at once.
+"""
+import logging
+import os
+import socket
+import threading
+import uuid
+from datetime import datetime, timedelta
+from typing import Optional
+from sqlalchemy import func, or_, select, update, text
+from sqlalchemy.orm import Session, aliased
+from app.config import settings
+from app.database import SessionLocal
+from app.executor import run_integration
+from app.integration_cache import integration_cache
+from app.models import ExecutionJob, ExecutionJobStatus, IntegrationStatus
+from app.metrics import record_queue_job, update_queue_depth
+
+logger = logging.getLogger(__name__)
+
+QUEUED = ExecutionJobStatus.QUEUED.value
+RUNNING = ExecutionJobStatus.RUNNING.value
+SUCCEEDED = ExecutionJobStatus.SUCCEEDED.value
+FAILED = ExecutionJobStatus.FAILED.value
+ADVISORY_LOCK_CLASS = 7351  # namespaces pg_advisory_xact_lock(class, integration_id)
+
+def enqueue(db: Session, integration_id: int, trigger: str = "manual", payload: Optional[dict] = None) -> ExecutionJob:
+    job = ExecutionJob(integration_id=integration_id, status=QUEUED, trigger=trigger, payload=payload, payload_version=0,
+                       attempts=0)
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+def _running_count(integration_id_column):
+    running = aliased(ExecutionJob)
+    return (select(func.count()).select_from(running)
+            .where(running.integration_id == integration_id_column, running.status == RUNNING)
+            .scalar_subquery())
+
+def _claimable(now: datetime):
+    J = ExecutionJob
+    return (J.status == QUEUED, or_(J.not_before.is_(None), J.not_before <= now))
+
+def _claim_postgres(db: Session, worker_id: str, limit: int) -> Optional[int]:
+    J = ExecutionJob
+    now = datetime.utcnow()
+    candidate = db.execute(
+        select(J.id, J.integration_id)
+        .where(*_claimable(now), _running_count(J.integration_id) < limit)
+        .order_by(J.id)
+        .limit(1)
+        .with_for_update(skip_locked=True, of=J)
+    ).first()
+    if candidate is None:
+        db.rollback()
+        return None
+    db.execute(text("SELECT pg_advisory_xact_lock(:cls, :iid)"), {"cls": ADVISORY_LOCK_CLASS, "iid": candidate.integration_id})
+    running = db.execute(select(func.count()).where(J.integration_id == candidate.integration_id, J.status == RUNNING)).scalar()
+    if running >= limit:
+        db.rollback()
+        return None
+    db.execute(update(J).where(J.id == candidate.id).values(
+        status=RUNNING, worker_id=worker_id, started_at=now, heartbeat_at=now, attempts=J.attempts + 1))
+    db.commit()
+    return candidate.id
+
+def _claim_sqlite(db: Session, worker_id: str, limit: int) -> Optional[int]:
+    J = ExecutionJob
+    token = uuid.uuid4().hex
+    now = datetime.utcnow()
+    candidate = (select(J.id)
+                 .where(*_claimable(now), _running_count(J.integration_id) < limit)
+                 .order_by(J.id)
+                 .limit(1)
+                 .scalar_subquery())
+    result = db.execute(update(J).where(J.id == candidate, J.status == QUEUED).values(
+        status=RUNNING, worker_id=worker_id, claim_token=token, started_at=now, heartbeat_at=now, attempts=J.attempts + 1
+    ).execution_options(synchronize_session=False))
+    db.commit()
+    if result.rowcount == 0:
+        return None
+    return db.execute(select(J.id).where(J.claim_token == token)).scalar()
+
+def claim_next(db: Session, worker_id: str) -> Optional[ExecutionJob]:
+    """Atomically move the oldest eligible queued job to running and return it"""
+    limit = settings.execution_concurrency_per_integration
+    if db.get_bind().dialect.name == "postgresql":
+        job_id = _claim_postgres(db, worker_id, limit)
+    else:
+        job_id = _claim_sqlite(db, worker_id, limit)
+    return db.get(ExecutionJob, job_id) if job_id is not None else None
+
+def requeue_stale(db: Session) -> int:
+    """Return jobs whose worker stopped heartbeating to the queue (or fail them after max attempts)"""
+    J = ExecutionJob
+    cutoff = datetime.utcnow() - timedelta(seconds=settings.execution_lease_seconds)
+    stale = db.query(J).filter(J.status == RUNNING, func.coalesce(J.heartbeat_at, J.started_at) < cutoff).all()
+    for job in stale:
+        if job.attempts >= settings.execution_max_attempts:
+            job.status, job.error, job.finished_at = FAILED, "Lease expired after max attempts", datetime.utcnow()
+        else:
+            job.status, job.worker_id = QUEUED, None
+    db.commit()
+    return len(stale)
+
+def queue_depth(db: Session) -> dict:
+    J = ExecutionJob
+    rows = db.query(J.status, func.count()).filter(J.status.in_([QUEUED, RUNNING])).group_by(J.status).all()
+    depth = {QUEUED: 0, RUNNING: 0}
+    depth.update({status: count for status, count in rows})
+    return depth
+
+class Heartbeat:
+    """Renews a running job's lease from a side thread until the block exits"""
+    def __init__(self, job_id: int, worker_id: str):
+        self.job_id = job_id
+        self.worker_id = worker_id
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._loop, name=f"heartbeat-{job_id}", daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+    def _loop(self):
+        J = ExecutionJob
+        while not self._stop.wait(settings.execution_lease_seconds / 3):
+            db = SessionLocal()
+            try:
+                db.execute(update(J).where(J.id == self.job_id, J.status == RUNNING, J.worker_id == self.worker_id)
+                           .values(heartbeat_at=datetime.utcnow()))
+                db.commit()
+            except Exception:
+                logger.exception("Heartbeat for execution job %s failed", self.job_id)
+                db.rollback()
+            finally:
+                db.close()
+
+def _retry_later(job: ExecutionJob):
+    job.status = QUEUED
+    job.not_before = datetime.utcnow() + timedelta(
+        seconds=settings.execution_retry_backoff_seconds * 2 ** max(job.attempts - 1, 0))
+
+def process_job(db: Session, job: ExecutionJob):
+    integration = integration_cache.get(db, job.integration_id)
+    if integration is None or integration.status != IntegrationStatus.DEPLOYED:
+        # Retrying cannot help until someone deploys it again
+        job.status, job.error = FAILED, "Integration is missing or no longer deployed"
+    else:
+        try:
+            with Heartbeat(job.id, job.worker_id):
+                result = run_integration(db, integration, job.payload)
+            job.status = SUCCEEDED if result["success"] else FAILED
+            job.result = result
+            job.error = result.get("errorType")
+            undelivered = result.get("undeliveredEvents")
+            if undelivered and job.attempts < settings.execution_max_attempts:
+                events = job.payload["events"]
+                job.payload = {**job.payload, "events": [events[i] for i in undelivered]}
+                _retry_later(job)
+        except Exception as e:
+            db.rollback()
+            logger.exception("Execution job %s failed", job.id)
+            job.error = str(e)
+            if job.attempts < settings.execution_max_attempts:
+                _retry_later(job)
+            else:
+                job.status = FAILED
+    if job.status != QUEUED:
+        job.finished_at = datetime.utcnow()
+    wait = (job.started_at - job.enqueued_at).total_seconds() if job.started_at and job.enqueued_at else 0.0
+    record_queue_job(job.status, wait)
+    db.commit()
+
+class ExecutionWorkerPool:
+    def __init__(self, workers: int):
+        self.workers = workers
+        self._stop = threading.Event()
+        self._wake = threading.Condition()
+        self._threads = []
+        self._prefix = f"{socket.gethostname()}:{os.getpid()}"
+
+    def start(self):
+        for n in range(self.workers):
+            thread = threading.Thread(target=self._loop, args=(f"{self._prefix}:{n}", n == 0),
+                                      name=f"execution-worker-{n}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout: float = 10.0):
+        self._stop.set()
+        self.notify(all_workers=True)
+        for thread in self._threads:
+            thread.join(timeout=timeout)
+
+    def notify(self, all_workers: bool = False):
+        """Wake idle workers in this process after an enqueue"""
+        with self._wake:
+            if all_workers:
+                self._wake.notify_all()
+            else:
+                self._wake.notify()
+
+    def _maintain(self, db: Session):
+        requeue_stale(db)
+        update_queue_depth(queue_depth(db))
+
+    def _loop(self, worker_id: str, maintainer: bool):
+        last_maintenance = 0.0
+        while not self._stop.is_set():
+            job = None
+            db = SessionLocal()
+            try:
+                now = datetime.utcnow().timestamp()
+                if maintainer and now - last_maintenance >= 5:
+                    self._maintain(db)
+                    last_maintenance = now
+                job = claim_next(db, worker_id)
+                if job is not None:
+                    process_job(db, job)
+            except Exception:
+                logger.exception("Execution worker %s error", worker_id)
+                db.rollback()
+            finally:
+                db.close()
+            if job is None:
+                with self._wake:
+                    self._wake.wait(timeout=settings.execution_poll_seconds)
+
+worker_pool: Optional[ExecutionWorkerPool] = None
+
+def run_queued(worker_id: str) -> int:
+    """Run due queued jobs in the calling thread until none is left; returns how many ran.
+
+    For processes without a worker pool (EXECUTION_WORKERS=0), where the
+    webhook dispatcher runs the jobs it enqueues, including their retries.
+    """
+    ran = 0
+    db = SessionLocal()
+    try:
+        requeue_stale(db)
+        while True:
+            job = claim_next(db, worker_id)
+            if job is None:
+                return ran
+            process_job(db, job)
+            ran += 1
+    except Exception:
+        logger.exception("Inline execution by %s failed", worker_id)
+        db.rollback()
+        return ran
+    finally:
+        db.close()
+
+def start_worker_pool():
+    global worker_pool
+    if settings.execution_workers > 0 and worker_pool is None:
+        worker_pool = ExecutionWorkerPool(settings.execution_workers)
+        worker_pool.start()
+
+def stop_worker_pool():
+    global worker_pool
+    if worker_pool is not None:
+        worker_pool.stop()
+        worker_pool = None
@@ -0,0 +1,89 @@
+from datetime import datetime, timedelta
+from typing import Optional
+from sqlalchemy import func
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from app.models import IntegrationExecution, IntegrationExecutionRollup
+
+GRANULARITIES = {"minute": timedelta(minutes=1), "hour": timedelta(hours=1)}
+
+def bucket_start(ts: datetime, granularity: str) -> datetime:
+    if granularity == "hour":
+        return ts.replace(minute=0, second=0, microsecond=0)
+    return ts.replace(second=0, microsecond=0)
+
+def _upsert_rollup(db: Session, values: dict):
+    """Add one execution's totals into its bucket row, creating the row if needed"""
+    dialect = db.get_bind().dialect.name
+    insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+    greatest = func.greatest if dialect == "postgresql" else func.max
+    R = IntegrationExecutionRollup
+    stmt = insert(R).values(**values)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[R.integration_id, R.granularity, R.bucket_start],
+        set_={
+            "executions": R.executions + stmt.excluded.executions,
+            "successes": R.successes + stmt.excluded.successes,
+            "failures": R.failures + stmt.excluded.failures,
+            "records": R.records + stmt.excluded.records,
+            "total_duration_ms": R.total_duration_ms + stmt.excluded.total_duration_ms,
+            "max_duration_ms": greatest(R.max_duration_ms, stmt.excluded.max_duration_ms),
+        },
+    )
+    db.execute(stmt)
+
+def record_integration_execution(db: Session, integration_id: int, started_at: datetime, duration: float,
+                                 records: int, success: bool, error_type: Optional[str] = None) -> IntegrationExecution:
+    """Store a finished execution and fold it into the minute/hour rollups (caller commits)"""
+    duration_ms = duration * 1000
+    execution = IntegrationExecution(integration_id=integration_id, started_at=started_at, duration_ms=duration_ms,
+                                     records=records, success=success, error_type=error_type)
+    db.add(execution)
+    for granularity in GRANULARITIES:
+        _upsert_rollup(db, {
+            "integration_id": integration_id,
+            "granularity": granularity,
+            "bucket_start": bucket_start(started_at, granularity),
+            "executions": 1,
+            "successes": 1 if success else 0,
+            "failures": 0 if success else 1,
+            "records": records,
+            "total_duration_ms": duration_ms,
+            "max_duration_ms": duration_ms,
+        })
+    return execution
+
+def execution_summary(db: Session, since: datetime, integration_id: Optional[int] = None, granularity: str = "minute") -> dict:
+    """Aggregate rollup buckets starting at or after `since`"""
+    R = IntegrationExecutionRollup
+    query = db.query(
+        func.coalesce(func.sum(R.executions), 0),
+        func.coalesce(func.sum(R.successes), 0),
+        func.coalesce(func.sum(R.failures), 0),
+        func.coalesce(func.sum(R.records), 0),
+        func.coalesce(func.sum(R.total_duration_ms), 0.0),
+        func.coalesce(func.max(R.max_duration_ms), 0.0),
+    ).filter(R.granularity == granularity, R.bucket_start >= bucket_start(since, granularity))
+    if integration_id is not None:
+        query = query.filter(R.integration_id == integration_id)
+    executions, successes, failures, records, total_ms, max_ms = query.one()
+    return {
+        "executions": executions,
+        "successes": successes,
+        "failures": failures,
+        "records": records,
+        "successRate": round(successes / executions * 100, 2) if executions else None,
+        "avgDurationMs": round(total_ms / executions, 2) if executions else None,
+        "maxDurationMs": round(max_ms, 2) if executions else None,
+    }
+
+def execution_series(db: Session, integration_id: int, since: datetime, granularity: str = "hour") -> list:
+    R = IntegrationExecutionRollup
+    buckets = db.query(R).filter(
+        R.integration_id == integration_id,
+        R.granularity == granularity,
+        R.bucket_start >= bucket_start(since, granularity),
+    ).order_by(R.bucket_start).all()
+    return [{"bucketStart": b.bucket_start, "executions": b.executions, "successes": b.successes, "failures": b.failures,
+             "records": b.records, "avgDurationMs": round(b.total_duration_ms / b.executions, 2) if b.executions else None,
+             "maxDurationMs": b.max_duration_ms} for b in buckets]
@@ -0,0 +1,179 @@
+"""Per-integration record fingerprints used to skip unchanged records on sync.
+
+Each (integration, source) pair keeps a dict of record key -> 64-bit content
+digest. It is persisted as one zlib-compressed blob (keys joined by NUL plus a
+packed array of digests) and cached in-process by version, so a steady-state
+run costs one small version lookup instead of reloading the blob.
+"""
+import json
+import sys
+import threading
+import zlib
+from array import array
+from collections import OrderedDict
+from datetime import datetime
+from dataclasses import dataclass, field
+from hashlib import blake2b
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.models import IntegrationFingerprintSet
+
+def record_key(record: dict) -> str:
+    return str(record.get("id", record.get("sku", "")))
+
+def record_digest(record: dict) -> int:
+    payload = json.dumps(record, sort_keys=True, separators=(",", ":"), default=str).encode()
+    return int.from_bytes(blake2b(payload, digest_size=8).digest(), "big")
+
+@dataclass
+class ChangeSet:
+    inserted: List[dict] = field(default_factory=list)
+    changed: List[dict] = field(default_factory=list)
+    deleted: List[str] = field(default_factory=list)
+    unchanged: int = 0
+    digests: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def records(self) -> List[dict]:
+        return self.inserted + self.changed
+
+    @property
+    def outgoing(self) -> List[dict]:
+        """What a run emits downstream: inserted and changed records, then a tombstone per deleted key"""
+        return self.records + [{"id": key, "_deleted": True} for key in self.deleted]
+
+    def __len__(self):
+        return len(self.inserted) + len(self.changed) + len(self.deleted)
+
+    def discard(self, keys: Iterable[str]):
+        """Forget what was not delivered, so the next run sees it again.
+
+        Undelivered records lose their digests and count as changed; undelivered
+        tombstones stay out of `deleted`, so their keys remain in the store and
+        the next full fetch reports them deleted again.
+        """
+        keys = set(keys)
+        for key in keys:
+            self.digests.pop(key, None)
+        self.deleted = [key for key in self.deleted if key not in keys]
+
+class FingerprintStore:
+    def __init__(self, entries: Optional[Dict[str, int]] = None, version: int = 0):
+        self.entries = entries or {}
+        self.version = version
+
+    def __len__(self):
+        return len(self.entries)
+
+    def diff(self, records: Iterable[dict], full: bool = False) -> ChangeSet:
+        """Classify records against the stored digests.
+
+        Deletions can only be inferred from a full fetch, so they are reported
+        only when `full` is set.
+        """
+        changes = ChangeSet()
+        seen = set()
+        for record in records:
+            key = record_key(record)
+            digest = record_digest(record)
+            seen.add(key)
+            previous = self.entries.get(key)
+            if previous is None:
+                changes.inserted.append(record)
+            elif previous != digest:
+                changes.changed.append(record)
+            else:
+                changes.unchanged += 1
+                continue
+            changes.digests[key] = digest
+        if full:
+            changes.deleted = [key for key in self.entries if key not in seen]
+        return changes
+
+    def applied(self, changes: ChangeSet) -> "FingerprintStore":
+        """New store with the change set applied; cached stores are shared and never mutated"""
+        entries = dict(self.entries)
+        entries.update(changes.digests)
+        for key in changes.deleted:
+            entries.pop(key, None)
+        return FingerprintStore(entries, version=self.version)
+
+    def to_bytes(self) -> bytes:
+        keys = list(self.entries)
+        digests = array("Q", (self.entries[k] for k in keys))
+        if sys.byteorder == "big":
+            digests.byteswap()
+        key_blob = "\0".join(keys).encode()
+        header = len(keys).to_bytes(4, "big") + len(key_blob).to_bytes(4, "big")
+        return zlib.compress(header + key_blob + digests.tobytes())
+
+    @classmethod
+    def from_bytes(cls, data: Optional[bytes], version: int = 0) -> "FingerprintStore":
+        if not data:
+            return cls(version=version)
+        raw = zlib.decompress(data)
+        count = int.from_bytes(raw[:4], "big")
+        key_len = int.from_bytes(raw[4:8], "big")
+        keys = raw[8:8 + key_len].decode().split("\0") if count else []
+        digests = array("Q")
+        digests.frombytes(raw[8 + key_len:])
+        if sys.byteorder == "big":
+            digests.byteswap()
+        return cls(dict(zip(keys, digests)), version=version)
+
+_cache: "OrderedDict[Tuple[int, str], FingerprintStore]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+def load_store(db: Session, integration_id: int, source: str) -> FingerprintStore:
+    """Return the current store, reusing the in-process copy when its version is current"""
+    F = IntegrationFingerprintSet
+    row = db.query(F.id, F.version).filter(F.integration_id == integration_id, F.source == source).first()
+    key = (integration_id, source)
+    if row is None:
+        return FingerprintStore()
+    with _cache_lock:
+        cached = _cache.get(key)
+        if cached is not None and cached.version == row.version:
+            _cache.move_to_end(key)
+            return cached
+    data = db.query(F.data).filter(F.id == row.id).scalar()
+    return FingerprintStore.from_bytes(data, version=row.version)
+
+def save_store(db: Session, integration_id: int, source: str, store: FingerprintStore) -> bool:
+    """Stage the packed store in the caller's transaction; it is cached under its new version after commit.
+
+    The write only applies on top of the version the store was loaded from. If
+    another run saved in between, nothing is written and False is returned;
+    this run's digests are lost and its records count as changed next time.
+    """
+    F = IntegrationFingerprintSet
+    version = store.version + 1
+    values = {"version": version, "record_count": len(store), "data": store.to_bytes(), "updated_at": datetime.utcnow()}
+    updated = (db.query(F).filter(F.integration_id == integration_id, F.source == source, F.version == store.version)
+               .update(values, synchronize_session=False))
+    if not updated:
+        if db.query(F.id).filter(F.integration_id == integration_id, F.source == source).first() is not None:
+            return False
+        db.add(F(integration_id=integration_id, source=source, **values))
+    store.version = version
+    db.info.setdefault("fingerprint_stores", {})[(integration_id, source)] = store
+    return True
+
+@event.listens_for(Session, "after_commit")
+def _cache_committed(session: Session):
+    """Cache stores only once their version is durable; a rollback leaves the database copy authoritative"""
+    pending = session.info.pop("fingerprint_stores", None)
+    if not pending:
+        return
+    with _cache_lock:
+        for key, store in pending.items():
+            _cache[key] = store
+            _cache.move_to_end(key)
+        while len(_cache) > settings.fingerprint_cache_size:
+            _cache.popitem(last=False)
+
+@event.listens_for(Session, "after_rollback")
+def _drop_uncommitted(session: Session):
+    session.info.pop("fingerprint_stores", None)
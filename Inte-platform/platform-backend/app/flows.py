@@ -0,0 +1,67 @@
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+from urllib.parse import urlsplit
+import yaml
+from app.config import settings
+
+def parse_routes(flow_config: Optional[str]) -> List[dict]:
+    """Routes declared in an integration's YAML flow config; invalid or empty configs have none"""
+    try:
+        parsed = yaml.safe_load(flow_config or "")
+    except yaml.YAMLError:
+        return []
+    routes = parsed.get("routes") if isinstance(parsed, dict) else None
+    return [r for r in routes if isinstance(r, dict)] if isinstance(routes, list) else []
+
+def find_route(routes: List[dict], key: str) -> Optional[dict]:
+    return next((r for r in routes if r.get(key)), None)
+
+# Logical hosts used in flow configs, mapped to (breaker target, configured base URL)
+SERVICE_ALIASES = {
+    "crm-api": ("crm-service", lambda: settings.crm_service_url),
+    "erp-api": ("erp-service", lambda: settings.erp_service_url),
+    "itsm-api": ("itsm-service", lambda: settings.itsm_service_url),
+}
+
+def resolve_destination(uri: Optional[str]) -> Optional[Tuple[str, str]]:
+    """(target, url) for an HTTP `to:` URI, or None for non-HTTP endpoints"""
+    parts = urlsplit(str(uri or ""))
+    if parts.scheme not in ("http", "https") or not parts.hostname:
+        return None
+    alias = SERVICE_ALIASES.get(parts.hostname)
+    if alias is None:
+        return parts.hostname, uri
+    target, base_url = alias
+    return target, base_url().rstrip("/") + parts.path
+
+@dataclass
+class MulticastBranch:
+    name: str
+    timeout: float  # seconds
+    required: bool
+
+@dataclass
+class MulticastStep:
+    branches: List[MulticastBranch]
+    aggregation: str
+    quorum: Optional[int]
+
+def parse_multicast(route: dict) -> MulticastStep:
+    """Read a route's `multicast` step.
+
+    Branches are names or mappings with `name`, `timeoutMs` and `required`;
+    route-level `timeoutMs` and `required` (a list of names) set the defaults.
+    """
+    default_timeout = float(route.get("timeoutMs", settings.multicast_timeout_ms)) / 1000
+    required = route.get("required")
+    branches = []
+    for item in route.get("multicast") or []:
+        spec = item if isinstance(item, dict) else {"name": item}
+        name = str(spec.get("name", ""))
+        if not name:
+            continue
+        is_required = spec.get("required", name in required if isinstance(required, list) else True)
+        timeout = float(spec["timeoutMs"]) / 1000 if "timeoutMs" in spec else default_timeout
+        branches.append(MulticastBranch(name, timeout, bool(is_required)))
+    quorum = route.get("quorum")
+    return MulticastStep(branches, str(route.get("aggregation", "merge")), int(quorum) if quorum else None)
@@ -0,0 +1,169 @@
+"""In-memory sliding-window execution health per integration.
+
+Each integration keeps a ring of 60 one-minute buckets (executions,
+failures, total and max duration). The 1, 5 and 60 minute windows are
+running sums over the newest buckets. Each summary is memoised until the
+minute rolls over or a new execution lands, so answering for every
+integration is one pass over memory. The execution path records into the ring as runs finish. A
+background refresher reloads the last hour of minute rollups plus
+integration names and statuses every HEALTH_REFRESH_SECONDS. That brings
+in executions run by other worker processes and keeps request handlers off
+the database.
+"""
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+from app.config import settings
+from app.database import read_session
+from app.models import Integration, IntegrationExecutionRollup, IntegrationStatus
+
+logger = logging.getLogger(__name__)
+
+SLOTS = 60
+WINDOWS = {"1m": 1, "5m": 5, "60m": 60}
+
+def _minute(ts: float) -> int:
+    return int(ts // 60)
+
+class HealthWindow:
+    """Ring of per-minute buckets; slot i holds minute m where m % SLOTS == i"""
+    __slots__ = ("minutes", "executions", "failures", "total_ms", "max_ms", "_summary")
+
+    def __init__(self):
+        self.minutes = [-1] * SLOTS
+        self.executions = [0] * SLOTS
+        self.failures = [0] * SLOTS
+        self.total_ms = [0.0] * SLOTS
+        self.max_ms = [0.0] * SLOTS
+        self._summary = None  # (minute, result), dropped on every add
+
+    def add(self, minute: int, executions: int, failures: int, total_ms: float, max_ms: float):
+        slot = minute % SLOTS
+        if self.minutes[slot] != minute:
+            self.minutes[slot] = minute
+            self.executions[slot] = self.failures[slot] = 0
+            self.total_ms[slot] = self.max_ms[slot] = 0.0
+        self.executions[slot] += executions
+        self.failures[slot] += failures
+        self.total_ms[slot] += total_ms
+        self.max_ms[slot] = max(self.max_ms[slot], max_ms)
+        self._summary = None
+
+    def summarize(self, now_minute: int) -> Dict[str, dict]:
+        if self._summary is not None and self._summary[0] == now_minute:
+            return self._summary[1]
+        # One pass from newest to oldest; each window is the running total at its span
+        executions = failures = 0
+        total_ms = max_ms = 0.0
+        cut = {span: name for name, span in WINDOWS.items()}
+        result = {}
+        for age in range(SLOTS):
+            minute = now_minute - age
+            slot = minute % SLOTS
+            if self.minutes[slot] == minute:
+                executions += self.executions[slot]
+                failures += self.failures[slot]
+                total_ms += self.total_ms[slot]
+                max_ms = max(max_ms, self.max_ms[slot])
+            if age + 1 in cut:
+                result[cut[age + 1]] = {
+                    "executions": executions,
+                    "failures": failures,
+                    "errorRate": round(failures / executions * 100, 2) if executions else None,
+                    "avgDurationMs": round(total_ms / executions, 2) if executions else None,
+                    "maxDurationMs": round(max_ms, 2) if executions else None,
+                }
+        self._summary = (now_minute, result)
+        return result
+
+_EMPTY = HealthWindow()
+
+class HealthEngine:
+    def __init__(self):
+        self._windows: Dict[int, HealthWindow] = {}
+        self._meta: Dict[int, tuple] = {}  # integration id -> (name, status)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.refreshed_at: Optional[datetime] = None
+
+    def record(self, integration_id: int, success: bool, duration: float, at: Optional[float] = None):
+        duration_ms = duration * 1000
+        with self._lock:
+            window = self._windows.setdefault(integration_id, HealthWindow())
+            window.add(_minute(at or time.time()), 1, 0 if success else 1, duration_ms, duration_ms)
+
+    def set_status(self, integration_id: int, name: str, status):
+        with self._lock:
+            self._meta[integration_id] = (name, status)
+
+    def forget(self, integration_id: int):
+        with self._lock:
+            self._meta.pop(integration_id, None)
+            self._windows.pop(integration_id, None)
+
+    def known(self, integration_id: int) -> bool:
+        return integration_id in self._meta
+
+    def _entry(self, integration_id: int, now_minute: int) -> dict:
+        name, status = self._meta[integration_id]
+        window = self._windows.get(integration_id)
+        windows = (window or _EMPTY).summarize(now_minute)
+        return {
+            "integrationId": integration_id,
+            "name": name,
+            "status": status,
+            "healthy": status == IntegrationStatus.DEPLOYED and windows["60m"]["failures"] == 0,
+            "windows": windows,
+        }
+
+    def snapshot(self, integration_id: Optional[int] = None) -> List[dict]:
+        now_minute = _minute(time.time())
+        with self._lock:
+            ids = [integration_id] if integration_id is not None else sorted(self._meta)
+            return [self._entry(i, now_minute) for i in ids if i in self._meta]
+
+    def refresh(self):
+        """Rebuild windows and metadata from the minute rollups of the last hour"""
+        since = datetime.utcnow().replace(second=0, microsecond=0) - timedelta(minutes=SLOTS - 1)
+        R = IntegrationExecutionRollup
+        db = read_session()
+        try:
+            meta = {i.id: (i.name, i.status) for i in db.query(Integration.id, Integration.name, Integration.status)}
+            buckets = db.query(R.integration_id, R.bucket_start, R.executions, R.failures, R.total_duration_ms, R.max_duration_ms).filter(
+                R.granularity == "minute", R.bucket_start >= since).all()
+        finally:
+            db.close()
+        windows: Dict[int, HealthWindow] = {}
+        epoch = datetime(1970, 1, 1)
+        for integration_id, bucket, executions, failures, total_ms, max_ms in buckets:
+            minute = int((bucket - epoch).total_seconds() // 60)
+            windows.setdefault(integration_id, HealthWindow()).add(minute, executions, failures, total_ms, max_ms)
+        with self._lock:
+            self._meta = meta
+            self._windows = windows
+            self.refreshed_at = datetime.utcnow()
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, name="health-refresh", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _loop(self):
+        while True:
+            try:
+                self.refresh()
+            except Exception:
+                logger.exception("Health engine refresh failed")
+            if self._stop.wait(settings.health_refresh_seconds):
+                return
+
+health_engine = HealthEngine()
@@ -0,0 +1,162 @@
+"""In-process cache of integration definitions (name, status, owner, parsed routes).
+
+The routers and the execution workers resolve integrations here, so the hot
+execute and health paths do not re-read the row and its flow_config text on
+every call. Mutations write through: the handler commits, then calls put()
+with the new definition or invalidate() for deletes.
+
+Other worker processes on the host learn about a mutation through a stamp
+file. Every write bumps its mtime, and any process that sees a new mtime on
+its next lookup drops its whole cache, so the next lookups reload from the
+database. Mutations are rare next to reads, so clearing everything is
+cheap. Within a process, every put and invalidate records a version for its
+id, and a load only caches what it read if no write to that id (or full
+clear) happened after the load started, so a slow read cannot overwrite a
+newer put. Entries also expire after INTEGRATION_CACHE_TTL_SECONDS, which bounds
+staleness when processes do not share a filesystem.
+"""
+import fcntl
+import os
+import threading
+import time
+from dataclasses import dataclass, replace
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.flows import parse_routes
+from app.models import Integration, IntegrationStatus
+
+@dataclass(frozen=True)
+class IntegrationDefinition:
+    id: int
+    name: str
+    description: Optional[str]
+    status: Optional[IntegrationStatus]
+    owner_id: Optional[int]
+    flow_config: Optional[str]
+    routes: List[dict]  # parsed once; shared, treat as read-only
+    created_at: Optional[datetime]
+    updated_at: Optional[datetime]
+
+    @classmethod
+    def from_row(cls, row) -> "IntegrationDefinition":
+        return cls(row.id, row.name, row.description, row.status, row.owner_id, row.flow_config,
+                   parse_routes(row.flow_config), row.created_at, row.updated_at)
+
+    def with_status(self, status: IntegrationStatus) -> "IntegrationDefinition":
+        return replace(self, status=status, updated_at=datetime.utcnow())
+
+COLUMNS = (Integration.id, Integration.name, Integration.description, Integration.status, Integration.owner_id,
+           Integration.flow_config, Integration.created_at, Integration.updated_at)
+
+class IntegrationCache:
+    def __init__(self, stamp_path: str, ttl: float):
+        self.stamp_path = stamp_path
+        self.ttl = ttl
+        self._entries: Dict[int, Tuple[IntegrationDefinition, float]] = {}
+        self._all: Optional[Tuple[List[IntegrationDefinition], float]] = None
+        self._stamp: Optional[int] = None
+        self._counter = 0  # bumped by every mutation
+        self._versions: Dict[int, int] = {}  # integration id -> counter at its last put/invalidate
+        self._cleared = 0  # counter at the last full clear
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(stamp_path) or ".", exist_ok=True)
+
+    def _read_stamp(self) -> int:
+        try:
+            return os.stat(self.stamp_path).st_mtime_ns
+        except FileNotFoundError:
+            return 0
+
+    def _clear(self):
+        """Drop everything; caller holds the lock"""
+        self._entries.clear()
+        self._all = None
+        self._counter += 1
+        self._cleared = self._counter
+
+    def _touch(self, integration_id: int):
+        """Mark one id as written so loads that started earlier do not cache it; caller holds the lock"""
+        self._counter += 1
+        self._versions[integration_id] = self._counter
+
+    def _check_stamp(self):
+        stamp = self._read_stamp()
+        if stamp != self._stamp:
+            with self._lock:
+                self._clear()
+                self._stamp = stamp
+
+    def _bump(self):
+        """Move the stamp forward so other processes drop their copies.
+
+        Bumps are serialized with an flock on the stamp file, so the mtime read
+        back is our own. If another process bumped since our last look, our
+        copies predate its write and are dropped as well.
+        """
+        with open(self.stamp_path, "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            previous = self._read_stamp()
+            stamp = max(time.time_ns(), previous + 1000)
+            os.utime(self.stamp_path, ns=(stamp, stamp))
+            with self._lock:
+                if previous != self._stamp:
+                    self._clear()
+                self._stamp = self._read_stamp()
+
+    def get(self, db: Session, integration_id: int) -> Optional[IntegrationDefinition]:
+        self._check_stamp()
+        cached = self._entries.get(integration_id)
+        if cached is not None and time.monotonic() - cached[1] < self.ttl:
+            return cached[0]
+        seen = self._counter
+        row = db.query(*COLUMNS).filter(Integration.id == integration_id).first()
+        if row is None:
+            return None
+        definition = IntegrationDefinition.from_row(row)
+        with self._lock:
+            # A put or invalidate since the read may carry a newer definition than the row we loaded
+            if max(self._versions.get(integration_id, 0), self._cleared) <= seen:
+                self._entries[integration_id] = (definition, time.monotonic())
+        return definition
+
+    def all(self, db: Session) -> List[IntegrationDefinition]:
+        """Every integration ordered by id, loaded in one query per generation"""
+        self._check_stamp()
+        cached = self._all
+        if cached is not None and time.monotonic() - cached[1] < self.ttl:
+            return cached[0]
+        seen = self._counter
+        definitions = [IntegrationDefinition.from_row(row) for row in db.query(*COLUMNS).order_by(Integration.id)]
+        now = time.monotonic()
+        with self._lock:
+            if self._counter == seen:
+                self._all = (definitions, now)
+                self._entries = {d.id: (d, now) for d in definitions}
+        return definitions
+
+    def put(self, definition: IntegrationDefinition):
+        """Write-through after a committed create or update"""
+        self._bump()
+        now = time.monotonic()
+        with self._lock:
+            self._touch(definition.id)
+            self._entries[definition.id] = (definition, now)
+            if self._all is not None:
+                others = [d for d in self._all[0] if d.id != definition.id]
+                self._all = (sorted(others + [definition], key=lambda d: d.id), self._all[1])
+
+    def invalidate(self, integration_id: Optional[int] = None):
+        """Drop one definition (after a delete) or everything (after bulk changes)"""
+        self._bump()
+        with self._lock:
+            if integration_id is None:
+                self._clear()
+            else:
+                self._touch(integration_id)
+                self._entries.pop(integration_id, None)
+                if self._all is not None:
+                    self._all = ([d for d in self._all[0] if d.id != integration_id], self._all[1])
+
+integration_cache = IntegrationCache(settings.integration_cache_stamp, settings.integration_cache_ttl_seconds)
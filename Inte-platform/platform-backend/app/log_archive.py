@@ -0,0 +1,266 @@
+"""Archival of old integration_logs rows into compressed segment files.
+
+Rows older than LOG_RETENTION_HOURS are moved out of the hot table in id
+order. Each batch is written as one segment per UTC day under
+``<LOG_ARCHIVE_DIR>/<YYYY-MM-DD>/<first id>-<last id>.seg``. Within a
+segment, rows are grouped by integration and sorted by time. They are
+stored as zlib-compressed NDJSON blocks of up to BLOCK_ROWS rows. The
+``.idx`` file next to it is a small JSON index: for each integration, the
+offset, length, row count and time range of each block. Because the index is
+renamed into place last, a segment without an index is ignored.
+
+Reads map the segment into memory and decompress only the blocks of the
+requested integration that overlap the requested time range. The rows are
+deleted from the table after their segment is on disk. A crash between
+the two steps leaves rows in both places, so readers de-duplicate by id.
+"""
+import fcntl
+import json
+import logging
+import mmap
+import os
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+from app.config import settings
+from app.database import SessionLocal
+from app.metrics import record_log_archive
+from app.models import IntegrationLog
+
+logger = logging.getLogger(__name__)
+
+BLOCK_ROWS = 1000
+RESCAN_SECONDS = 30
+MAX_OPEN_SEGMENTS = 64
+EPOCH = datetime(1970, 1, 1)
+
+def _epoch(ts: datetime) -> float:
+    return (ts - EPOCH).total_seconds()
+
+def _fsync_write(path: str, data: bytes):
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+def write_segment(directory: str, rows: list) -> str:
+    """Write rows (id, integration_id, level, message, timestamp) of one day as a segment; returns its path"""
+    by_integration: Dict[int, list] = {}
+    for row in rows:
+        by_integration.setdefault(row.integration_id, []).append(row)
+    day = rows[0].timestamp.strftime("%Y-%m-%d")
+    os.makedirs(os.path.join(directory, day), exist_ok=True)
+    path = os.path.join(directory, day, f"{min(r.id for r in rows)}-{max(r.id for r in rows)}.seg")
+    chunks, index, offset = [], {}, 0
+    for integration_id, group in sorted(by_integration.items()):
+        group.sort(key=lambda r: (r.timestamp, r.id))
+        for start in range(0, len(group), BLOCK_ROWS):
+            block = group[start:start + BLOCK_ROWS]
+            data = zlib.compress(b"\n".join(json.dumps(
+                {"id": r.id, "level": r.level, "message": r.message, "timestamp": r.timestamp.isoformat()},
+                separators=(",", ":")).encode() for r in block))
+            index.setdefault(str(integration_id), []).append(
+                [offset, len(data), len(block), _epoch(block[0].timestamp), _epoch(block[-1].timestamp)])
+            chunks.append(data)
+            offset += len(data)
+    _fsync_write(path, b"".join(chunks))
+    _fsync_write(path[:-len(".seg")] + ".idx", json.dumps({
+        "rows": len(rows),
+        "minTs": min(_epoch(r.timestamp) for r in rows),
+        "maxTs": max(_epoch(r.timestamp) for r in rows),
+        "integrations": index,
+    }).encode())
+    return path
+
+@dataclass
+class Segment:
+    path: str
+    min_ts: float
+    max_ts: float
+    blocks: Dict[str, list]  # integration id -> [[offset, length, rows, min ts, max ts], ...]
+
+class ArchiveReader:
+    """Index cache and memory-mapped block reads over every segment in the archive directory"""
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._segments: Dict[str, Segment] = {}
+        self._order: List[Segment] = []  # newest max_ts first
+        self._scanned_at = 0.0
+        self._maps: "OrderedDict[str, mmap.mmap]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _load(self, seg_path: str) -> Optional[Segment]:
+        try:
+            with open(seg_path[:-len(".seg")] + ".idx") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return Segment(seg_path, meta["minTs"], meta["maxTs"], meta["integrations"])
+
+    def refresh(self, force: bool = False):
+        """Pick up segments written since the last scan, including by other processes"""
+        if not force and time.monotonic() - self._scanned_at < RESCAN_SECONDS:
+            return
+        found = {}
+        if os.path.isdir(self.directory):
+            for day in os.scandir(self.directory):
+                if day.is_dir():
+                    for entry in os.scandir(day.path):
+                        if entry.name.endswith(".seg"):
+                            found[entry.path] = self._segments.get(entry.path) or self._load(entry.path)
+        with self._lock:
+            self._segments = {path: seg for path, seg in found.items() if seg is not None}
+            self._order = sorted(self._segments.values(), key=lambda s: s.max_ts, reverse=True)
+            for path in [p for p in self._maps if p not in self._segments]:
+                self._maps.pop(path).close()
+            self._scanned_at = time.monotonic()
+
+    def _block(self, path: str, offset: int, length: int) -> bytes:
+        with self._lock:
+            mm = self._maps.get(path)
+            if mm is None:
+                with open(path, "rb") as f:
+                    mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                self._maps[path] = mm
+                if len(self._maps) > MAX_OPEN_SEGMENTS:
+                    self._maps.popitem(last=False)[1].close()
+            else:
+                self._maps.move_to_end(path)
+            # Copy out under the lock so an evicted map is never read after close
+            return mm[offset:offset + length]
+
+    def read(self, integration_id: int, limit: int, before: Optional[datetime] = None,
+             floor: Optional[datetime] = None) -> List[dict]:
+        """Newest `limit` archived rows of an integration older than `before`.
+
+        Blocks entirely older than `floor` are skipped, which lets a caller
+        that already has `limit` newer rows avoid decompressing anything.
+        """
+        self.refresh()
+        before_ts = _epoch(before) if before else None
+        floor_ts = _epoch(floor) if floor else None
+        key = str(integration_id)
+        rows: Dict[int, dict] = {}
+        with self._lock:
+            order = list(self._order)
+        for segment in order:
+            if floor_ts is not None and segment.max_ts < floor_ts:
+                break
+            if len(rows) >= limit:
+                # Segments are newest first; stop once none can beat the current page
+                cutoff = sorted(r["_ts"] for r in rows.values())[-limit]
+                if segment.max_ts < cutoff:
+                    break
+            for offset, length, _, min_ts, max_ts in segment.blocks.get(key, ()):
+                if (before_ts is not None and min_ts >= before_ts) or (floor_ts is not None and max_ts < floor_ts):
+                    continue
+                for line in zlib.decompress(self._block(segment.path, offset, length)).split(b"\n"):
+                    row = json.loads(line)
+                    row["timestamp"] = datetime.fromisoformat(row["timestamp"])
+                    row["_ts"] = _epoch(row["timestamp"])
+                    if before_ts is None or row["_ts"] < before_ts:
+                        rows[row["id"]] = row
+        page = sorted(rows.values(), key=lambda r: (r["_ts"], r["id"]), reverse=True)[:limit]
+        for row in page:
+            del row["_ts"]
+        return page
+
+def archive_logs(directory: str, retention: timedelta, batch_size: int) -> int:
+    """Move rows older than `retention` into segments; returns rows archived (0 if another process holds the lock)"""
+    os.makedirs(directory, exist_ok=True)
+    lock_fd = os.open(os.path.join(directory, ".archive.lock"), os.O_WRONLY | os.O_CREAT, 0o644)
+    try:
+        try:
+            fcntl.flock(lock_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return 0
+        cutoff = datetime.utcnow() - retention
+        L = IntegrationLog
+        archived = 0
+        db = SessionLocal()
+        try:
+            while True:
+                rows = (db.query(L.id, L.integration_id, L.level, L.message, L.timestamp)
+                        .filter(L.timestamp < cutoff).order_by(L.id).limit(batch_size).all())
+                if not rows:
+                    break
+                by_day: Dict[str, list] = {}
+                for row in rows:
+                    by_day.setdefault(row.timestamp.strftime("%Y-%m-%d"), []).append(row)
+                for day_rows in by_day.values():
+                    write_segment(directory, day_rows)
+                # Same predicate as the select, so exactly the archived rows go
+                db.query(L).filter(L.id >= rows[0].id, L.id <= rows[-1].id, L.timestamp < cutoff).delete(synchronize_session=False)
+                db.commit()
+                archived += len(rows)
+                record_log_archive(len(rows), len(by_day))
+                if len(rows) < batch_size:
+                    break
+        finally:
+            db.close()
+        return archived
+    finally:
+        os.close(lock_fd)
+
+def _dedupe(rows: Iterable[dict]) -> List[dict]:
+    seen, out = set(), []
+    for row in rows:
+        if row["id"] not in seen:
+            seen.add(row["id"])
+            out.append(row)
+    return out
+
+def read_logs(db, integration_id: int, limit: int, before: Optional[datetime] = None) -> List[dict]:
+    """Newest `limit` log rows for an integration across the hot table and the archive"""
+    L = IntegrationLog
+    query = db.query(L.id, L.level, L.message, L.timestamp).filter(L.integration_id == integration_id)
+    if before:
+        query = query.filter(L.timestamp < before)
+    hot = [{"id": l.id, "level": l.level, "message": l.message, "timestamp": l.timestamp}
+           for l in query.order_by(L.timestamp.desc(), L.id.desc()).limit(limit)]
+    floor = hot[-1]["timestamp"] if len(hot) == limit else None
+    cold = archive_reader.read(integration_id, limit, before=before, floor=floor)
+    if not cold:
+        return hot
+    merged = sorted(hot + cold, key=lambda r: (r["timestamp"], r["id"]), reverse=True)
+    return _dedupe(merged)[:limit]
+
+class LogArchiver:
+    def __init__(self):
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        if self._thread is None and settings.log_retention_hours > 0:
+            self._thread = threading.Thread(target=self._loop, name="log-archiver", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def run_once(self) -> int:
+        archived = archive_logs(settings.log_archive_dir, timedelta(hours=settings.log_retention_hours),
+                                settings.log_archive_batch)
+        if archived:
+            archive_reader.refresh(force=True)
+            logger.info("Archived %d log rows to %s", archived, settings.log_archive_dir)
+        return archived
+
+    def _loop(self):
+        while not self._stop.wait(settings.log_archive_interval_seconds):
+            try:
+                self.run_once()
+            except Exception:
+                logger.exception("Log archival failed")
+
+archive_reader = ArchiveReader(settings.log_archive_dir)
+log_archiver = LogArchiver()
@@ -0,0 +1,143 @@
+"""Full-text search over integration_logs.message.
+
+PostgreSQL uses two GIN expression indexes: a `simple` tsvector for ranked
+word matches and pg_trgm for substrings such as partial order ids. The
+`simple` config keeps identifiers like ConnectionTimeout unstemmed. SQLite
+uses an external-content FTS5 table kept in sync by triggers, ranked by
+bm25. Other databases fall back to an unranked case-insensitive LIKE scan.
+Pages are fetched with one extra row to report `hasMore` instead of
+counting every match. Only the hot table is searched, not the log archive.
+"""
+import logging
+import re
+from datetime import datetime
+from typing import List, Optional, Tuple
+from sqlalchemy import DateTime, Float, Integer, String, Text, bindparam, text
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+TSVECTOR = "to_tsvector('simple', coalesce(message, ''))"
+
+POSTGRES_DDL = [
+    f"CREATE INDEX IF NOT EXISTS ix_integration_logs_message_fts ON integration_logs USING GIN ({TSVECTOR})",
+    "CREATE INDEX IF NOT EXISTS ix_integration_logs_integration_ts ON integration_logs (integration_id, timestamp)",
+]
+POSTGRES_TRGM_DDL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS ix_integration_logs_message_trgm ON integration_logs USING GIN (message gin_trgm_ops)",
+]
+
+SQLITE_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS integration_logs_fts USING fts5(message, content='integration_logs', content_rowid='id')",
+    """CREATE TRIGGER IF NOT EXISTS integration_logs_fts_ai AFTER INSERT ON integration_logs BEGIN
+         INSERT INTO integration_logs_fts(rowid, message) VALUES (new.id, new.message);
+       END""",
+    """CREATE TRIGGER IF NOT EXISTS integration_logs_fts_ad AFTER DELETE ON integration_logs BEGIN
+         INSERT INTO integration_logs_fts(integration_logs_fts, rowid, message) VALUES ('delete', old.id, old.message);
+       END""",
+    """CREATE TRIGGER IF NOT EXISTS integration_logs_fts_au AFTER UPDATE OF message ON integration_logs BEGIN
+         INSERT INTO integration_logs_fts(integration_logs_fts, rowid, message) VALUES ('delete', old.id, old.message);
+         INSERT INTO integration_logs_fts(rowid, message) VALUES (new.id, new.message);
+       END""",
+    "CREATE INDEX IF NOT EXISTS ix_integration_logs_integration_ts ON integration_logs (integration_id, timestamp)",
+]
+
+_trigram_available = False
+
+def ensure_search_index(engine):
+    """Create the text index for the engine's dialect (idempotent, run at startup)"""
+    global _trigram_available
+    dialect = engine.dialect.name
+    if dialect == "postgresql":
+        with engine.begin() as conn:
+            for ddl in POSTGRES_DDL:
+                conn.execute(text(ddl))
+        try:
+            with engine.begin() as conn:
+                for ddl in POSTGRES_TRGM_DDL:
+                    conn.execute(text(ddl))
+            _trigram_available = True
+        except Exception as e:
+            logger.warning("pg_trgm unavailable, log search falls back to word matches only: %s", e)
+    elif dialect == "sqlite":
+        with engine.begin() as conn:
+            exists = conn.execute(text("SELECT 1 FROM sqlite_master WHERE name = 'integration_logs_fts'")).first()
+            for ddl in SQLITE_DDL:
+                conn.execute(text(ddl))
+            if not exists:
+                conn.execute(text("INSERT INTO integration_logs_fts(integration_logs_fts) VALUES ('rebuild')"))
+
+def _fts5_query(q: str) -> str:
+    """Quote each term so user input cannot inject FTS5 syntax; a trailing * keeps prefix matching"""
+    terms = []
+    for term in q.split():
+        prefix = term.endswith("*")
+        term = term.rstrip("*").replace('"', '""')
+        if term:
+            terms.append(f'"{term}"' + ("*" if prefix else ""))
+    return " ".join(terms)
+
+def _filters(alias: str, integration_id, level, since, until, params: dict) -> str:
+    clauses = []
+    if integration_id is not None:
+        clauses.append(f"{alias}.integration_id = :integration_id")
+        params["integration_id"] = integration_id
+    if level:
+        clauses.append(f"{alias}.level = :level")
+        params["level"] = level.upper()
+    if since:
+        clauses.append(f"{alias}.timestamp >= :since")
+        params["since"] = since
+    if until:
+        clauses.append(f"{alias}.timestamp < :until")
+        params["until"] = until
+    return "".join(f" AND {c}" for c in clauses)
+
+def search_logs(db: Session, q: str, integration_id: Optional[int] = None, level: Optional[str] = None,
+                since: Optional[datetime] = None, until: Optional[datetime] = None,
+                limit: int = 50, offset: int = 0) -> Tuple[List[dict], bool]:
+    """Ranked matches for `q` with optional filters; returns (page, has_more)"""
+    dialect = db.get_bind().dialect.name
+    params = {"limit": limit + 1, "offset": offset}
+    if dialect == "postgresql":
+        params["q"] = q
+        match = f"{TSVECTOR} @@ websearch_to_tsquery('simple', :q)"
+        if _trigram_available:
+            params["pattern"] = "%" + re.sub(r"([%_\\])", r"\\\1", q) + "%"
+            match = f"({match} OR l.message ILIKE :pattern)"
+        # ts_headline is costly, so it only runs on the page the inner query selects
+        sql = (f"SELECT p.*, ts_headline('simple', p.message, websearch_to_tsquery('simple', :q), 'StartSel=[, StopSel=]') AS highlight "
+               f"FROM (SELECT l.id, l.integration_id, l.level, l.message, l.timestamp, "
+               f"ts_rank_cd({TSVECTOR}, websearch_to_tsquery('simple', :q)) AS rank "
+               f"FROM integration_logs l WHERE {match}"
+               f"{_filters('l', integration_id, level, since, until, params)} "
+               f"ORDER BY rank DESC, l.timestamp DESC, l.id DESC LIMIT :limit OFFSET :offset) p "
+               f"ORDER BY p.rank DESC, p.timestamp DESC, p.id DESC")
+    elif dialect == "sqlite":
+        params["q"] = _fts5_query(q)
+        if not params["q"]:
+            return [], False
+        # Same as above: snippet() runs in the outer query, over the selected page only
+        sql = ("SELECT p.*, snippet(integration_logs_fts, 0, '[', ']', '...', 16) AS highlight "
+               "FROM (SELECT l.id, l.integration_id, l.level, l.message, l.timestamp, "
+               "-bm25(integration_logs_fts) AS rank "
+               "FROM integration_logs_fts JOIN integration_logs l ON l.id = integration_logs_fts.rowid "
+               f"WHERE integration_logs_fts MATCH :q{_filters('l', integration_id, level, since, until, params)} "
+               "ORDER BY bm25(integration_logs_fts), l.timestamp DESC, l.id DESC LIMIT :limit OFFSET :offset) p "
+               "JOIN integration_logs_fts ON integration_logs_fts.rowid = p.id "
+               "WHERE integration_logs_fts MATCH :q "
+               "ORDER BY p.rank DESC, p.timestamp DESC, p.id DESC")
+    else:
+        params["pattern"] = "%" + re.sub(r"([%_\\])", r"\\\1", q.lower()) + "%"
+        sql = ("SELECT l.id, l.integration_id, l.level, l.message, l.timestamp, 0 AS rank, l.message AS highlight "
+               "FROM integration_logs l WHERE lower(l.message) LIKE :pattern ESCAPE '\\'"
+               f"{_filters('l', integration_id, level, since, until, params)} "
+               "ORDER BY l.timestamp DESC, l.id DESC LIMIT :limit OFFSET :offset")
+    stmt = text(sql).columns(id=Integer, integration_id=Integer, level=String, message=Text, timestamp=DateTime,
+                             rank=Float, highlight=Text)
+    stmt = stmt.bindparams(*(bindparam(name, type_=DateTime) for name in ("since", "until") if name in params))
+    rows = db.execute(stmt, params).all()
+    page = [{"id": r.id, "integrationId": r.integration_id, "level": r.level, "message": r.message,
+             "timestamp": r.timestamp, "rank": round(float(r.rank or 0), 4), "highlight": r.highlight} for r in rows[:limit]]
+    return page, len(rows) > limit
@@ -1,10 +1,19 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from prometheus_client import make_asgi_app
-from app.routers import auth, integrations, apis, dashboard, runtime, connectors
+from app.routers import auth, integrations, apis, dashboard, runtime, connectors, debug, webhooks, bundles
 from app.database import engine, Base
+from app.metrics import make_metrics_app, mark_worker_dead
+from app.timing import TimingMiddleware, TimedJSONResponse
+from app.execution_queue import start_worker_pool, stop_worker_pool
+from app.webhook_spool import start_webhook_dispatcher, stop_webhook_dispatcher
+from app.config import settings
+from app.log_search import ensure_search_index
+from app.health_engine import health_engine
+from app.dashboard_stream import stats_broadcaster
+from app.log_archive import log_archiver
 
 Base.metadata.create_all(bind=engine)
+ensure_search_index(engine)
 
 # Seed database on startup
 from app.seed import seed_database
@@ -13,7 +22,7 @@ try:
 except Exception as e:
     print(f"Seed error (may be normal on first run): {e}")
 
-app = FastAPI(title="MuleSoft Anypoint API", version="1.0.0")
+app = FastAPI(title="MuleSoft Anypoint API", version="1.0.0", default_response_class=TimedJSONResponse)
 
 app.add_middleware(
     CORSMiddleware,
@@ -21,18 +30,70 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing"],
 )
 
+# Per-request phase breakdown (Server-Timing header + Prometheus histograms)
+app.add_middleware(TimingMiddleware)
+
 # Prometheus metrics
-metrics_app = make_asgi_app()
+metrics_app = make_metrics_app()
 app.mount("/metrics", metrics_app)
 
+@app.on_event("startup")
+def start_execution_workers():
+    start_worker_pool()
+
+@app.on_event("startup")
+def start_health_engine():
+    health_engine.start()
+
+@app.on_event("shutdown")
+def stop_health_engine():
+    health_engine.stop()
+
+@app.on_event("startup")
+async def start_stats_broadcaster():
+    await stats_broadcaster.start()
+
+@app.on_event("shutdown")
+async def stop_stats_broadcaster():
+    await stats_broadcaster.stop()
+
+@app.on_event("startup")
+def start_log_archiver():
+    log_archiver.start()
+
+@app.on_event("shutdown")
+def stop_log_archiver():
+    log_archiver.stop()
+
+@app.on_event("startup")
+def start_webhook_dispatch():
+    start_webhook_dispatcher()
+
+@app.on_event("shutdown")
+def stop_webhook_dispatch():
+    stop_webhook_dispatcher()
+
+@app.on_event("shutdown")
+def stop_execution_workers():
+    stop_worker_pool()
+
+@app.on_event("shutdown")
+def release_worker_metrics():
+    mark_worker_dead()
+
 app.include_router(auth.router, prefix="/api/auth", tags=["Authentication"])
 app.include_router(dashboard.router, prefix="/api/dashboard", tags=["Dashboard"])
 app.include_router(integrations.router, prefix="/api/integrations", tags=["Integrations"])
 app.include_router(apis.router, prefix="/api/apis", tags=["API Management"])
 app.include_router(runtime.router, prefix="/api/runtime", tags=["Runtime"])
 app.include_router(connectors.router, prefix="/api", tags=["Connectors"])
+app.include_router(bundles.router, prefix="/api/bundles", tags=["Bundles"])
+app.include_router(webhooks.router, prefix="/api/v1/webhooks", tags=["Webhooks"])
+if settings.profiling_enabled:
+    app.include_router(debug.router, prefix="/api/debug", tags=["Debug"])
 
 @app.get("/health")
 def health_check():
@@ -1,6 +1,25 @@
-from prometheus_client import Counter, Histogram, Gauge, Info
+from prometheus_client import Counter, Histogram, Gauge, Info, CollectorRegistry, make_asgi_app, multiprocess
+import fcntl
+import json
+import os
+import threading
 import time
 
+# Set PROMETHEUS_MULTIPROC_DIR (before the process starts) when running several
+# uvicorn/gunicorn workers so /metrics aggregates every worker's values.
+MULTIPROC_DIR = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+
+# Guard against unbounded label cardinality from free-form integration names. In
+# multiprocess mode the admitted names are shared through a file in the metrics
+# directory, so every worker admits the same first names and the cap is global.
+MAX_INTEGRATION_LABELS = int(os.getenv("METRICS_MAX_INTEGRATION_LABELS", "500"))
+MAX_LABEL_LENGTH = 100
+OVERFLOW_LABEL = "__other__"
+LABELS_FILE = os.path.join(MULTIPROC_DIR, "integration_labels.jsonl") if MULTIPROC_DIR else None
+_seen_integration_labels = set()
+_labels_full = False  # the cap is reached; the admitted set never shrinks, so no further lookups are needed
+_labels_lock = threading.Lock()
+
 # Integration Execution Metrics
 integration_executions_total = Counter(
     'integration_executions_total',
@@ -28,16 +47,202 @@ integration_errors_total = Counter(
 )
 
 # Integration Status Gauge (1=deployed, 0=stopped, -1=error)
+# Every worker writes the same DB-derived value, so report the most recent write rather than summing
 integration_status = Gauge(
     'integration_status',
     'Current status of integration',
-    ['integration_name']
+    ['integration_name'],
+    multiprocess_mode='mostrecent'
 )
 
 # Active Integrations Count
 active_integrations = Gauge(
     'active_integrations_count',
-    'Number of currently active integrations'
+    'Number of currently active integrations',
+    multiprocess_mode='mostrecent'
+)
+
+# Per-request wall time split into db/http/hash/encode/app phases (see app.timing)
+http_request_phase_duration = Histogram(
+    'http_request_phase_duration_seconds',
+    'Wall time per request attributed to each phase',
+    ['method', 'route', 'phase'],
+    buckets=[0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0]
+)
+
+http_request_duration = Histogram(
+    'http_request_duration_seconds',
+    'Total wall time per request until response headers are sent',
+    ['method', 'route'],
+    buckets=[0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0]
+)
+
+http_request_db_queries = Histogram(
+    'http_request_db_queries',
+    'SQL statements executed per request',
+    ['method', 'route'],
+    buckets=[0, 1, 2, 3, 5, 8, 13, 21, 50, 100, 250]
+)
+
+http_request_repeated_statements_total = Counter(
+    'http_request_repeated_statements_total',
+    'Requests where an identical statement ran at least N_PLUS_ONE_THRESHOLD times (likely N+1)',
+    ['method', 'route']
+)
+
+# Downstream circuit breakers (0=closed, 1=half-open, 2=open); workers keep separate breakers
+circuit_breaker_state = Gauge(
+    'circuit_breaker_state',
+    'Circuit breaker state per downstream target',
+    ['target'],
+    multiprocess_mode='livemax'
+)
+
+circuit_breaker_trips_total = Counter(
+    'circuit_breaker_trips_total',
+    'Times a circuit breaker opened',
+    ['target']
+)
+
+circuit_breaker_rejections_total = Counter(
+    'circuit_breaker_rejections_total',
+    'Calls rejected without being attempted because the breaker was open',
+    ['target']
+)
+
+hedged_requests_total = Counter(
+    'hedged_requests_total',
+    'GETs where a hedge request was sent, by which copy answered first',
+    ['target', 'winner']
+)
+
+# Multicast scatter-gather
+multicast_branches_total = Counter(
+    'multicast_branches_total',
+    'Multicast branch outcomes (ok, error, timeout, pending, dropped)',
+    ['branch', 'status']
+)
+
+multicast_gather_duration = Histogram(
+    'multicast_gather_duration_seconds',
+    'Wall time of a multicast gather step by aggregation strategy',
+    ['strategy'],
+    buckets=[0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0]
+)
+
+# Batching outbound sink
+sink_batches_total = Counter(
+    'sink_batches_total',
+    'Batched POSTs sent by outbound sinks, by outcome',
+    ['target', 'outcome']
+)
+
+sink_batch_size = Histogram(
+    'sink_batch_records',
+    'Records per outbound sink batch',
+    ['target'],
+    buckets=[1, 10, 50, 100, 250, 500, 1000, 5000]
+)
+
+sink_records_total = Counter(
+    'sink_records_total',
+    'Records delivered or failed by outbound sinks',
+    ['target', 'status']
+)
+
+# Webhook ingress
+webhook_received_total = Counter(
+    'webhook_received_total',
+    'Inbound webhooks by source and outcome (accepted, bad_signature)',
+    ['source', 'outcome']
+)
+
+webhook_dispatched_total = Counter(
+    'webhook_dispatched_total',
+    'Spooled webhook events moved to the execution queue (enqueued) or with no subscriber (unrouted)',
+    ['source', 'outcome']
+)
+
+# Dashboard stats stream
+dashboard_subscribers = Gauge(
+    'dashboard_stream_subscribers',
+    'Open dashboard stats streams',
+    multiprocess_mode='livesum'
+)
+
+dashboard_pushes_total = Counter(
+    'dashboard_stream_pushes_total',
+    'Encoded stats frames fanned out to stream subscribers, by event',
+    ['event']
+)
+
+dashboard_frames_total = Counter(
+    'dashboard_stream_frames_total',
+    'Stats frames queued for individual subscribers'
+)
+
+# Database pools and read routing
+db_pool_checked_out = Gauge(
+    'db_pool_checked_out',
+    'Connections currently checked out of the pool',
+    ['engine'],
+    multiprocess_mode='livesum'
+)
+
+db_pool_size = Gauge(
+    'db_pool_size',
+    'Configured pool size',
+    ['engine'],
+    multiprocess_mode='livesum'
+)
+
+db_pool_overflow = Gauge(
+    'db_pool_overflow',
+    'Connections open beyond the pool size (negative while the pool is not yet full)',
+    ['engine'],
+    multiprocess_mode='livesum'
+)
+
+db_sessions_total = Counter(
+    'db_read_sessions_total',
+    'Read-only session requests by serving engine and reason',
+    ['engine', 'reason']
+)
+
+# Log archival
+log_archive_rows_total = Counter(
+    'log_archive_rows_total',
+    'Log rows moved from integration_logs into archive segments'
+)
+
+log_archive_segments_total = Counter(
+    'log_archive_segments_total',
+    'Archive segment files written'
+)
+
+# Durable execution queue
+execution_queue_depth = Gauge(
+    'execution_queue_depth',
+    'Execution jobs by queue status',
+    ['status'],
+    multiprocess_mode='mostrecent'
+)
+
+execution_queue_wait = Histogram(
+    'execution_queue_wait_seconds',
+    'Time jobs spent queued before a worker claimed them',
+    buckets=[0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 15.0, 60.0, 300.0]
+)
+
+execution_jobs_total = Counter(
+    'execution_jobs_total',
+    'Execution jobs processed by workers, by resulting status',
+    ['status']
+)
+
+metric_label_overflow_total = Counter(
+    'metrics_integration_label_overflow_total',
+    'Observations folded into the overflow integration_name label'
 )
 
 # API Call Metrics (for integrations calling external APIs)
@@ -55,9 +260,59 @@ api_call_duration = Histogram(
 )
 
 # Helper functions
+def _admit_shared(name: str) -> bool:
+    """Admit `name` in the labels file shared by all workers; caller holds _labels_lock"""
+    global _labels_full
+    with open(LABELS_FILE, "a+") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        f.seek(0)
+        admitted = [json.loads(line) for line in f if line.strip()]
+        _seen_integration_labels.update(admitted)
+        if name in _seen_integration_labels:
+            return True
+        if len(admitted) >= MAX_INTEGRATION_LABELS:
+            _labels_full = True
+            return False
+        f.write(json.dumps(name) + "\n")
+        f.flush()
+    _seen_integration_labels.add(name)
+    return True
+
+def integration_label(integration_name: str) -> str:
+    """Map an integration name to a bounded label value, the same one in every worker"""
+    name = (integration_name or "unknown")[:MAX_LABEL_LENGTH]
+    if name in _seen_integration_labels:
+        return name
+    with _labels_lock:
+        if name in _seen_integration_labels:
+            return name
+        if not _labels_full:
+            if LABELS_FILE:
+                if _admit_shared(name):
+                    return name
+            elif len(_seen_integration_labels) < MAX_INTEGRATION_LABELS:
+                _seen_integration_labels.add(name)
+                return name
+    metric_label_overflow_total.inc()
+    return OVERFLOW_LABEL
+
+def make_metrics_app():
+    """ASGI app for /metrics, aggregating across workers in multiprocess mode"""
+    if MULTIPROC_DIR:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return make_asgi_app(registry=registry)
+    return make_asgi_app()
+
+def mark_worker_dead():
+    """Drop this worker's live gauge files when it exits"""
+    if MULTIPROC_DIR:
+        multiprocess.mark_process_dead(os.getpid())
+
 def record_execution(integration_name: str, success: bool, duration: float, records: int = 0):
     """Record an integration execution"""
     status = 'success' if success else 'failure'
+    integration_name = integration_label(integration_name)
     integration_executions_total.labels(integration_name=integration_name, status=status).inc()
     integration_execution_duration.labels(integration_name=integration_name).observe(duration)
     if records > 0:
@@ -65,6 +320,7 @@ def record_execution(integration_name: str, success: bool, duration: float, reco
 
 def record_api_call(integration_name: str, target: str, method: str, status_code: int, duration: float):
     """Record an API call made by an integration"""
+    integration_name = integration_label(integration_name)
     api_calls_total.labels(
         integration_name=integration_name,
         target_service=target,
@@ -75,11 +331,85 @@ def record_api_call(integration_name: str, target: str, method: str, status_code
 
 def record_error(integration_name: str, error_type: str):
     """Record an integration error"""
+    integration_name = integration_label(integration_name)
     integration_errors_total.labels(integration_name=integration_name, error_type=error_type).inc()
 
+def record_request_phases(method: str, route: str, phases: dict, total: float):
+    """Record a request's phase breakdown"""
+    for phase, seconds in phases.items():
+        http_request_phase_duration.labels(method=method, route=route, phase=phase).observe(seconds)
+    http_request_duration.labels(method=method, route=route).observe(total)
+
+def record_request_queries(method: str, route: str, queries: int, repeated_statements: int):
+    """Record how many statements a request issued and whether any repeated"""
+    http_request_db_queries.labels(method=method, route=route).observe(queries)
+    if repeated_statements:
+        http_request_repeated_statements_total.labels(method=method, route=route).inc()
+
+def update_breaker_state(target: str, state: str):
+    """Update circuit breaker state gauge"""
+    state_map = {'closed': 0, 'half_open': 1, 'open': 2}
+    circuit_breaker_state.labels(target=target).set(state_map.get(state, 0))
+
+def record_breaker_trip(target: str):
+    circuit_breaker_trips_total.labels(target=target).inc()
+
+def record_breaker_rejection(target: str):
+    circuit_breaker_rejections_total.labels(target=target).inc()
+
+def record_hedged_request(target: str, winner: str):
+    hedged_requests_total.labels(target=target, winner=winner).inc()
+
+def record_multicast(strategy: str, duration: float, branch_statuses: dict):
+    for branch, status in branch_statuses.items():
+        multicast_branches_total.labels(branch=branch, status=status).inc()
+    multicast_gather_duration.labels(strategy=strategy).observe(duration)
+
+def record_sink_batch(target: str, outcome: str, records: int, delivered: int):
+    sink_batches_total.labels(target=target, outcome=outcome).inc()
+    sink_batch_size.labels(target=target).observe(records)
+    if delivered:
+        sink_records_total.labels(target=target, status='delivered').inc(delivered)
+    if records - delivered:
+        sink_records_total.labels(target=target, status='failed').inc(records - delivered)
+
+def record_webhook_received(source: str, outcome: str):
+    webhook_received_total.labels(source=source, outcome=outcome).inc()
+
+def record_webhook_dispatch(source: str, outcome: str, events: int):
+    webhook_dispatched_total.labels(source=source, outcome=outcome).inc(events)
+
+def record_dashboard_push(event: str, subscribers: int):
+    dashboard_pushes_total.labels(event=event).inc()
+    dashboard_frames_total.inc(subscribers)
+
+def update_dashboard_subscribers(count: int):
+    dashboard_subscribers.set(count)
+
+def update_pool_stats(engine: str, checked_out: int, size: int, overflow: int):
+    db_pool_checked_out.labels(engine=engine).set(checked_out)
+    db_pool_size.labels(engine=engine).set(size)
+    db_pool_overflow.labels(engine=engine).set(overflow)
+
+def record_db_session(engine: str, reason: str):
+    db_sessions_total.labels(engine=engine, reason=reason).inc()
+
+def record_log_archive(rows: int, segments: int):
+    log_archive_rows_total.inc(rows)
+    log_archive_segments_total.inc(segments)
+
+def record_queue_job(status: str, wait_seconds: float):
+    execution_jobs_total.labels(status=status).inc()
+    execution_queue_wait.observe(wait_seconds)
+
+def update_queue_depth(depth: dict):
+    for status, count in depth.items():
+        execution_queue_depth.labels(status=status).set(count)
+
 def update_integration_status(integration_name: str, status: str):
     """Update integration status gauge"""
     status_map = {'deployed': 1, 'stopped': 0, 'error': -1, 'draft': 0}
+    integration_name = integration_label(integration_name)
     integration_status.labels(integration_name=integration_name).set(status_map.get(status, 0))
 
 def update_active_count(count: int):
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, Enum, ForeignKey, Text, JSON
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Enum, ForeignKey, Text, JSON, Float, UniqueConstraint, LargeBinary
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
@@ -60,12 +60,87 @@ class Integration(Base):
 class IntegrationLog(Base):
     __tablename__ = "integration_logs"
     id = Column(Integer, primary_key=True, index=True)
-    integration_id = Column(Integer, ForeignKey("integrations.id"))
+    integration_id = Column(Integer, ForeignKey("integrations.id", ondelete="CASCADE"))
     level = Column(String(20))
     message = Column(Text)
     timestamp = Column(DateTime, default=datetime.utcnow)
     integration = relationship("Integration", back_populates="logs")
 
+class ExecutionJobStatus(str, enum.Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+class ExecutionJob(Base):
+    """Durable execution queue entry, claimed by worker threads (see app.execution_queue)"""
+    __tablename__ = "execution_jobs"
+    id = Column(Integer, primary_key=True, index=True)
+    integration_id = Column(Integer, ForeignKey("integrations.id", ondelete="CASCADE"), index=True)
+    status = Column(String(20), default=ExecutionJobStatus.QUEUED.value, index=True)
+    trigger = Column(String(50), default="manual")
+    payload = Column(JSON, nullable=True)
+    payload_version = Column(Integer, default=0)  # bumped by each webhook merge; merges apply only to the version read
+    attempts = Column(Integer, default=0)
+    worker_id = Column(String(100), nullable=True)
+    claim_token = Column(String(64), nullable=True, index=True)
+    result = Column(JSON, nullable=True)
+    error = Column(Text, nullable=True)
+    enqueued_at = Column(DateTime, default=datetime.utcnow, index=True)
+    started_at = Column(DateTime, nullable=True)
+    heartbeat_at = Column(DateTime, nullable=True)  # renewed by the running worker; the lease runs from here
+    not_before = Column(DateTime, nullable=True)  # retry backoff: not claimable before this time
+    finished_at = Column(DateTime, nullable=True)
+
+class IntegrationExecution(Base):
+    __tablename__ = "integration_executions"
+    id = Column(Integer, primary_key=True, index=True)
+    integration_id = Column(Integer, ForeignKey("integrations.id", ondelete="CASCADE"), index=True)
+    started_at = Column(DateTime, default=datetime.utcnow, index=True)
+    duration_ms = Column(Float)
+    records = Column(Integer, default=0)
+    success = Column(Boolean)
+    error_type = Column(String(100), nullable=True)
+
+class IntegrationExecutionRollup(Base):
+    """Execution totals pre-aggregated per integration into minute and hour buckets"""
+    __tablename__ = "integration_execution_rollups"
+    __table_args__ = (UniqueConstraint("integration_id", "granularity", "bucket_start", name="uq_execution_rollup_bucket"),)
+    id = Column(Integer, primary_key=True, index=True)
+    integration_id = Column(Integer, ForeignKey("integrations.id", ondelete="CASCADE"), index=True)
+    granularity = Column(String(10))  # minute, hour
+    bucket_start = Column(DateTime, index=True)
+    executions = Column(Integer, default=0)
+    successes = Column(Integer, default=0)
+    failures = Column(Integer, default=0)
+    records = Column(Integer, default=0)
+    total_duration_ms = Column(Float, default=0.0)
+    max_duration_ms = Column(Float, default=0.0)
+
+class IntegrationSyncWatermark(Base):
+    """Highest change seen per integration and source, advanced only by successful runs"""
+    __tablename__ = "integration_sync_watermarks"
+    __table_args__ = (UniqueConstraint("integration_id", "source", name="uq_sync_watermark_source"),)
+    id = Column(Integer, primary_key=True, index=True)
+    integration_id = Column(Integer, ForeignKey("integrations.id", ondelete="CASCADE"), index=True)
+    source = Column(String(100))
+    last_updated_at = Column(DateTime)
+    last_id = Column(String(255))
+    records_synced = Column(Integer, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class IntegrationFingerprintSet(Base):
+    """Packed record key -> content digest map per integration and source (see app.fingerprints)"""
+    __tablename__ = "integration_fingerprint_sets"
+    __table_args__ = (UniqueConstraint("integration_id", "source", name="uq_fingerprint_set_source"),)
+    id = Column(Integer, primary_key=True, index=True)
+    integration_id = Column(Integer, ForeignKey("integrations.id", ondelete="CASCADE"), index=True)
+    source = Column(String(100))
+    version = Column(Integer, default=0)
+    record_count = Column(Integer, default=0)
+    data = Column(LargeBinary)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
 class APIEndpoint(Base):
     __tablename__ = "api_endpoints"
     id = Column(Integer, primary_key=True, index=True)
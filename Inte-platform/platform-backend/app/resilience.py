@@ -0,0 +1,244 @@
+"""Per-target circuit breakers and hedged GETs for downstream service calls.
+
+A breaker tracks outcomes over a rolling time window. Once the error rate
+crosses the threshold it opens and rejects calls immediately. After a
+cool-down it half-opens to let a few probe calls through, closing again if
+they succeed. Each call carries a permit from allow(); outcomes of calls that
+were let through before the last state change are ignored, so only the
+probes decide whether a half-open breaker closes.
+
+Hedging sends a second copy of an idempotent GET when the first has not
+answered within the target's recent latency percentile, and takes whichever
+succeeds first. Both copies run as tasks on a shared asyncio loop so the
+loser can be cancelled, which closes its connection instead of letting the
+slow target finish serving it.
+"""
+import asyncio
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict, Optional
+import httpx
+from app.config import settings
+from app.metrics import update_breaker_state, record_breaker_trip, record_breaker_rejection, record_hedged_request
+from app.timing import phase
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+class CircuitOpenError(Exception):
+    def __init__(self, target: str, retry_in: float):
+        super().__init__(f"Circuit open for {target}; retry in {retry_in:.1f}s")
+        self.target = target
+        self.retry_in = retry_in
+
+@dataclass(frozen=True)
+class Permit:
+    generation: int  # breaker state changes seen when the call was allowed
+    probe: bool = False
+
+class CircuitBreaker:
+    def __init__(self, target: str, error_threshold: float, min_calls: int, window_seconds: float,
+                 open_seconds: float, half_open_calls: int):
+        self.target = target
+        self.error_threshold = error_threshold
+        self.min_calls = min_calls
+        self.window_seconds = window_seconds
+        self.open_seconds = open_seconds
+        self.half_open_calls = half_open_calls
+        self.state = CLOSED
+        self.trips = 0
+        self._outcomes = deque()  # (monotonic time, ok)
+        self._latencies = deque(maxlen=200)
+        self._opened_at = 0.0
+        self._probes = 0
+        self._generation = 0
+        self._lock = threading.Lock()
+        update_breaker_state(target, self.state)
+
+    def _set_state(self, state: str):
+        self.state = state
+        self._generation += 1
+        update_breaker_state(self.target, state)
+
+    def _prune(self, now: float):
+        while self._outcomes and now - self._outcomes[0][0] > self.window_seconds:
+            self._outcomes.popleft()
+
+    def allow(self) -> Permit:
+        """Permit to pass back to record(); raises CircuitOpenError if the call should not be attempted"""
+        with self._lock:
+            now = time.monotonic()
+            if self.state == OPEN:
+                remaining = self._opened_at + self.open_seconds - now
+                if remaining > 0:
+                    record_breaker_rejection(self.target)
+                    raise CircuitOpenError(self.target, remaining)
+                self._set_state(HALF_OPEN)
+                self._probes = 0
+            if self.state == HALF_OPEN:
+                if self._probes >= self.half_open_calls:
+                    record_breaker_rejection(self.target)
+                    raise CircuitOpenError(self.target, 0.0)
+                self._probes += 1
+                return Permit(self._generation, probe=True)
+            return Permit(self._generation)
+
+    def record(self, ok: bool, latency: Optional[float] = None, permit: Optional[Permit] = None):
+        with self._lock:
+            now = time.monotonic()
+            if ok and latency is not None:
+                self._latencies.append(latency)
+            if permit is not None and permit.generation != self._generation:
+                # Allowed under an earlier state; e.g. a slow call from before the trip must not close a half-open breaker
+                return
+            if self.state == HALF_OPEN:
+                if ok:
+                    self._outcomes.clear()
+                    self._set_state(CLOSED)
+                else:
+                    self._trip(now)
+                return
+            self._outcomes.append((now, ok))
+            self._prune(now)
+            if self.state == CLOSED and len(self._outcomes) >= self.min_calls:
+                failures = sum(1 for _, success in self._outcomes if not success)
+                if failures / len(self._outcomes) >= self.error_threshold:
+                    self._trip(now)
+
+    def _trip(self, now: float):
+        self._opened_at = now
+        self._outcomes.clear()
+        self.trips += 1
+        self._set_state(OPEN)
+        record_breaker_trip(self.target)
+
+    def latency_percentile(self, pct: float) -> Optional[float]:
+        with self._lock:
+            if len(self._latencies) < settings.hedge_min_samples:
+                return None
+            ordered = sorted(self._latencies)
+        return ordered[min(int(len(ordered) * pct / 100), len(ordered) - 1)]
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            self._prune(time.monotonic())
+            calls = len(self._outcomes)
+            failures = sum(1 for _, ok in self._outcomes if not ok)
+        return {"target": self.target, "state": self.state, "trips": self.trips, "windowCalls": calls,
+                "windowErrorRate": round(failures / calls, 3) if calls else 0.0}
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+_hedge_loop: Optional[asyncio.AbstractEventLoop] = None
+_hedge_client: Optional[httpx.AsyncClient] = None
+_hedge_lock = threading.Lock()
+
+def get_breaker(target: str) -> CircuitBreaker:
+    breaker = _breakers.get(target)
+    if breaker is None:
+        with _breakers_lock:
+            breaker = _breakers.get(target)
+            if breaker is None:
+                breaker = CircuitBreaker(
+                    target,
+                    error_threshold=settings.breaker_error_threshold,
+                    min_calls=settings.breaker_min_calls,
+                    window_seconds=settings.breaker_window_seconds,
+                    open_seconds=settings.breaker_open_seconds,
+                    half_open_calls=settings.breaker_half_open_calls,
+                )
+                _breakers[target] = breaker
+    return breaker
+
+def breaker_snapshots() -> list:
+    return [b.snapshot() for b in list(_breakers.values())]
+
+def _timed_get(client: httpx.Client, url: str, params: Optional[dict]):
+    start = time.perf_counter()
+    response = client.get(url, params=params)
+    return response, time.perf_counter() - start
+
+def _hedge_runtime():
+    """Event loop thread and pooled async client shared by every hedged GET in the process"""
+    global _hedge_loop, _hedge_client
+    if _hedge_loop is None:
+        with _hedge_lock:
+            if _hedge_loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="hedge-loop", daemon=True).start()
+                _hedge_client = httpx.AsyncClient(timeout=settings.downstream_timeout)
+                _hedge_loop = loop
+    return _hedge_loop, _hedge_client
+
+async def _hedged_race(client: httpx.AsyncClient, target: str, url: str, params: Optional[dict], delay: float,
+                       timeout: httpx.Timeout, headers: httpx.Headers):
+    async def attempt():
+        start = time.perf_counter()
+        response = await client.get(url, params=params, timeout=timeout, headers=headers)
+        return response, time.perf_counter() - start
+
+    primary = asyncio.ensure_future(attempt())
+    done, _ = await asyncio.wait({primary}, timeout=delay)
+    if done:
+        return primary.result()
+    hedge = asyncio.ensure_future(attempt())
+    pending = {primary, hedge}
+    error = None
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                try:
+                    response, latency = task.result()
+                except httpx.HTTPError as e:
+                    error = e
+                    continue
+                if response.status_code < 500 or not pending:
+                    record_hedged_request(target, "hedge" if task is hedge else "primary")
+                    return response, latency
+    finally:
+        # Cancelling the loser aborts its request and closes its connection
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+    raise error
+
+def _hedged_get(client: httpx.Client, target: str, url: str, params: Optional[dict], delay: float):
+    loop, async_client = _hedge_runtime()
+    race = _hedged_race(async_client, target, url, params, delay, client.timeout, client.headers)
+    with phase("http"):
+        return asyncio.run_coroutine_threadsafe(race, loop).result()
+
+def resilient_get(client: httpx.Client, target: str, url: str, params: Optional[dict] = None,
+                  hedge: bool = True) -> httpx.Response:
+    """GET through the target's breaker; transport errors and 5xx responses count as failures"""
+    breaker = get_breaker(target)
+    permit = breaker.allow()
+    delay = breaker.latency_percentile(settings.hedge_percentile) if hedge and settings.hedge_enabled else None
+    try:
+        if delay is not None:
+            response, latency = _hedged_get(client, target, url, params, delay)
+        else:
+            response, latency = _timed_get(client, url, params)
+    except Exception:
+        breaker.record(False, permit=permit)
+        raise
+    breaker.record(response.status_code < 500, latency, permit)
+    return response
+
+def resilient_post(client: httpx.Client, target: str, url: str, content: bytes,
+                   headers: Optional[dict] = None) -> httpx.Response:
+    """POST through the target's breaker. Never hedged, since POSTs are not idempotent"""
+    breaker = get_breaker(target)
+    permit = breaker.allow()
+    start = time.perf_counter()
+    try:
+        response = client.post(url, content=content, headers=headers)
+    except Exception:
+        breaker.record(False, permit=permit)
+        raise
+    breaker.record(response.status_code < 500, time.perf_counter() - start, permit)
+    return response
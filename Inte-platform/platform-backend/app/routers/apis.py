@@ -3,7 +3,7 @@ from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from typing import List, Optional
 import secrets
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.models import APIEndpoint, APIKey, User
 from app.auth import get_current_user
 
@@ -21,7 +21,7 @@ class KeyCreate(BaseModel):
     name: str
 
 @router.get("/endpoints")
-def list_endpoints(db: Session = Depends(get_db), _=Depends(get_current_user)):
+def list_endpoints(db: Session = Depends(get_read_db), _=Depends(get_current_user)):
     endpoints = db.query(APIEndpoint).all()
     return [{"id": e.id, "name": e.name, "path": e.path, "method": e.method, "rateLimit": e.rate_limit, 
              "ipWhitelist": e.ip_whitelist or [], "requiresAuth": e.requires_auth, "isActive": e.is_active} for e in endpoints]
@@ -45,7 +45,7 @@ def delete_endpoint(id: int, db: Session = Depends(get_db), _=Depends(get_curren
     return {"message": "Deleted"}
 
 @router.get("/keys")
-def list_keys(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+def list_keys(db: Session = Depends(get_read_db), current_user: User = Depends(get_current_user)):
     keys = db.query(APIKey).filter(APIKey.user_id == current_user.id).all()
     return [{"id": k.id, "key": k.key, "name": k.name, "isActive": k.is_active, "createdAt": k.created_at} for k in keys]
 
@@ -0,0 +1,74 @@
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from app.database import get_db, read_session
+from app.models import User, UserRole
+from app.auth import get_current_user
+from app.bundles import BATCH_SIZE, KINDS, BundleImporter, export_bundle, parse_ndjson_lines, parse_yaml
+from app.dashboard_stream import stats_broadcaster
+from app.integration_cache import integration_cache
+
+router = APIRouter()
+
+FORMATS = {"ndjson": "application/x-ndjson", "yaml": "application/yaml"}
+
+def _format(fmt: Optional[str], content_type: str) -> str:
+    if fmt is None:
+        fmt = "yaml" if "yaml" in content_type else "ndjson"
+    if fmt not in FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of {', '.join(FORMATS)}")
+    return fmt
+
+@router.post("/import")
+async def import_bundle(request: Request, format: Optional[str] = None, atomic: bool = False,
+                        db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+    """Create everything in an NDJSON or YAML bundle; NDJSON is validated and written while it streams in"""
+    fmt = _format(format, request.headers.get("content-type", ""))
+    importer = BundleImporter(db, current_user.id, atomic=atomic)
+    if fmt == "yaml":
+        body = await request.body()
+        try:
+            items = list(parse_yaml(body))
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=f"Invalid YAML: {e}")
+        await run_in_threadpool(importer.add, items)
+    else:
+        buffer, lines = b"", []
+        async for chunk in request.stream():
+            buffer += chunk
+            *complete, buffer = buffer.split(b"\n")
+            lines.extend(complete)
+            if len(lines) >= BATCH_SIZE:
+                await run_in_threadpool(importer.add, list(parse_ndjson_lines(lines)))
+                lines = []
+        lines.append(buffer)
+        await run_in_threadpool(importer.add, list(parse_ndjson_lines(lines)))
+    report = await run_in_threadpool(importer.finish)
+    # The health engine picks new integrations up on its next refresh
+    if report["created"]["integration"]:
+        integration_cache.invalidate()
+    if any(report["created"].values()):
+        stats_broadcaster.notify()
+    return report
+
+@router.get("/export")
+def export(format: str = "ndjson", kinds: List[str] = Query(default=list(KINDS)), include_secrets: bool = False,
+           current_user: User = Depends(get_current_user)):
+    """Stream integrations, connectors and endpoints as a bundle import accepts; connector secrets are nulled"""
+    fmt = _format(format, "")
+    if include_secrets and current_user.role != UserRole.ADMIN:
+        raise HTTPException(status_code=403, detail="Only admins can export connector secrets")
+    unknown = [k for k in kinds if k not in KINDS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown kinds: {', '.join(unknown)}")
+
+    def stream():
+        db = read_session()
+        try:
+            yield from export_bundle(db, current_user, kinds, fmt, include_secrets)
+        finally:
+            db.close()
+    return StreamingResponse(stream(), media_type=FORMATS[fmt],
+                             headers={"Content-Disposition": f'attachment; filename="openpoint-bundle.{fmt}"'})
@@ -6,9 +6,10 @@ from datetime import datetime
 import httpx
 import asyncio
 
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.models import Connector, ConnectorType, ConnectorStatus
 from app.auth import get_current_user
+from app.timing import TimedAsyncTransport
 
 router = APIRouter(prefix="/connectors", tags=["connectors"])
 
@@ -171,7 +172,7 @@ async def get_connector_types():
     return CONNECTOR_TYPES
 
 @router.get("/", response_model=List[ConnectorResponse])
-async def list_connectors(db: Session = Depends(get_db), current_user = Depends(get_current_user)):
+async def list_connectors(db: Session = Depends(get_read_db), current_user = Depends(get_current_user)):
     """List all connectors"""
     return db.query(Connector).all()
 
@@ -191,7 +192,7 @@ async def create_connector(connector: ConnectorCreate, db: Session = Depends(get
     return db_connector
 
 @router.get("/{connector_id}", response_model=ConnectorResponse)
-async def get_connector(connector_id: int, db: Session = Depends(get_db), current_user = Depends(get_current_user)):
+async def get_connector(connector_id: int, db: Session = Depends(get_read_db), current_user = Depends(get_current_user)):
     """Get connector by ID"""
     connector = db.query(Connector).filter(Connector.id == connector_id).first()
     if not connector:
@@ -240,7 +241,7 @@ async def test_connector(connector_id: int, db: Session = Depends(get_db), curre
     
     try:
         if connector.type == ConnectorType.HTTP:
-            async with httpx.AsyncClient(timeout=10) as client:
+            async with httpx.AsyncClient(timeout=10, transport=TimedAsyncTransport()) as client:
                 response = await client.get(config.get("base_url", ""))
                 success = response.status_code < 500
                 message = f"HTTP {response.status_code}"
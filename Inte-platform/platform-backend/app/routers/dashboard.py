@@ -1,21 +1,32 @@
+from typing import Optional
 from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from app.database import get_db
-from app.models import Integration, APIEndpoint, IntegrationStatus
-from app.auth import get_current_user
+from starlette.concurrency import run_in_threadpool
+from app.database import get_read_db, read_session
+from app.auth import get_current_user, optional_oauth2_scheme, user_for_token
+from app.dashboard_stream import stats_broadcaster
 
 router = APIRouter()
 
 @router.get("/stats")
-def get_stats(db: Session = Depends(get_db), _=Depends(get_current_user)):
-    api_count = db.query(APIEndpoint).filter(APIEndpoint.is_active == True).count()
-    active = db.query(Integration).filter(Integration.status == IntegrationStatus.DEPLOYED).count()
-    total = db.query(Integration).count()
-    errors = db.query(Integration).filter(Integration.status == IntegrationStatus.ERROR).count()
-    error_rate = (errors / total * 100) if total > 0 else 0
-    return {
-        "apiCount": api_count,
-        "activeIntegrations": active,
-        "errorRate": round(error_rate, 2),
-        "throughput": 1250
-    }
+def get_stats(db: Session = Depends(get_read_db), _=Depends(get_current_user)):
+    return stats_broadcaster.current(db)
+
+def _authenticate(token: Optional[str]):
+    db = read_session()
+    try:
+        user_for_token(token, db)
+    finally:
+        db.close()
+
+@router.get("/stream")
+async def stream(token: Optional[str] = None, bearer: Optional[str] = Depends(optional_oauth2_scheme)):
+    """Server-Sent Events: a `snapshot` frame, then `update` frames with stats and status changes.
+
+    EventSource cannot set headers, so the token may also be passed as ?token=.
+    No session is held open for the life of the stream.
+    """
+    await run_in_threadpool(_authenticate, bearer or token)
+    return StreamingResponse(stats_broadcaster.subscribe(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
@@ -0,0 +1,20 @@
+from fastapi import APIRouter, Depends, HTTPException, Request
+from typing import Optional
+from app.auth import get_current_user
+from app.timing import profile_route
+
+router = APIRouter()
+
+@router.get("/profile")
+def profile(request: Request, route: str, method: Optional[str] = None, seconds: float = 10.0, top: int = 20,
+            _=Depends(get_current_user)):
+    """Sample stacks of requests running `route` (e.g. /api/runtime/{id}/execute) for a time window"""
+    if not 0 < seconds <= 60:
+        raise HTTPException(status_code=400, detail="seconds must be between 0 and 60")
+    try:
+        result = profile_route(request.app, route, method=method, seconds=seconds, top=top)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    if result is None:
+        raise HTTPException(status_code=409, detail="A profile is already running")
+    return result
@@ -3,19 +3,28 @@ from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from typing import Optional
 import yaml
-from app.database import get_db
-from app.models import Integration, IntegrationStatus, User
+from app.database import get_db, get_read_db
+from app.models import (ExecutionJob, Integration, IntegrationExecution, IntegrationExecutionRollup,
+                        IntegrationFingerprintSet, IntegrationLog, IntegrationStatus, IntegrationSyncWatermark, User)
 from app.auth import get_current_user
+from app.health_engine import health_engine
+from app.integration_cache import IntegrationDefinition, integration_cache
+from app.dashboard_stream import stats_broadcaster
 
 router = APIRouter()
 
+# Rows that belong to an integration. Deleted explicitly as well as by ON DELETE CASCADE,
+# because tables created before the cascade was declared do not have it.
+CHILD_MODELS = (IntegrationLog, IntegrationExecution, IntegrationExecutionRollup, IntegrationSyncWatermark,
+                IntegrationFingerprintSet, ExecutionJob)
+
 class IntegrationCreate(BaseModel):
     name: str
     description: Optional[str] = None
     flowConfig: str
 
 @router.get("/")
-def list_integrations(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+def list_integrations(db: Session = Depends(get_read_db), current_user: User = Depends(get_current_user)):
     integrations = db.query(Integration).filter(Integration.owner_id == current_user.id).all()
     return [{"id": i.id, "name": i.name, "description": i.description, "status": i.status, 
              "createdAt": i.created_at, "updatedAt": i.updated_at} for i in integrations]
@@ -26,6 +35,9 @@ def create_integration(req: IntegrationCreate, db: Session = Depends(get_db), cu
     db.add(integration)
     db.commit()
     db.refresh(integration)
+    integration_cache.put(IntegrationDefinition.from_row(integration))
+    health_engine.set_status(integration.id, integration.name, integration.status)
+    stats_broadcaster.notify()
     return {"id": integration.id, "name": integration.name, "status": integration.status}
 
 @router.post("/upload-yaml")
@@ -39,7 +51,7 @@ async def upload_yaml(file: UploadFile = File(...), _=Depends(get_current_user))
 
 @router.post("/{id}/validate")
 def validate(id: int, db: Session = Depends(get_db), _=Depends(get_current_user)):
-    integration = db.query(Integration).filter(Integration.id == id).first()
+    integration = integration_cache.get(db, id)
     if not integration:
         raise HTTPException(status_code=404, detail="Not found")
     try:
@@ -50,11 +62,15 @@ def validate(id: int, db: Session = Depends(get_db), _=Depends(get_current_user)
 
 @router.post("/{id}/deploy")
 def deploy(id: int, db: Session = Depends(get_db), _=Depends(get_current_user)):
-    integration = db.query(Integration).filter(Integration.id == id).first()
+    integration = integration_cache.get(db, id)
     if not integration:
         raise HTTPException(status_code=404, detail="Not found")
-    integration.status = IntegrationStatus.DEPLOYED
+    db.query(Integration).filter(Integration.id == id).update({"status": IntegrationStatus.DEPLOYED}, synchronize_session=False)
     db.commit()
+    integration = integration.with_status(IntegrationStatus.DEPLOYED)
+    integration_cache.put(integration)
+    health_engine.set_status(id, integration.name, integration.status)
+    stats_broadcaster.notify()
     return {"message": "Deployed", "status": integration.status}
 
 @router.delete("/{id}")
@@ -62,6 +78,11 @@ def delete(id: int, db: Session = Depends(get_db), _=Depends(get_current_user)):
     integration = db.query(Integration).filter(Integration.id == id).first()
     if not integration:
         raise HTTPException(status_code=404, detail="Not found")
+    for model in CHILD_MODELS:
+        db.query(model).filter(model.integration_id == id).delete(synchronize_session=False)
     db.delete(integration)
     db.commit()
+    integration_cache.invalidate(id)
+    health_engine.forget(id)
+    stats_broadcaster.notify()
     return {"message": "Deleted"}
@@ -1,22 +1,29 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
 from datetime import datetime, timedelta
-import random
-import time
-import httpx
-from app.database import get_db
-from app.models import Integration, IntegrationLog, IntegrationStatus
+from typing import Optional
+from app.database import get_db, get_read_db
+from app.models import Integration, IntegrationLog, IntegrationStatus, IntegrationSyncWatermark, ExecutionJob
 from app.auth import get_current_user
-from app.metrics import (
-    record_execution, record_api_call, record_error, 
-    update_integration_status, update_active_count
-)
+from app.resilience import breaker_snapshots
+from app.sync import load_watermarks
+from app.config import settings
+from app.executor import run_integration
+from app import execution_queue
+from app.log_search import search_logs
+from app.log_archive import read_logs
+from app.executions import execution_summary, execution_series, GRANULARITIES
+from app.health_engine import health_engine
+from app.integration_cache import integration_cache
+from app.dashboard_stream import stats_broadcaster
+from app.timing import TimedJSONResponse
+from app.metrics import update_integration_status, update_active_count
 
 router = APIRouter()
 
 def sync_integration_metrics(db: Session):
     """Sync all integration statuses to Prometheus"""
-    integrations = db.query(Integration).all()
+    integrations = integration_cache.all(db)
     active_count = 0
     for i in integrations:
         update_integration_status(i.name, i.status.value if i.status else 'draft')
@@ -24,12 +31,17 @@ def sync_integration_metrics(db: Session):
             active_count += 1
     update_active_count(active_count)
 
+@router.get("/breakers")
+def breakers(_=Depends(get_current_user)):
+    """Circuit breaker state for each downstream target seen by this worker"""
+    return breaker_snapshots()
+
 @router.post("/{id}/start")
 def start(id: int, db: Session = Depends(get_db), _=Depends(get_current_user)):
-    integration = db.query(Integration).filter(Integration.id == id).first()
+    integration = integration_cache.get(db, id)
     if not integration:
         raise HTTPException(status_code=404, detail="Not found")
-    integration.status = IntegrationStatus.DEPLOYED
+    db.query(Integration).filter(Integration.id == id).update({"status": IntegrationStatus.DEPLOYED}, synchronize_session=False)
     
     # Add startup logs
     db.add(IntegrationLog(integration_id=id, level="INFO", message="Integration started"))
@@ -37,8 +49,12 @@ def start(id: int, db: Session = Depends(get_db), _=Depends(get_current_user)):
     db.add(IntegrationLog(integration_id=id, level="INFO", message="Camel context initialized successfully"))
     db.add(IntegrationLog(integration_id=id, level="INFO", message="Route started and listening for events"))
     db.commit()
+    integration = integration.with_status(IntegrationStatus.DEPLOYED)
+    integration_cache.put(integration)
     
     # Update Prometheus metrics
+    health_engine.set_status(id, integration.name, integration.status)
+    stats_broadcaster.notify()
     update_integration_status(integration.name, 'deployed')
     sync_integration_metrics(db)
     
@@ -46,132 +62,135 @@ def start(id: int, db: Session = Depends(get_db), _=Depends(get_current_user)):
 
 @router.post("/{id}/stop")
 def stop(id: int, db: Session = Depends(get_db), _=Depends(get_current_user)):
-    integration = db.query(Integration).filter(Integration.id == id).first()
+    integration = integration_cache.get(db, id)
     if not integration:
         raise HTTPException(status_code=404, detail="Not found")
-    integration.status = IntegrationStatus.STOPPED
+    db.query(Integration).filter(Integration.id == id).update({"status": IntegrationStatus.STOPPED}, synchronize_session=False)
     
     # Add shutdown logs
     db.add(IntegrationLog(integration_id=id, level="INFO", message="Graceful shutdown initiated"))
     db.add(IntegrationLog(integration_id=id, level="INFO", message="Route stopped"))
     db.add(IntegrationLog(integration_id=id, level="INFO", message="Integration stopped"))
     db.commit()
+    integration = integration.with_status(IntegrationStatus.STOPPED)
+    integration_cache.put(integration)
     
     # Update Prometheus metrics
+    health_engine.set_status(id, integration.name, integration.status)
+    stats_broadcaster.notify()
     update_integration_status(integration.name, 'stopped')
     sync_integration_metrics(db)
     
     return {"message": "Stopped", "status": integration.status}
 
+@router.get("/queue")
+def queue(db: Session = Depends(get_db), _=Depends(get_current_user)):
+    return {"workers": settings.execution_workers, "depth": execution_queue.queue_depth(db)}
+
+@router.get("/logs/search")
+def log_search(q: str, integration_id: Optional[int] = None, level: Optional[str] = None, since: Optional[datetime] = None,
+               until: Optional[datetime] = None, limit: int = 50, offset: int = 0,
+               db: Session = Depends(get_read_db), _=Depends(get_current_user)):
+    """Ranked full-text search over integration logs, newest first among equal ranks.
+
+    Archived logs are not searched; `archivedBefore` tells the caller how far back results can go.
+    """
+    if not q.strip():
+        raise HTTPException(status_code=400, detail="q must not be empty")
+    if not 1 <= limit <= 200 or offset < 0:
+        raise HTTPException(status_code=400, detail="limit must be between 1 and 200 and offset non-negative")
+    results, has_more = search_logs(db, q, integration_id=integration_id, level=level, since=since, until=until,
+                                    limit=limit, offset=offset)
+    archived_before = datetime.utcnow() - timedelta(hours=settings.log_retention_hours) if settings.log_retention_hours > 0 else None
+    return {"query": q, "results": results, "limit": limit, "offset": offset, "hasMore": has_more,
+            "archivedBefore": archived_before}
+
+@router.get("/executions/{execution_id}")
+def execution_status(execution_id: int, db: Session = Depends(get_db), _=Depends(get_current_user)):
+    job = db.query(ExecutionJob).filter(ExecutionJob.id == execution_id).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Not found")
+    return {"executionId": job.id, "integrationId": job.integration_id, "status": job.status, "trigger": job.trigger,
+            "attempts": job.attempts, "result": job.result, "error": job.error, "enqueuedAt": job.enqueued_at,
+            "startedAt": job.started_at, "heartbeatAt": job.heartbeat_at, "notBefore": job.not_before,
+            "finishedAt": job.finished_at}
+
 @router.post("/{id}/execute")
-def execute(id: int, db: Session = Depends(get_db), _=Depends(get_current_user)):
-    """Manually trigger integration execution with real metrics"""
-    integration = db.query(Integration).filter(Integration.id == id).first()
+def execute(id: int, response: Response, db: Session = Depends(get_db), _=Depends(get_current_user)):
+    """Trigger an integration execution; queued (202) when workers are enabled, inline otherwise"""
+    integration = integration_cache.get(db, id)
     if not integration:
         raise HTTPException(status_code=404, detail="Not found")
     
     if integration.status != IntegrationStatus.DEPLOYED:
         raise HTTPException(status_code=400, detail="Integration must be deployed to execute")
     
-    logs_to_add = []
-    base_time = datetime.utcnow()
-    start_time = time.time()
-    success = True
-    records_processed = 0
-    
-    logs_to_add.append(IntegrationLog(integration_id=id, level="INFO", message=f"Execution triggered for '{integration.name}'", timestamp=base_time))
-    
-    # Try to call actual mock services and record metrics
-    try:
-        with httpx.Client(timeout=5.0) as client:
-            # Call ERP
-            erp_start = time.time()
-            erp_response = client.get("http://erp-service:8091/orders")
-            erp_duration = time.time() - erp_start
-            orders = erp_response.json()
-            
-            # Record ERP API call metric
-            record_api_call(integration.name, "erp-service", "GET", erp_response.status_code, erp_duration)
-            
-            logs_to_add.append(IntegrationLog(integration_id=id, level="INFO", message=f"Fetched {len(orders)} orders from ERP service ({erp_duration*1000:.0f}ms)", timestamp=base_time + timedelta(milliseconds=150)))
-            
-            # Call CRM
-            crm_start = time.time()
-            crm_response = client.get("http://crm-service:8092/customers")
-            crm_duration = time.time() - crm_start
-            customers = crm_response.json()
-            
-            # Record CRM API call metric
-            record_api_call(integration.name, "crm-service", "GET", crm_response.status_code, crm_duration)
-            
-            logs_to_add.append(IntegrationLog(integration_id=id, level="INFO", message=f"Fetched {len(customers)} customers from CRM service ({crm_duration*1000:.0f}ms)", timestamp=base_time + timedelta(milliseconds=280)))
-            
-            records_processed = len(orders) + len(customers)
-            logs_to_add.append(IntegrationLog(integration_id=id, level="INFO", message="Data transformation completed", timestamp=base_time + timedelta(milliseconds=320)))
-            logs_to_add.append(IntegrationLog(integration_id=id, level="INFO", message=f"Successfully synced {records_processed} records", timestamp=base_time + timedelta(milliseconds=450)))
-            
-    except Exception as e:
-        # Simulate execution if services not reachable
-        records_processed = random.randint(10, 150)
-        logs_to_add.append(IntegrationLog(integration_id=id, level="INFO", message=f"Connecting to source endpoint...", timestamp=base_time + timedelta(milliseconds=100)))
-        logs_to_add.append(IntegrationLog(integration_id=id, level="INFO", message=f"Fetched {records_processed} records from source", timestamp=base_time + timedelta(milliseconds=250)))
-        logs_to_add.append(IntegrationLog(integration_id=id, level="INFO", message="Applying transformation rules", timestamp=base_time + timedelta(milliseconds=300)))
-        logs_to_add.append(IntegrationLog(integration_id=id, level="INFO", message=f"Transformed {records_processed} records", timestamp=base_time + timedelta(milliseconds=380)))
-        logs_to_add.append(IntegrationLog(integration_id=id, level="INFO", message="Sending to destination endpoint...", timestamp=base_time + timedelta(milliseconds=420)))
-        logs_to_add.append(IntegrationLog(integration_id=id, level="INFO", message=f"Successfully synced {records_processed} records to destination", timestamp=base_time + timedelta(milliseconds=580)))
-    
-    # Random chance of warning
-    if random.random() < 0.3:
-        latency = random.randint(800, 2500)
-        logs_to_add.append(IntegrationLog(integration_id=id, level="WARN", message=f"Slow response detected: {latency}ms", timestamp=base_time + timedelta(milliseconds=600)))
-    
-    # Random chance of error (10%)
-    if random.random() < 0.1:
-        success = False
-        error_type = random.choice(["ConnectionTimeout", "ValidationError", "TransformationError"])
-        logs_to_add.append(IntegrationLog(integration_id=id, level="ERROR", message=f"{error_type}: Failed to complete execution", timestamp=base_time + timedelta(milliseconds=620)))
-        record_error(integration.name, error_type)
-    
-    execution_duration = time.time() - start_time
-    logs_to_add.append(IntegrationLog(
-        integration_id=id, 
-        level="INFO" if success else "ERROR", 
-        message=f"Execution {'completed successfully' if success else 'failed'} in {execution_duration*1000:.0f}ms", 
-        timestamp=base_time + timedelta(milliseconds=650)
-    ))
-    
-    # Record execution metrics
-    record_execution(integration.name, success, execution_duration, records_processed)
+    if execution_queue.worker_pool is not None:
+        job = execution_queue.enqueue(db, id)
+        execution_queue.worker_pool.notify()
+        response.status_code = 202
+        return {"message": "Execution queued", "executionId": job.id, "status": job.status,
+                "statusUrl": f"/api/runtime/executions/{job.id}"}
     
-    for log in logs_to_add:
-        db.add(log)
+    result = run_integration(db, integration)
+    return {"message": "Execution completed", **result}
+
+@router.get("/{id}/watermarks")
+def watermarks(id: int, db: Session = Depends(get_read_db), _=Depends(get_current_user)):
+    return [{"source": w.source, "lastUpdatedAt": w.last_updated_at, "lastId": w.last_id,
+             "recordsSynced": w.records_synced, "updatedAt": w.updated_at} for w in load_watermarks(db, id).values()]
+
+@router.delete("/{id}/watermarks")
+def reset_watermarks(id: int, db: Session = Depends(get_db), _=Depends(get_current_user)):
+    """Forget sync progress so the next run does a full fetch"""
+    deleted = db.query(IntegrationSyncWatermark).filter(IntegrationSyncWatermark.integration_id == id).delete()
     db.commit()
-    
-    return {"message": "Execution completed", "success": success, "logsGenerated": len(logs_to_add), "recordsProcessed": records_processed}
+    return {"message": "Watermarks reset", "deleted": deleted}
 
 @router.get("/{id}/logs")
-def logs(id: int, db: Session = Depends(get_db), _=Depends(get_current_user)):
-    logs = db.query(IntegrationLog).filter(IntegrationLog.integration_id == id).order_by(IntegrationLog.timestamp.desc()).limit(100).all()
-    return [{"id": l.id, "level": l.level, "message": l.message, "timestamp": l.timestamp} for l in logs]
+def logs(id: int, limit: int = 100, before: Optional[datetime] = None, db: Session = Depends(get_read_db), _=Depends(get_current_user)):
+    """Newest logs first, from the table and then the archive; pass the last timestamp as `before` for the next page"""
+    if not 1 <= limit <= 1000:
+        raise HTTPException(status_code=400, detail="limit must be between 1 and 1000")
+    return read_logs(db, id, limit, before=before)
+
+@router.get("/health")
+def health_all(_=Depends(get_current_user)):
+    """Health of every integration from the in-memory windows; no database access"""
+    refreshed_at = health_engine.refreshed_at
+    # Already JSON-native, so skip jsonable_encoder's per-field walk
+    return TimedJSONResponse({"integrations": health_engine.snapshot(),
+                              "refreshedAt": refreshed_at.isoformat() if refreshed_at else None,
+                              "lastCheck": datetime.utcnow().isoformat()})
 
 @router.get("/{id}/health")
-def health(id: int, db: Session = Depends(get_db), _=Depends(get_current_user)):
-    integration = db.query(Integration).filter(Integration.id == id).first()
-    if not integration:
-        raise HTTPException(status_code=404, detail="Not found")
-    
-    # Get recent error count
-    recent_errors = db.query(IntegrationLog).filter(
-        IntegrationLog.integration_id == id,
-        IntegrationLog.level == "ERROR",
-        IntegrationLog.timestamp > datetime.utcnow() - timedelta(hours=1)
-    ).count()
+def health(id: int, db: Session = Depends(get_read_db), _=Depends(get_current_user)):
+    if not health_engine.known(id):
+        # Created since the last refresh; pick it up now
+        integration = integration_cache.get(db, id)
+        if not integration:
+            raise HTTPException(status_code=404, detail="Not found")
+        health_engine.set_status(id, integration.name, integration.status)
+    entry = health_engine.snapshot(id)[0]
+    hour = entry["windows"]["60m"]
     
     return {
-        "integrationId": id,
-        "name": integration.name,
-        "status": integration.status,
-        "healthy": integration.status == IntegrationStatus.DEPLOYED and recent_errors == 0,
-        "recentErrors": recent_errors,
+        **entry,
+        "recentErrors": hour["failures"],
+        "recentExecutions": hour["executions"],
+        "successRate": round(100 - hour["errorRate"], 2) if hour["executions"] else None,
+        "avgDurationMs": hour["avgDurationMs"],
         "lastCheck": datetime.utcnow().isoformat()
     }
+
+@router.get("/{id}/executions")
+def executions(id: int, granularity: str = "hour", hours: int = 24, db: Session = Depends(get_read_db), _=Depends(get_current_user)):
+    if granularity not in GRANULARITIES:
+        raise HTTPException(status_code=400, detail=f"granularity must be one of {', '.join(GRANULARITIES)}")
+    since = datetime.utcnow() - timedelta(hours=hours)
+    return {
+        "integrationId": id,
+        "granularity": granularity,
+        "summary": execution_summary(db, since, integration_id=id, granularity=granularity),
+        "buckets": execution_series(db, id, since, granularity),
+    }
@@ -0,0 +1,27 @@
+import hashlib
+import hmac
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from app.config import settings
+from app.metrics import record_webhook_received
+from app.webhook_spool import get_spool
+
+router = APIRouter()
+
+def _valid_signature(body: bytes, signature: str) -> bool:
+    expected = hmac.new(settings.webhook_secret.encode(), body, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, signature.removeprefix("sha256="))
+
+@router.post("/{source}", status_code=202)
+async def receive_webhook(source: str, request: Request):
+    """Spool the payload and acknowledge; the integration runs later from the execution queue"""
+    body = await request.body()
+    if settings.webhook_secret and not _valid_signature(body, request.headers.get("x-signature", "")):
+        record_webhook_received(source, "bad_signature")
+        raise HTTPException(status_code=401, detail="Invalid signature")
+    spool = get_spool()
+    position = spool.append(source, body)
+    if spool.fsync == "always":
+        await run_in_threadpool(spool.sync, position)
+    record_webhook_received(source, "accepted")
+    return {"accepted": True}
@@ -0,0 +1,116 @@
+"""Concurrent fan-out for `multicast` flow steps.
+
+Branches run in a shared thread pool. The gather step waits only as long as
+the aggregation strategy needs:
+
+- merge: every required branch (all branches unless `required` is given),
+  each bounded by its timeout; optional branches are kept if already done.
+  A required branch that errors or times out fails the gather
+- first-wins: the first branch that succeeds; later answers are dropped
+- quorum: the first `quorum` successful branches (default: a majority)
+
+Branches still running when the outcome is decided are reported as
+pending and their results are dropped, so latency follows the slowest
+branch the strategy actually needs.
+"""
+import contextvars
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+STRATEGIES = ("merge", "first-wins", "quorum")
+
+_pool = ThreadPoolExecutor(max_workers=32, thread_name_prefix="multicast")
+
+@dataclass
+class Branch:
+    name: str
+    fetch: Callable[[float], List[dict]]  # called with the branch timeout in seconds
+    timeout: float
+    required: bool = True
+
+@dataclass
+class BranchResult:
+    name: str
+    status: str  # ok, error, timeout, pending, dropped
+    records: List[dict] = field(default_factory=list)
+    duration: float = 0.0
+    error: Optional[str] = None
+
+@dataclass
+class GatherResult:
+    strategy: str
+    complete: bool
+    branches: Dict[str, BranchResult]
+    duration: float
+
+    @property
+    def records(self) -> Dict[str, List[dict]]:
+        return {name: r.records for name, r in self.branches.items() if r.status == "ok"}
+
+    @property
+    def partial(self) -> bool:
+        return any(r.status != "ok" for r in self.branches.values())
+
+def _run_branch(branch: Branch) -> BranchResult:
+    start = time.perf_counter()
+    try:
+        records = branch.fetch(branch.timeout)
+        return BranchResult(branch.name, "ok", records, time.perf_counter() - start)
+    except Exception as e:
+        return BranchResult(branch.name, "error", [], time.perf_counter() - start, f"{type(e).__name__}: {e}")
+
+def scatter_gather(branches: List[Branch], strategy: str = "merge", quorum: Optional[int] = None) -> GatherResult:
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unknown aggregation strategy '{strategy}', expected one of {', '.join(STRATEGIES)}")
+    start = time.perf_counter()
+    futures = {_pool.submit(contextvars.copy_context().run, _run_branch, b): b for b in branches}
+    deadlines = {f: start + b.timeout for f, b in futures.items()}
+    needed = quorum or (len(branches) // 2 + 1)
+    results: Dict[str, BranchResult] = {}
+    pending = set(futures)
+
+    required = [b for b in branches if b.required]
+
+    def satisfied() -> bool:
+        ok = sum(1 for r in results.values() if r.status == "ok")
+        if strategy == "first-wins":
+            return ok >= 1
+        if strategy == "quorum":
+            return ok >= needed
+        return all(b.name in results and results[b.name].status == "ok" for b in required)
+
+    def settled() -> bool:
+        if strategy != "merge":
+            return satisfied()
+        # A failed required branch already decides a merge; don't wait for the rest
+        return satisfied() or any(b.name in results and results[b.name].status != "ok" for b in required)
+
+    while pending and not settled():
+        now = time.perf_counter()
+        for f in [f for f in pending if deadlines[f] <= now]:
+            pending.discard(f)
+            branch = futures[f]
+            results[branch.name] = BranchResult(branch.name, "timeout", [], branch.timeout,
+                                                f"No response within {branch.timeout * 1000:.0f}ms")
+        if not pending:
+            break
+        done, _ = wait(pending, timeout=max(min(deadlines[f] for f in pending) - now, 0), return_when=FIRST_COMPLETED)
+        for f in done:
+            pending.discard(f)
+            results[futures[f].name] = f.result()
+
+    for f in pending:
+        branch = futures[f]
+        if f.done():
+            results[branch.name] = f.result()
+        else:
+            results[branch.name] = BranchResult(branch.name, "pending", [], time.perf_counter() - start,
+                                                "Dropped once the aggregation outcome was decided")
+    if strategy == "first-wins":
+        winners = [r for r in results.values() if r.status == "ok"]
+        for r in winners[1:]:
+            r.status, r.records, r.error = "dropped", [], f"Answered after '{winners[0].name}'"
+    ordered = {b.name: results[b.name] for b in branches}
+    return GatherResult(strategy, satisfied(), ordered, time.perf_counter() - start)
@@ -0,0 +1,149 @@
+"""Micro-batching sink for outbound HTTP `to:` steps.
+
+Records are JSON-encoded once on submit and buffered. A batch is POSTed as a
+JSON array to the destination's `/bulk` endpoint when it reaches
+`max_records` or `max_bytes`, or when its first record has waited `linger`
+seconds. At most `max_in_flight` batches are outstanding; further submits
+block until one finishes, which keeps memory bounded when the destination is
+slower than the source. The destination reports results per record by
+index, and the sink reports failures by each record's submission index,
+since records need not carry a unique key.
+"""
+import contextvars
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+import httpx
+from app.config import settings
+from app.metrics import record_sink_batch
+from app.resilience import resilient_post
+
+@dataclass
+class SinkReport:
+    delivered: int = 0
+    failed: Dict[int, str] = field(default_factory=dict)  # submission index -> error
+    batches: int = 0
+    bytes: int = 0
+    duration: float = 0.0
+
+    @property
+    def submitted(self) -> int:
+        return self.delivered + len(self.failed)
+
+class BatchingSink:
+    def __init__(self, client: httpx.Client, target: str, url: str, max_records: Optional[int] = None,
+                 max_bytes: Optional[int] = None, linger: Optional[float] = None, max_in_flight: Optional[int] = None):
+        self.client = client
+        self.target = target
+        self.url = url.rstrip("/") + "/bulk"
+        self.max_records = max_records or settings.sink_batch_records
+        self.max_bytes = max_bytes or settings.sink_batch_bytes
+        self.linger = linger if linger is not None else settings.sink_linger_ms / 1000
+        in_flight = max_in_flight or settings.sink_max_in_flight
+        self.report = SinkReport()
+        self._submitted = 0
+        self._indexes: List[int] = []
+        self._parts: List[bytes] = []
+        self._size = 0
+        self._opened = 0.0
+        self._closed = False
+        self._lock = threading.Lock()
+        self._wake = threading.Condition(self._lock)
+        self._report_lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(in_flight)
+        self._pool = ThreadPoolExecutor(max_workers=in_flight, thread_name_prefix="sink")
+        self._futures = []
+        self._started = time.perf_counter()
+        self._lingerer = threading.Thread(target=self._linger_loop, name="sink-linger", daemon=True)
+        self._lingerer.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def submit(self, record: dict):
+        part = json.dumps(record, separators=(",", ":"), default=str).encode()
+        ready = []
+        with self._lock:
+            if self._parts and self._size + len(part) + 1 > self.max_bytes:
+                ready.append(self._take())
+            if not self._parts:
+                self._opened = time.monotonic()
+                self._wake.notify()
+            self._indexes.append(self._submitted)
+            self._submitted += 1
+            self._parts.append(part)
+            self._size += len(part) + 1
+            if len(self._parts) >= self.max_records:
+                ready.append(self._take())
+        for batch in ready:
+            self._dispatch(batch)
+
+    def close(self) -> SinkReport:
+        """Flush what is buffered, wait for in-flight batches and return the report"""
+        with self._lock:
+            self._closed = True
+            batch = self._take() if self._parts else None
+            self._wake.notify()
+        if batch:
+            self._dispatch(batch)
+        self._lingerer.join()
+        wait(self._futures)
+        self._pool.shutdown()
+        self.report.duration = time.perf_counter() - self._started
+        return self.report
+
+    def _take(self) -> Tuple[List[int], List[bytes]]:
+        batch = (self._indexes, self._parts)
+        self._indexes, self._parts, self._size = [], [], 0
+        return batch
+
+    def _linger_loop(self):
+        while True:
+            with self._lock:
+                if self._closed:
+                    return
+                if not self._parts:
+                    self._wake.wait()
+                    continue
+                remaining = self._opened + self.linger - time.monotonic()
+                if remaining > 0:
+                    self._wake.wait(remaining)
+                    continue
+                batch = self._take()
+            self._dispatch(batch)
+
+    def _dispatch(self, batch: Tuple[List[int], List[bytes]]):
+        self._slots.acquire()
+        future = self._pool.submit(contextvars.copy_context().run, self._send, *batch)
+        future.add_done_callback(lambda _: self._slots.release())
+        self._futures.append(future)
+
+    def _send(self, indexes: List[int], parts: List[bytes]):
+        body = b"[" + b",".join(parts) + b"]"
+        failed = {}
+        try:
+            response = resilient_post(self.client, self.target, self.url, body, headers={"Content-Type": "application/json"})
+            if response.status_code >= 400:
+                failed = dict.fromkeys(indexes, f"HTTP {response.status_code}")
+            else:
+                results = response.json().get("results") or []
+                for result in results:
+                    index = result.get("index")
+                    if isinstance(index, int) and 0 <= index < len(indexes) and result.get("status") != "accepted":
+                        failed[indexes[index]] = result.get("error") or result.get("status") or "rejected"
+        except Exception as e:
+            failed = dict.fromkeys(indexes, f"{type(e).__name__}: {e}")
+        delivered = len(indexes) - len(failed)
+        outcome = "ok" if not failed else ("partial" if delivered else "failed")
+        record_sink_batch(self.target, outcome, len(indexes), delivered)
+        with self._report_lock:
+            self.report.delivered += delivered
+            self.report.failed.update(failed)
+            self.report.batches += 1
+            self.report.bytes += len(body)
@@ -0,0 +1,206 @@
+"""Per-request wall-time attribution.
+
+A RequestTimings object is stored in a context variable for the duration of
+each HTTP request; DB cursor events, outbound httpx transports, password
+hashing and JSON rendering add their elapsed time to it as named phases. The
+middleware turns the result into a Server-Timing header and Prometheus
+histograms. The same cursor events count statements per request, flag
+SELECTs repeated within one request (N+1 patterns) and log slow queries.
+Writes are not flagged: a flush of many new rows is one statement per row on
+some dialects, which is not a lazy-loading pattern.
+"""
+import logging
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+import httpx
+from fastapi.responses import JSONResponse
+from sqlalchemy import event
+from app.config import settings
+from app.metrics import record_request_phases, record_request_queries
+
+logger = logging.getLogger(__name__)
+
+PHASES = ("db", "http", "hash", "encode")
+
+class RequestTimings:
+    __slots__ = ("phases", "started", "scope", "queries", "statements")
+
+    def __init__(self, scope=None):
+        self.phases = dict.fromkeys(PHASES, 0.0)
+        self.started = time.perf_counter()
+        self.scope = scope
+        self.queries = 0
+        self.statements = Counter()
+
+    def add(self, phase: str, seconds: float):
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+    def add_query(self, statement: str, seconds: float):
+        self.phases["db"] += seconds
+        self.queries += 1
+        if statement.lstrip()[:6].upper() == "SELECT":
+            self.statements[statement] += 1
+
+    @property
+    def route(self) -> str:
+        return _route_path(self.scope) if self.scope is not None else "background"
+
+    def repeated_statements(self, threshold: int):
+        return [(statement, count) for statement, count in self.statements.items() if count >= threshold]
+
+_current: ContextVar[Optional[RequestTimings]] = ContextVar("request_timings", default=None)
+
+def current_timings() -> Optional[RequestTimings]:
+    return _current.get()
+
+@contextmanager
+def phase(name: str):
+    """Attribute the wall time of the block to `name` on the current request"""
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(name, time.perf_counter() - start)
+
+def _short_sql(statement: str, limit: int = 300) -> str:
+    statement = " ".join(statement.split())
+    return statement if len(statement) <= limit else statement[:limit] + "..."
+
+def instrument_engine(engine):
+    """Accumulate cursor time and statement counts into the current request; log slow queries"""
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+        timings = _current.get()
+        if timings is not None:
+            timings.add_query(statement, elapsed)
+        if elapsed * 1000 >= settings.slow_query_ms:
+            route = timings.route if timings is not None else "background"
+            logger.warning("Slow query (%.1fms) on %s: %s", elapsed * 1000, route, _short_sql(statement))
+
+class TimedTransport(httpx.HTTPTransport):
+    def handle_request(self, request):
+        with phase("http"):
+            return super().handle_request(request)
+
+class TimedAsyncTransport(httpx.AsyncHTTPTransport):
+    async def handle_async_request(self, request):
+        with phase("http"):
+            return await super().handle_async_request(request)
+
+class TimedJSONResponse(JSONResponse):
+    def render(self, content) -> bytes:
+        with phase("encode"):
+            return super().render(content)
+
+def _route_path(scope) -> str:
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+def _report_queries(method: str, timings: RequestTimings):
+    route = timings.route
+    repeated = timings.repeated_statements(settings.n_plus_one_threshold)
+    for statement, count in repeated:
+        logger.warning("Possible N+1 on %s %s: statement executed %d times: %s", method, route, count, _short_sql(statement))
+    record_request_queries(method, route, timings.queries, len(repeated))
+
+class TimingMiddleware:
+    """Pure ASGI middleware that adds Server-Timing and records phase histograms"""
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        timings = RequestTimings(scope)
+        token = _current.set(timings)
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                total = time.perf_counter() - timings.started
+                phases = dict(timings.phases)
+                phases["app"] = max(total - sum(phases.values()), 0.0)
+                header = ", ".join(f"{name};dur={seconds * 1000:.2f}" for name, seconds in phases.items())
+                header += f', queries;desc="{timings.queries}", total;dur={total * 1000:.2f}'
+                message.setdefault("headers", []).append((b"server-timing", header.encode("latin-1")))
+                record_request_phases(scope["method"], timings.route, phases, total)
+                _report_queries(scope["method"], timings)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+
+_profile_lock = threading.Lock()
+
+def _endpoint_codes(app, route_path: str, method: Optional[str]):
+    codes = set()
+    for route in app.routes:
+        if getattr(route, "path", None) != route_path:
+            continue
+        if method and method.upper() not in (getattr(route, "methods", None) or ()):
+            continue
+        endpoint = getattr(route, "endpoint", None)
+        if endpoint is not None and hasattr(endpoint, "__code__"):
+            codes.add(endpoint.__code__)
+    return codes
+
+def profile_route(app, route_path: str, method: Optional[str] = None, seconds: float = 10.0,
+                  interval: float = 0.005, top: int = 20) -> Optional[dict]:
+    """Sample every thread's stack for `seconds` and aggregate those running the route's endpoint.
+
+    Returns None if another profile is already running. Stacks are collapsed
+    root-to-leaf as ``file:function:line`` frames joined by ``;``.
+    """
+    codes = _endpoint_codes(app, route_path, method)
+    if not codes:
+        raise ValueError(f"No route matches {method or '*'} {route_path}")
+    if not _profile_lock.acquire(blocking=False):
+        return None
+    try:
+        stacks = Counter()
+        samples = 0
+        me = threading.get_ident()
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == me:
+                    continue
+                chain = []
+                matched = False
+                while frame is not None:
+                    code = frame.f_code
+                    matched = matched or code in codes
+                    chain.append(f"{code.co_filename.rsplit('/', 1)[-1]}:{code.co_name}:{frame.f_lineno}")
+                    frame = frame.f_back
+                if matched:
+                    stacks[";".join(reversed(chain))] += 1
+            samples += 1
+            time.sleep(interval)
+        matched_total = sum(stacks.values())
+        return {
+            "route": route_path,
+            "method": method,
+            "seconds": seconds,
+            "samples": samples,
+            "matchedSamples": matched_total,
+            "stacks": [{"stack": stack, "count": count, "percent": round(count / matched_total * 100, 2)}
+                       for stack, count in stacks.most_common(top)],
+        }
+    finally:
+        _profile_lock.release()
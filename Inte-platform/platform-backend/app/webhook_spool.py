@@ -0,0 +1,359 @@
+"""Append-only spool for inbound webhooks and the dispatcher that drains it.
+
+The ingress handler only frames the payload and appends it to this process's
+open segment file (``<pid>-<n>.open``), so the provider is acknowledged
+without touching the database. Each frame is a header holding the length,
+the CRC32 and the receive time, followed by ``source NUL body``. Segments
+are sealed (renamed to ``.seg``) once they reach the size limit. The writer
+holds an flock on the segment's ``.lock`` file for as long as the segment is
+open, so the dispatcher seals a leftover ``.open`` segment only once that lock
+is free, i.e. its writer has exited. This holds across containers sharing the
+volume and survives PID reuse after a restart.
+
+Durability follows WEBHOOK_FSYNC: ``interval`` fsyncs in the background
+every WEBHOOK_FSYNC_MS (a crash of the host, not the process, can lose that
+window), ``always`` fsyncs before acknowledging (concurrent requests share
+one fsync), and ``never`` leaves it to the OS.
+
+The dispatcher tails every segment in the directory. It holds an flock on a
+segment while it reads, so several workers can share one spool. Events are
+turned into execution jobs (trigger "webhook") for each deployed integration
+whose route reads ``from: "webhook:<source>"``; while such a job is still
+queued, new events are folded into it up to the batch size. The read offset is
+checkpointed only after the jobs commit, so delivery is at-least-once. Fully
+drained sealed segments are deleted. With EXECUTION_WORKERS=0 there is no
+worker pool, so the dispatcher thread runs the queued jobs itself.
+"""
+import fcntl
+import json
+import logging
+import os
+import socket
+import struct
+import threading
+import time
+import zlib
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from app import execution_queue
+from app.config import settings
+from app.database import SessionLocal
+from app.integration_cache import integration_cache
+from sqlalchemy import update
+from app.models import ExecutionJob, IntegrationStatus
+from app.metrics import record_webhook_dispatch
+
+logger = logging.getLogger(__name__)
+
+FRAME_HEADER = struct.Struct(">IId")  # payload length, crc32, received-at epoch seconds
+
+class WebhookSpool:
+    def __init__(self, directory: str, segment_bytes: int, fsync: str, fsync_interval: float):
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.fsync = fsync
+        self.fsync_interval = fsync_interval
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self._fd: Optional[int] = None
+        self._lock_fd: Optional[int] = None
+        self._path: Optional[str] = None
+        self._size = 0
+        self._counter = 0
+        self._written = 0  # bytes appended by this process, across segments
+        self._synced = 0
+        self._stop = threading.Event()
+        self._syncer: Optional[threading.Thread] = None
+        os.makedirs(directory, exist_ok=True)
+
+    def start(self):
+        if self.fsync == "interval" and self._syncer is None:
+            self._syncer = threading.Thread(target=self._sync_loop, name="webhook-fsync", daemon=True)
+            self._syncer.start()
+
+    def close(self):
+        self._stop.set()
+        if self._syncer is not None:
+            self._syncer.join()
+        with self._lock:
+            if self._fd is not None:
+                os.fsync(self._fd)
+                os.close(self._fd)
+                self._fd = None
+                self._release_lock()
+
+    def _open_segment(self):
+        self._counter += 1
+        base = os.path.join(self.directory, f"{os.getpid()}-{int(time.time() * 1000)}-{self._counter}")
+        # Take the writer lock before the segment exists, so it is never seen unlocked
+        self._lock_fd = os.open(base + ".lock", os.O_WRONLY | os.O_CREAT, 0o644)
+        fcntl.flock(self._lock_fd, fcntl.LOCK_EX)
+        self._path = base + ".open"
+        self._fd = os.open(self._path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        self._size = 0
+
+    def _seal(self):
+        os.fsync(self._fd)
+        os.close(self._fd)
+        os.rename(self._path, self._path[:-len(".open")] + ".seg")
+        self._fd = None
+        self._release_lock()
+
+    def _release_lock(self):
+        os.unlink(self._path[:-len(".open")] + ".lock")
+        os.close(self._lock_fd)
+        self._lock_fd = None
+
+    def append(self, source: str, body: bytes) -> int:
+        """Append one event and return its position in this process's write stream"""
+        data = source.encode() + b"\0" + body
+        frame = FRAME_HEADER.pack(len(data), zlib.crc32(data), time.time()) + data
+        with self._lock:
+            if self._fd is None:
+                self._open_segment()
+            os.write(self._fd, frame)
+            self._size += len(frame)
+            self._written += len(frame)
+            position = self._written
+            if self._size >= self.segment_bytes:
+                self._seal()
+        return position
+
+    def sync(self, position: int):
+        """Block until everything up to `position` is fsynced; concurrent callers share one fsync"""
+        with self._sync_lock:
+            if self._synced >= position:
+                return
+            with self._lock:
+                fd, target = self._fd, self._written
+                if fd is not None:
+                    fd = os.dup(fd)
+            if fd is not None:
+                try:
+                    os.fsync(fd)
+                finally:
+                    os.close(fd)
+            self._synced = target
+
+    def _sync_loop(self):
+        while not self._stop.wait(self.fsync_interval):
+            try:
+                self.sync(self._written)
+            except OSError:
+                logger.exception("Webhook spool fsync failed")
+
+def read_frames(fd: int, offset: int, limit: int) -> Tuple[List[dict], int]:
+    """Decode up to `limit` complete frames starting at `offset`; returns (events, next offset).
+
+    A frame that is still being written stops the read; a frame whose CRC
+    does not match is skipped.
+    """
+    events = []
+    size = os.fstat(fd).st_size
+    while len(events) < limit and offset + FRAME_HEADER.size <= size:
+        length, crc, received = FRAME_HEADER.unpack(os.pread(fd, FRAME_HEADER.size, offset))
+        end = offset + FRAME_HEADER.size + length
+        if end > size:
+            break
+        data = os.pread(fd, length, offset + FRAME_HEADER.size)
+        offset = end
+        if zlib.crc32(data) != crc:
+            logger.warning("Skipping corrupt webhook frame ending at offset %d", end)
+            continue
+        source, _, body = data.partition(b"\0")
+        events.append({"source": source.decode(), "receivedAt": received, "body": body})
+    return events, offset
+
+def _read_checkpoint(path: str) -> int:
+    try:
+        with open(path) as f:
+            return int(f.read().strip() or 0)
+    except (OSError, ValueError):
+        return 0
+
+def _write_checkpoint(path: str, offset: int):
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        f.write(str(offset))
+    os.replace(tmp, path)
+
+def decode_body(body: bytes):
+    try:
+        return json.loads(body)
+    except ValueError:
+        return {"raw": body.decode("utf-8", errors="replace")}
+
+def _merge_into_queued(db, integration_id: int, source: str, events: List[dict], limit: int) -> bool:
+    """Append events to the integration's newest still-queued webhook job, if it has room.
+
+    Jobs waiting to retry undelivered events are left alone, so fresh events
+    are not held back by their backoff. The UPDATE only applies to the
+    payload version that was read, so it loses to a worker that claims the
+    job first and to another dispatcher merging into it at the same time;
+    the caller then enqueues a new job instead.
+    """
+    J = ExecutionJob
+    job = (db.query(J.id, J.payload, J.payload_version)
+           .filter(J.integration_id == integration_id, J.status == execution_queue.QUEUED, J.trigger == "webhook",
+                   J.attempts == 0)
+           .order_by(J.id.desc()).first())
+    if job is None or (job.payload or {}).get("source") != source or len(job.payload["events"]) + len(events) > limit:
+        return False
+    merged = {"source": source, "events": job.payload["events"] + events}
+    result = db.execute(update(J).where(J.id == job.id, J.status == execution_queue.QUEUED,
+                                        J.payload_version == job.payload_version)
+                        .values(payload=merged, payload_version=job.payload_version + 1)
+                        .execution_options(synchronize_session=False))
+    db.commit()
+    return result.rowcount == 1
+
+class WebhookDispatcher:
+    def __init__(self, spool: WebhookSpool, batch_size: int, poll_seconds: float):
+        self.spool = spool
+        self.batch_size = batch_size
+        self.poll_seconds = poll_seconds
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._loop, name="webhook-dispatcher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _loop(self):
+        worker_id = f"{socket.gethostname()}:{os.getpid()}:webhook"
+        while not self._stop.is_set():
+            try:
+                moved = self.drain()
+            except Exception:
+                logger.exception("Webhook dispatch failed")
+                moved = 0
+            if execution_queue.worker_pool is None:
+                # No worker pool in this process, so nothing else would run the jobs
+                moved += execution_queue.run_queued(worker_id)
+            if not moved:
+                self._stop.wait(self.poll_seconds)
+
+    def _subscribers(self, db) -> Dict[str, List[int]]:
+        subscribers: Dict[str, List[int]] = {}
+        for integration in integration_cache.all(db):
+            if integration.status != IntegrationStatus.DEPLOYED:
+                continue
+            for route in integration.routes:
+                endpoint = str(route.get("from", ""))
+                if endpoint.startswith("webhook:"):
+                    subscribers.setdefault(endpoint[len("webhook:"):].split("?")[0], []).append(integration.id)
+        return subscribers
+
+    def _seal_orphans(self):
+        """Seal open segments whose writer no longer holds their lock"""
+        for name in os.listdir(self.spool.directory):
+            if not name.endswith(".open"):
+                continue
+            base = os.path.join(self.spool.directory, name[:-len(".open")])
+            lock_fd = os.open(base + ".lock", os.O_WRONLY | os.O_CREAT, 0o644)
+            try:
+                try:
+                    fcntl.flock(lock_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    continue  # the writer is still appending
+                try:
+                    os.rename(base + ".open", base + ".seg")
+                except FileNotFoundError:
+                    pass  # its writer sealed it in the meantime
+                try:
+                    os.unlink(base + ".lock")
+                except FileNotFoundError:
+                    pass
+            finally:
+                os.close(lock_fd)
+
+    def drain(self) -> int:
+        """Dispatch whatever is readable in every unlocked segment; returns events moved"""
+        self._seal_orphans()
+        moved = 0
+        names = sorted(n for n in os.listdir(self.spool.directory) if n.endswith((".open", ".seg")))
+        for name in names:
+            path = os.path.join(self.spool.directory, name)
+            try:
+                fd = os.open(path, os.O_RDONLY)
+            except FileNotFoundError:
+                continue  # sealed or deleted since listing
+            try:
+                try:
+                    fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    continue
+                moved += self._drain_segment(fd, path)
+            finally:
+                os.close(fd)
+        return moved
+
+    def _drain_segment(self, fd: int, path: str) -> int:
+        checkpoint = path.rsplit(".", 1)[0] + ".offset"
+        offset = _read_checkpoint(checkpoint)
+        moved = 0
+        while True:
+            events, next_offset = read_frames(fd, offset, self.batch_size)
+            if not events:
+                break
+            self._enqueue(events)
+            _write_checkpoint(checkpoint, next_offset)
+            offset = next_offset
+            moved += len(events)
+        if path.endswith(".seg") and offset >= os.fstat(fd).st_size:
+            os.unlink(path)
+            if os.path.exists(checkpoint):
+                os.unlink(checkpoint)
+        return moved
+
+    def _enqueue(self, events: List[dict]):
+        db = SessionLocal()
+        try:
+            subscribers = self._subscribers(db)
+            by_source: Dict[str, List[dict]] = {}
+            for event in events:
+                by_source.setdefault(event["source"], []).append({
+                    "receivedAt": datetime.utcfromtimestamp(event["receivedAt"]).isoformat(),
+                    "body": decode_body(event["body"]),
+                })
+            for source, batch in by_source.items():
+                integration_ids = subscribers.get(source, [])
+                for integration_id in integration_ids:
+                    if not _merge_into_queued(db, integration_id, source, batch, self.batch_size):
+                        execution_queue.enqueue(db, integration_id, trigger="webhook", payload={"source": source, "events": batch})
+                record_webhook_dispatch(source, "enqueued" if integration_ids else "unrouted", len(batch))
+        finally:
+            db.close()
+        if execution_queue.worker_pool is not None:
+            execution_queue.worker_pool.notify(all_workers=True)
+
+spool: Optional[WebhookSpool] = None
+dispatcher: Optional[WebhookDispatcher] = None
+
+def get_spool() -> WebhookSpool:
+    global spool
+    if spool is None:
+        spool = WebhookSpool(settings.webhook_spool_dir, settings.webhook_segment_bytes,
+                             settings.webhook_fsync, settings.webhook_fsync_ms / 1000)
+        spool.start()
+    return spool
+
+def start_webhook_dispatcher():
+    global dispatcher
+    if dispatcher is None:
+        dispatcher = WebhookDispatcher(get_spool(), settings.webhook_dispatch_batch, settings.webhook_dispatch_poll_seconds)
+        dispatcher.start()
+
+def stop_webhook_dispatcher():
+    global dispatcher, spool
+    if dispatcher is not None:
+        dispatcher.stop()
+        dispatcher = None
+    if spool is not None:
+        spool.close()
+        spool = None
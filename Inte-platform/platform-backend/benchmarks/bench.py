@@ -0,0 +1,260 @@
+"""End-to-end latency/throughput benchmark for the platform-backend routers.
+
+Boots ``app.main:app`` in-process on uvicorn (SQLite by default, or any
+DATABASE_URL), starts the ERP/CRM mock services as subprocesses, drives each
+scenario at the requested concurrency and writes a JSON result file that can be
+diffed against an earlier baseline.
+
+    python -m benchmarks.bench --concurrency 16 --requests 500
+    python -m benchmarks.bench --compare benchmarks/baselines/<sha>.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+import httpx
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+MOCK_DIR = BACKEND_DIR.parent / "mock-services"
+BASELINE_DIR = Path(__file__).resolve().parent / "baselines"
+
+# name -> (method, path, body); {integration_id} is filled in after setup
+SCENARIOS = {
+    "auth_login": ("POST", "/api/auth/login", {"email": "admin@mulesoft.io", "password": "admin123"}),
+    "auth_me": ("GET", "/api/auth/me", None),
+    "integrations_list": ("GET", "/api/integrations/", None),
+    "integrations_create": ("POST", "/api/integrations/", {"name": "Bench Flow", "flowConfig": "routes:\n  - from: \"direct:bench\""}),
+    "runtime_execute": ("POST", "/api/runtime/{integration_id}/execute", None),
+    "runtime_logs": ("GET", "/api/runtime/{integration_id}/logs", None),
+    "runtime_health": ("GET", "/api/runtime/{integration_id}/health", None),
+    "dashboard_stats": ("GET", "/api/dashboard/stats", None),
+    "connectors_list": ("GET", "/api/connectors/", None),
+    "connectors_types": ("GET", "/api/connectors/types", None),
+}
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_until_up(url: str, timeout: float = 30.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if httpx.get(url, timeout=1.0).status_code < 500:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"Service at {url} did not come up within {timeout}s")
+
+
+def start_mock(service: str, port: int, records: int, latency: str) -> subprocess.Popen:
+    env = dict(os.environ, PYTHONPATH=str(MOCK_DIR / "common"), MOCK_RECORDS=str(records), MOCK_LATENCY=latency)
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=MOCK_DIR / service, env=env,
+    )
+    wait_until_up(f"http://127.0.0.1:{port}/health")
+    return proc
+
+
+class QueryCounter:
+    """Counts statements issued through the backend's engine while attached"""
+    def __init__(self, engine):
+        from sqlalchemy import event
+        self.count = 0
+        self._lock = threading.Lock()
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, *args, **kwargs):
+        with self._lock:
+            self.count += 1
+
+    def reset(self) -> int:
+        with self._lock:
+            count, self.count = self.count, 0
+        return count
+
+
+def start_backend(port: int):
+    """Import and serve app.main:app in a background thread (env must already be set)"""
+    import uvicorn
+    sys.path.insert(0, str(BACKEND_DIR))
+    from app.main import app
+    from app.database import engine
+
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    wait_until_up(f"http://127.0.0.1:{port}/health")
+    return server, thread, QueryCounter(engine)
+
+
+def percentile(samples, pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    k = (len(ordered) - 1) * pct / 100
+    lo, hi = int(k), min(int(k) + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+
+async def run_scenario(client: httpx.AsyncClient, method: str, path: str, body, total: int, concurrency: int):
+    latencies, errors = [], 0
+    remaining = iter(range(total))
+
+    async def worker():
+        nonlocal errors
+        for _ in remaining:
+            start = time.perf_counter()
+            try:
+                response = await client.request(method, path, json=body)
+                if response.status_code >= 400:
+                    errors += 1
+            except httpx.HTTPError:
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, errors, time.perf_counter() - started
+
+
+async def run_all(base_url: str, args, counter: QueryCounter) -> dict:
+    results = {}
+    async with httpx.AsyncClient(base_url=base_url, timeout=60.0,
+                                 limits=httpx.Limits(max_connections=args.concurrency)) as client:
+        login = await client.post("/api/auth/login", json={"email": "admin@mulesoft.io", "password": "admin123"})
+        login.raise_for_status()
+        client.headers["Authorization"] = f"Bearer {login.json()['token']}"
+        integration_id = args.integration_id
+
+        for name in args.scenarios:
+            method, path, body = SCENARIOS[name]
+            path = path.format(integration_id=integration_id)
+            if args.warmup:
+                await run_scenario(client, method, path, body, args.warmup, min(args.concurrency, args.warmup))
+            counter.reset()
+            latencies, errors, elapsed = await run_scenario(client, method, path, body, args.requests, args.concurrency)
+            queries = counter.reset()
+            results[name] = {
+                "requests": len(latencies),
+                "errors": errors,
+                "rps": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+                "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+                "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+                "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+                "mean_ms": round(statistics.fmean(latencies) * 1000, 3) if latencies else 0.0,
+                "queries_per_request": round(queries / len(latencies), 2) if latencies else 0.0,
+            }
+            r = results[name]
+            print(f"{name:22s} rps={r['rps']:>9.2f} p50={r['p50_ms']:>8.2f}ms p95={r['p95_ms']:>8.2f}ms "
+                  f"p99={r['p99_ms']:>8.2f}ms q/req={r['queries_per_request']:>6.2f} errors={r['errors']}")
+    return results
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> bool:
+    """Print per-scenario deltas; return True if any metric regressed past threshold (percent)"""
+    regressed = False
+    print(f"\nComparison against {baseline['meta'].get('revision')} ({baseline['meta'].get('timestamp')})")
+    for name, cur in current["scenarios"].items():
+        base = baseline["scenarios"].get(name)
+        if not base:
+            print(f"{name:22s} (no baseline)")
+            continue
+        deltas = []
+        for metric, higher_is_worse in (("p50_ms", True), ("p95_ms", True), ("p99_ms", True),
+                                        ("rps", False), ("queries_per_request", True)):
+            old, new = base.get(metric, 0), cur.get(metric, 0)
+            change = ((new - old) / old * 100) if old else 0.0
+            worse = change > threshold if higher_is_worse else change < -threshold
+            regressed |= worse
+            deltas.append(f"{metric}={new} ({change:+.1f}%){' !' if worse else ''}")
+        print(f"{name:22s} " + "  ".join(deltas))
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", help="Defaults to a fresh SQLite file in a temp directory")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=200, help="Requests per scenario")
+    parser.add_argument("--warmup", type=int, default=10, help="Unmeasured requests per scenario")
+    parser.add_argument("--scenarios", nargs="+", default=list(SCENARIOS), choices=list(SCENARIOS))
+    parser.add_argument("--integration-id", type=int, default=1, help="Deployed integration used by runtime scenarios")
+    parser.add_argument("--mock-records", type=int, default=1000, help="MOCK_RECORDS for the ERP/CRM mocks")
+    parser.add_argument("--mock-latency", default="", help="MOCK_LATENCY spec for the ERP/CRM mocks")
+    parser.add_argument("--no-mocks", action="store_true", help="Use ERP_SERVICE_URL/CRM_SERVICE_URL as already set")
+    parser.add_argument("--output", help="Result file (default benchmarks/baselines/<revision>.json)")
+    parser.add_argument("--compare", help="Baseline JSON to diff against")
+    parser.add_argument("--fail-threshold", type=float, default=20.0, help="Regression threshold in percent")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench-")
+    database_url = args.database_url or f"sqlite:///{workdir}/bench.db"
+    os.environ["DATABASE_URL"] = database_url
+
+    mocks = []
+    try:
+        if not args.no_mocks:
+            erp_port, crm_port = free_port(), free_port()
+            mocks.append(start_mock("erp-service", erp_port, args.mock_records, args.mock_latency))
+            mocks.append(start_mock("crm-service", crm_port, args.mock_records, args.mock_latency))
+            os.environ["ERP_SERVICE_URL"] = f"http://127.0.0.1:{erp_port}"
+            os.environ["CRM_SERVICE_URL"] = f"http://127.0.0.1:{crm_port}"
+
+        port = free_port()
+        server, thread, counter = start_backend(port)
+        scenarios = asyncio.run(run_all(f"http://127.0.0.1:{port}", args, counter))
+        server.should_exit = True
+        thread.join(timeout=10)
+    finally:
+        for proc in mocks:
+            proc.terminate()
+            proc.wait(timeout=10)
+
+    result = {
+        "meta": {
+            "revision": git_revision(),
+            "timestamp": datetime.utcnow().isoformat(),
+            "database": database_url.split("://", 1)[0],
+            "concurrency": args.concurrency,
+            "requests": args.requests,
+            "mockRecords": args.mock_records,
+            "python": sys.version.split()[0],
+        },
+        "scenarios": scenarios,
+    }
+    output = Path(args.output) if args.output else BASELINE_DIR / f"{result['meta']['revision']}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(result, indent=2))
+    print(f"\nResults written to {output}")
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text())
+        if compare(result, baseline, args.fail_threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
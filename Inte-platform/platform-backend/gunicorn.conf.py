@@ -0,0 +1,21 @@
+# Multi-worker deployment: gunicorn -c gunicorn.conf.py app.main:app
+import os
+import shutil
+
+# Must be set before prometheus_client is imported anywhere in the master or workers
+os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", "/tmp/prometheus-multiproc")
+
+from prometheus_client import multiprocess
+
+bind = os.getenv("BIND", "0.0.0.0:8080")
+workers = int(os.getenv("WEB_CONCURRENCY", "4"))
+worker_class = "uvicorn.workers.UvicornWorker"
+
+def on_starting(server):
+    # Metric files from a previous run would otherwise be merged into this one
+    path = os.environ["PROMETHEUS_MULTIPROC_DIR"]
+    shutil.rmtree(path, ignore_errors=True)
+    os.makedirs(path, exist_ok=True)
+
+def child_exit(server, worker):
+    multiprocess.mark_process_dead(worker.pid)
@@ -99,14 +99,43 @@ const StatCard = ({ title, value, prefix, suffix, color, trend, icon }) => (
 export default function Dashboard() {
   const [stats, setStats] = useState(null);
   const [loading, setLoading] = useState(true);
+  const [deployments, setDeployments] = useState(null);
 
   useEffect(() => {
     api.get('/dashboard/stats')
       .then(({ data }) => setStats(data))
       .catch(() => setStats({ apiCount: 7, activeIntegrations: 3, errorRate: 2.4, throughput: 1250 }))
       .finally(() => setLoading(false));
+
+    // Live updates: the server computes once and pushes the same frame to every open dashboard
+    const token = localStorage.getItem('token');
+    if (!token || !window.EventSource) return undefined;
+    const source = new EventSource(`${api.defaults.baseURL}/dashboard/stream?token=${encodeURIComponent(token)}`);
+    source.addEventListener('snapshot', (e) => {
+      const data = JSON.parse(e.data);
+      setStats(data.stats);
+      setDeployments(Object.fromEntries(data.integrations.map((i) => [i.id, i])));
+    });
+    source.addEventListener('update', (e) => {
+      const data = JSON.parse(e.data);
+      setStats(data.stats);
+      setDeployments((prev) => {
+        const next = { ...prev };
+        data.changed.forEach((i) => { next[i.id] = i; });
+        data.removed.forEach((id) => { delete next[id]; });
+        return next;
+      });
+    });
+    return () => source.close();
   }, []);
 
+  const deploymentCounts = (() => {
+    if (!deployments) return { deployed: 3, stopped: 1, error: 1, total: 5 };
+    const all = Object.values(deployments);
+    const count = (status) => all.filter((i) => i.status === status).length;
+    return { deployed: count('deployed'), stopped: all.length - count('deployed') - count('error'), error: count('error'), total: all.length || 1 };
+  })();
+
   const trafficData = [120, 85, 145, 178, 320, 580, 720, 650, 890, 560, 440, 380];
   const responseTimeData = [45, 42, 38, 52, 78, 65, 58, 48, 55, 42, 35, 38];
   const errorData = [
@@ -217,10 +246,10 @@ export default function Dashboard() {
           <Card title={<span style={{ fontWeight: 600 }}>Integration Health</span>} className="animate-fade-in-up">
             <div style={{ padding: '8px 0' }}>
               {[
-                { label: 'Deployed', count: 3, percent: 60, color: '#52c41a' },
-                { label: 'Stopped', count: 1, percent: 20, color: '#faad14' },
-                { label: 'Error', count: 1, percent: 20, color: '#ff4d4f' }
-              ].map((item, i) => (
+                { label: 'Deployed', count: deploymentCounts.deployed, color: '#52c41a' },
+                { label: 'Stopped', count: deploymentCounts.stopped, color: '#faad14' },
+                { label: 'Error', count: deploymentCounts.error, color: '#ff4d4f' }
+              ].map(item => ({ ...item, percent: Math.round(item.count / deploymentCounts.total * 100) })).map((item, i) => (
                 <div key={i} style={{ marginBottom: 16 }}>
                   <div style={{ display: 'flex', justifyContent: 'space-between', marginBottom: 6 }}>
                     <span style={{ fontWeight: 500 }}>{item.label}</span>
@@ -10,10 +10,15 @@ export default function Runtime() {
   const [logsModal, setLogsModal] = useState(false);
   const [selectedIntegration, setSelectedIntegration] = useState(null);
   const [executing, setExecuting] = useState({});
+  const [health, setHealth] = useState({});
 
   const fetch = () => {
     setLoading(true);
     api.get('/integrations').then(({ data }) => setData(data)).finally(() => setLoading(false));
+    // One bulk call covers every row instead of one health request per integration
+    api.get('/runtime/health').then(({ data }) => {
+      setHealth(Object.fromEntries(data.integrations.map((h) => [h.integrationId, h])));
+    }).catch(() => setHealth({}));
   };
 
   useEffect(() => { fetch(); }, []);
@@ -33,8 +38,18 @@ export default function Runtime() {
   const handleExecute = async (id) => {
     setExecuting(prev => ({ ...prev, [id]: true }));
     try {
-      const { data } = await api.post(`/runtime/${id}/execute`);
-      message.success(`Execution completed - ${data.logsGenerated} log entries generated`);
+      let { data } = await api.post(`/runtime/${id}/execute`);
+      // Queued executions return 202 with an id; poll until a worker finishes it
+      while (data.executionId && ['queued', 'running'].includes(data.status)) {
+        await new Promise((resolve) => setTimeout(resolve, 1000));
+        ({ data } = await api.get(`/runtime/executions/${data.executionId}`));
+      }
+      const result = data.result || data;
+      if (data.status === 'failed' && !data.result) {
+        message.error(data.error || 'Execution failed');
+      } else {
+        message.success(`Execution completed - ${result.logsGenerated} log entries generated`);
+      }
     } catch (err) {
       message.error(err.response?.data?.detail || 'Execution failed');
     }
@@ -77,6 +92,21 @@ export default function Runtime() {
         </Tag>
       ) 
     },
+    {
+      title: 'Health (5m)',
+      key: 'health',
+      width: 130,
+      render: (_, r) => {
+        const h = health[r.id];
+        const w = h?.windows?.['5m'];
+        if (!h || !w?.executions) return <span style={{ color: '#999' }}>-</span>;
+        return (
+          <Tooltip title={`${w.executions} runs, avg ${w.avgDurationMs}ms, max ${w.maxDurationMs}ms`}>
+            <Tag color={w.failures ? 'red' : 'green'}>{w.failures ? `${w.errorRate}% errors` : 'OK'}</Tag>
+          </Tooltip>
+        );
+      }
+    },
     { 
       title: 'Actions', 
       key: 'actions',